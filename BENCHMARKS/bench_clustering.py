@@ -0,0 +1,91 @@
+from sklearn.metrics import adjusted_rand_score
+from sklearn.datasets import make_blobs
+from sklearn.cluster import KMeans
+import pandas as pd
+import numpy as np
+import tracemalloc
+import argparse
+import resource
+import tempfile
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "LESSON9_PIP"))
+from reaction_clustering import write_feature_chunks, fit_streaming, assign_streaming
+
+# The Lesson 9 notebook path (make_blobs -> DataFrame -> KMeans(n_init=10) on
+# everything in memory) against reaction_clustering's path (chunks streamed to
+# a memmap -> MiniBatchKMeans.partial_fit -> batched labelling), on the same
+# blobs. Reports wall time, Python heap peak, RSS, inertia and agreement with
+# the true blob labels.
+CHUNK_ROWS = 100_000
+
+
+def blob_centers(n_clusters, n_features, seed):
+    return np.random.default_rng(seed).uniform(-10, 10, size=(n_clusters, n_features))
+
+
+def blob_chunks(n_samples, centers, seed, truth):
+    # Same distribution as make_blobs over all rows, generated a chunk at a time.
+    for i, start in enumerate(range(0, n_samples, CHUNK_ROWS)):
+        rows = min(CHUNK_ROWS, n_samples - start)
+        X, y = make_blobs(n_samples=rows, centers=centers, cluster_std=0.60, random_state=seed + i)
+        truth[start:start + rows] = y
+        yield X.astype(np.float32)
+
+
+def measure(run):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run_in_memory(args, centers):
+    X, y = make_blobs(n_samples=args.samples, centers=centers, cluster_std=0.60, random_state=args.seed)
+    df = pd.DataFrame(X, columns=[f"Feature{i + 1}" for i in range(X.shape[1])])
+    df["TrueCluster"] = y
+    km = KMeans(n_clusters=args.clusters, random_state=42, n_init=10)
+    km.fit(X)
+    df["KMeans_Label"] = km.labels_
+    return km.inertia_, adjusted_rand_score(df["TrueCluster"], df["KMeans_Label"])
+
+
+def run_streaming(args, centers, out_dir):
+    truth = np.empty(args.samples, dtype=np.int32)
+    features = write_feature_chunks(blob_chunks(args.samples, centers, args.seed, truth), out_dir, args.features)
+    km = fit_streaming(features, args.clusters, args.batch_size, args.epochs)
+    labels, inertia = assign_streaming(km, features, args.batch_size)
+    return inertia, adjusted_rand_score(truth, labels)
+
+
+def report(name, result, elapsed, peak):
+    inertia, ari = result
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{name:<12} {elapsed:>8.2f}s | heap peak {peak / 2**20:>9.1f} MB | max rss so far {rss:>8.1f} MB "
+          f"| inertia {inertia:>14.1f} | ARI vs truth {ari:.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Notebook K-Means vs streaming memmap K-Means")
+    parser.add_argument("--samples", type=int, default=200_000)
+    parser.add_argument("--features", type=int, default=32)
+    parser.add_argument("--clusters", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-in-memory", action="store_true",
+                        help="only run the streaming path (for sizes that do not fit in RAM)")
+    args = parser.parse_args()
+
+    centers = blob_centers(args.clusters, args.features, args.seed)
+    print(f"{args.samples} samples x {args.features} features, {args.clusters} clusters")
+    # The streaming path runs first so its RSS is not inflated by the in-memory run.
+    with tempfile.TemporaryDirectory(prefix="bench-clustering-") as out_dir:
+        report("streaming", *measure(lambda: run_streaming(args, centers, out_dir)))
+    if not args.skip_in_memory:
+        report("in-memory", *measure(lambda: run_in_memory(args, centers)))
@@ -0,0 +1,193 @@
+import subprocess
+import tracemalloc
+import argparse
+import resource
+import tempfile
+import glob
+import json
+import time
+import sys
+import os
+
+from stand_in_sites import SiteConfig, start_server, ord_dataset_id, ord_reaction_id
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ORD_DIR = os.path.join(REPO_ROOT, "ORD_SCRAPPER")
+CRD_DIR = os.path.join(REPO_ROOT, "CRD")
+sys.path[:0] = [REPO_ROOT, ORD_DIR, CRD_DIR]
+
+from Scraper_Helpers.instrumentation import set_verbose
+
+# Runs one scraper scenario against the local stand-in sites and reports
+# reactions/sec and memory. Save a run with --save and compare later runs
+# against it with --baseline to see what a change to the scrapers bought.
+SCENARIOS = ["ord-http", "ord-selenium", "ord-crawl", "crd-async", "crd-engine", "crd-selenium"]
+
+
+def all_reaction_urls(config, base_url):
+    for page in range(1, config.ord_pages + 1):
+        for d in range(config.datasets_per_page):
+            dataset_id = ord_dataset_id(page, d)
+            for r in range(config.reactions_per_dataset):
+                yield dataset_id, f"{base_url}/id/{ord_reaction_id(dataset_id, r)}"
+
+
+def run_ord_http(config, base_url, out_dir, args):
+    import ord_http
+    ord_http.REACTION_JSON_URL = base_url + "/api/reaction/{reaction_id}"
+    count = 0
+    for dataset_id, url in all_reaction_urls(config, base_url):
+        ord_http.scrape_ord_details_http(url, os.path.join(out_dir, dataset_id))
+        count += 1
+    return count
+
+
+def run_ord_selenium(config, base_url, out_dir, args):
+    from Scraper_Helpers.driver_factory import create_driver
+    from ORD import scrape_ord_details
+    driver = create_driver()
+    count = 0
+    try:
+        for dataset_id, url in all_reaction_urls(config, base_url):
+            scrape_ord_details(driver, url, os.path.join(out_dir, dataset_id), batched=not args.unbatched)
+            count += 1
+    finally:
+        driver.quit()
+    return count
+
+
+def run_ord_crawl(config, base_url, out_dir, args):
+    command = [sys.executable, os.path.join(ORD_DIR, "ORD.py"), "--base-url", base_url + "/", "--out", out_dir,
+               "--quiet", "--fresh", "--max-pages", str(config.ord_pages), "--workers", str(args.workers)]
+    if args.fast_path:
+        command.append("--fast-path")
+    subprocess.run(command, check=True)
+    return len(glob.glob(os.path.join(out_dir, "ord_dataset-*", "ord-*.csv")))
+
+
+def crd_reactions(out_dir):
+    # Every stand-in reaction SMILES has reactant, reagent and product parts, so three
+    # CSV rows each (header lines excluded).
+    rows = 0
+    for path in glob.glob(os.path.join(out_dir, "*.csv")):
+        with open(path, encoding="utf-8") as f:
+            rows += sum(1 for _ in f) - 1
+    return rows // 3
+
+
+def run_crd_async(config, base_url, out_dir, args):
+    from crd_async import main
+    main(["--base-url", base_url, "--out", out_dir, "--quiet", "--concurrency", str(args.concurrency)])
+    return crd_reactions(out_dir)
+
+
+def run_crd_engine(config, base_url, out_dir, args):
+    command = [sys.executable, "-m", "Scraper_Helpers", "crd", "--base-url", base_url, "--out", out_dir,
+               "--quiet", "--concurrency", str(args.concurrency)]
+    subprocess.run(command, check=True, cwd=REPO_ROOT)
+    return crd_reactions(out_dir)
+
+
+def run_crd_selenium(config, base_url, out_dir, args):
+    env = dict(os.environ, CRD_BASE_URL=base_url, CRD_OUTPUT_DIR=out_dir, CRD_QUIET="1")
+    subprocess.run([sys.executable, os.path.join(CRD_DIR, "main.py")], check=True, env=env, cwd=CRD_DIR)
+    return crd_reactions(out_dir)
+
+
+RUNNERS = {
+    "ord-http": run_ord_http,
+    "ord-selenium": run_ord_selenium,
+    "ord-crawl": run_ord_crawl,
+    "crd-async": run_crd_async,
+    "crd-engine": run_crd_engine,
+    "crd-selenium": run_crd_selenium,
+}
+
+
+def run_scenario(scenario, config, args):
+    server, base_url = start_server(config)
+    try:
+        with tempfile.TemporaryDirectory(prefix=f"bench-{scenario}-") as out_dir:
+            tracemalloc.start()
+            started = time.perf_counter()
+            reactions = RUNNERS[scenario](config, base_url, out_dir, args)
+            elapsed = time.perf_counter() - started
+            _, python_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    finally:
+        server.shutdown()
+    # ru_maxrss is KiB on Linux.
+    return {
+        "scenario": scenario,
+        "reactions": reactions,
+        "seconds": round(elapsed, 3),
+        "reactions_per_sec": round(reactions / elapsed, 2) if elapsed else 0.0,
+        "python_heap_peak_mb": round(python_peak / 2**20, 2),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "children_max_rss_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+        "latency_ms": config.latency_ms,
+    }
+
+
+def print_result(result, baseline=None):
+    line = (f"{result['scenario']:<14} {result['reactions']:>6} reactions in {result['seconds']:>8.2f}s "
+            f"= {result['reactions_per_sec']:>8.2f}/s | heap peak {result['python_heap_peak_mb']} MB "
+            f"| rss {result['max_rss_mb']} MB | children rss {result['children_max_rss_mb']} MB")
+    if baseline and baseline.get("reactions_per_sec"):
+        speedup = result["reactions_per_sec"] / baseline["reactions_per_sec"]
+        line += f" | {speedup:.2f}x vs baseline"
+    print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against local stand-in sites")
+    parser.add_argument("scenarios", nargs="*", default=["ord-http", "crd-async"],
+                        help=f"which scrapers to run, from {', '.join(SCENARIOS)} (Selenium scenarios need Chrome)")
+    parser.add_argument("--latency-ms", type=int, default=20, help="injected server latency per request")
+    parser.add_argument("--ord-pages", type=int, default=2)
+    parser.add_argument("--datasets-per-page", type=int, default=3)
+    parser.add_argument("--reactions-per-dataset", type=int, default=5)
+    parser.add_argument("--measurements-per-product", type=int, default=4)
+    parser.add_argument("--crd-sets", type=int, default=4)
+    parser.add_argument("--crd-pages-per-set", type=int, default=3)
+    parser.add_argument("--crd-reactions-per-page", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=0, help="ORD.py --workers for the ord-crawl scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="crd-async / crd-engine reaction sets in parallel")
+    parser.add_argument("--fast-path", action="store_true", help="ord-crawl: read reaction records over HTTP")
+    parser.add_argument("--unbatched", action="store_true", help="ord-selenium: per-element reads instead of batched scripts")
+    parser.add_argument("--verbose", action="store_true", help="keep the scrapers' per-reaction progress output")
+    parser.add_argument("--rate", type=float, default=50.0,
+                        help="scheduler start rate in requests/second (SCRAPER_RATE); the real-site default is 1")
+    parser.add_argument("--max-rate", type=float, default=200.0, help="scheduler rate ceiling (SCRAPER_MAX_RATE)")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved earlier with --save")
+    args = parser.parse_args()
+    unknown = [s for s in args.scenarios if s not in RUNNERS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    set_verbose(args.verbose)
+    # Read when the scrapers' scheduler is first imported, here or in a subprocess.
+    os.environ["SCRAPER_RATE"] = str(args.rate)
+    os.environ["SCRAPER_MAX_RATE"] = str(args.max_rate)
+
+    config = SiteConfig(
+        ord_pages=args.ord_pages, datasets_per_page=args.datasets_per_page,
+        reactions_per_dataset=args.reactions_per_dataset, measurements_per_product=args.measurements_per_product,
+        crd_sets=args.crd_sets, crd_pages_per_set=args.crd_pages_per_set,
+        crd_reactions_per_page=args.crd_reactions_per_page, latency_ms=args.latency_ms,
+    )
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = {r["scenario"]: r for r in json.load(f)}
+
+    results = []
+    for scenario in args.scenarios:
+        result = run_scenario(scenario, config, args)
+        results.append(result)
+        print_result(result, baseline.get(scenario))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.save}")
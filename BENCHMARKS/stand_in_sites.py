@@ -0,0 +1,349 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from html import escape
+import threading
+import argparse
+import random
+import json
+import time
+
+# Local stand-ins for open-reaction-database.org and kmt.vander-lingen.nl.
+# Pages are synthetic but carry exactly the selectors the scrapers rely on, and
+# their sizes and response latency are configurable, so scraper speed can be
+# measured offline and compared run to run.
+
+SOLVENTS = ["O", "CO", "CCO", "CC#N", "ClCCl", "C1CCOC1", "CN(C)C=O", "CS(C)=O"]
+REAGENTS = ["[Na+].[OH-]", "O=C([O-])[O-].[K+].[K+]", "CCN(CC)CC", "[Pd]", "Cl", "N#N"]
+ROLES = ["REACTANT", "REAGENT", "SOLVENT", "CATALYST"]
+
+
+class SiteConfig:
+    def __init__(self, ord_pages=2, datasets_per_page=3, reactions_per_dataset=5, input_tabs=3,
+                 components_per_tab=2, outcomes=1, products_per_outcome=2, measurements_per_product=4,
+                 crd_sets=4, crd_pages_per_set=3, crd_reactions_per_page=10, latency_ms=0, seed=42):
+        self.ord_pages = ord_pages
+        self.datasets_per_page = datasets_per_page
+        self.reactions_per_dataset = reactions_per_dataset
+        self.input_tabs = input_tabs
+        self.components_per_tab = components_per_tab
+        self.outcomes = outcomes
+        self.products_per_outcome = products_per_outcome
+        self.measurements_per_product = measurements_per_product
+        self.crd_sets = crd_sets
+        self.crd_pages_per_set = crd_pages_per_set
+        self.crd_reactions_per_page = crd_reactions_per_page
+        self.latency_ms = latency_ms
+        self.seed = seed
+
+    @property
+    def ord_reaction_count(self):
+        return self.ord_pages * self.datasets_per_page * self.reactions_per_dataset
+
+    @property
+    def crd_reaction_count(self):
+        return self.crd_sets * self.crd_pages_per_set * self.crd_reactions_per_page
+
+
+def format_number(value):
+    return f"{value:g}"
+
+
+def random_smiles(rng):
+    atoms = ["C", "C", "C", "N", "O", "c1ccccc1", "Cl", "Br", "C(=O)"]
+    return "".join(rng.choice(atoms) for _ in range(rng.randint(3, 9)))
+
+
+# ---------------------------------------------------------------- ORD ----
+
+def ord_dataset_id(page, index):
+    return f"ord_dataset-bench{page:03d}{index:03d}"
+
+
+def ord_reaction_id(dataset_id, index):
+    return f"ord-{dataset_id.split('-')[1]}r{index:04d}"
+
+
+def ord_reaction_record(config, reaction_id):
+    rng = random.Random(f"{config.seed}:{reaction_id}")
+    inputs = {}
+    for t in range(config.input_tabs):
+        components = []
+        for c in range(config.components_per_tab):
+            smiles = rng.choice(SOLVENTS + REAGENTS) if t else random_smiles(rng)
+            components.append({
+                "identifiers": [{"type": "SMILES", "value": smiles}],
+                "reactionRole": ROLES[(t + c) % len(ROLES)],
+            })
+        inputs[f"m{t + 1}"] = {"components": components}
+    outcomes = []
+    for _ in range(config.outcomes):
+        products = []
+        for _ in range(config.products_per_outcome):
+            measurements = []
+            for m in range(config.measurements_per_product):
+                if m % 2 == 0:
+                    measurements.append({"type": "YIELD", "percentage": {"value": round(rng.uniform(1, 99), 1)}})
+                else:
+                    measurements.append({"type": "AMOUNT", "amount": {"mass": {"value": round(rng.uniform(1, 500), 1), "units": "MILLIGRAM"}}})
+            products.append({
+                "identifiers": [{"type": "SMILES", "value": random_smiles(rng)}],
+                "reactionRole": "PRODUCT",
+                "measurements": measurements,
+            })
+        outcomes.append({"products": products})
+    return {"reactionId": reaction_id, "inputs": inputs, "outcomes": outcomes}
+
+
+def measurement_display(measurement):
+    if "percentage" in measurement:
+        return f"{format_number(measurement['percentage']['value'])}%"
+    mass = measurement["amount"]["mass"]
+    return f"{format_number(mass['value'])} mg"
+
+
+def ord_page(title, body, script=""):
+    return f"""<!DOCTYPE html><html><head><meta charset="utf-8"><title>{escape(title)}</title>
+<style>.modal{{position:fixed;top:10%;left:10%;background:#fff;border:1px solid #000;padding:1em}}
+.button,.tab,.close,.word{{cursor:pointer;display:inline-block;padding:2px 6px}}</style></head>
+<body><nav><a href="/browse">Browse</a></nav>{body}<script>{script}</script></body></html>"""
+
+
+PAGINATION_HTML = """<div class="select"><select id="pagination">
+<option value="10">10</option><option value="100" selected>100</option></select></div>"""
+
+
+def ord_home():
+    return ord_page("ORD", "<h1>Open Reaction Database (stand-in)</h1>")
+
+
+def ord_browse(config, page):
+    page = max(1, min(page, config.ord_pages))
+    links = "".join(
+        f'<div class="row"><a href="/dataset/{ord_dataset_id(page, d)}">{ord_dataset_id(page, d)}</a>'
+        f'<div class="col size">{config.reactions_per_dataset}</div></div>'
+        for d in range(config.datasets_per_page)
+    )
+    disabled = " disabled" if page >= config.ord_pages else ""
+    body = f"""<h1>Browse</h1>{links}{PAGINATION_HTML}
+<div class="paginav"><div class="button word selected">{page}</div></div>
+<div class="next paginav"><span class="word{disabled}" onclick="if(!this.classList.contains('disabled'))location.href='/browse?page={page + 1}'">Next</span></div>"""
+    return ord_page("Browse", body)
+
+
+def ord_dataset(config, dataset_id):
+    rows = "".join(
+        f'<div class="row"><div class="col full"><a href="/id/{ord_reaction_id(dataset_id, r)}">View Full Details</a></div></div>'
+        for r in range(config.reactions_per_dataset)
+    )
+    return ord_page(dataset_id, f'<div id="overview"><h1>{dataset_id}</h1></div>{rows}{PAGINATION_HTML}')
+
+
+# Renders the detail page client-side from the embedded record, like the real app:
+# tab clicks rebuild the button list (old buttons go stale) and raw buttons open a
+# modal with <pre> blocks that div.close removes again.
+ORD_DETAIL_JS = """
+var record = JSON.parse(document.getElementById('record').textContent);
+var tabNames = Object.keys(record.inputs);
+function openModal(compound) {
+    var modal = document.createElement('div');
+    modal.className = 'modal';
+    var data = document.createElement('div');
+    data.className = 'data';
+    var ids = document.createElement('pre');
+    ids.textContent = 'identifiers: ' + JSON.stringify(compound.identifiers, null, 2);
+    var role = document.createElement('pre');
+    role.textContent = 'reaction_role: ' + compound.reactionRole;
+    data.appendChild(ids); data.appendChild(role);
+    var close = document.createElement('div');
+    close.className = 'close';
+    close.textContent = 'close';
+    close.onclick = function () { modal.remove(); };
+    modal.appendChild(data); modal.appendChild(close);
+    setTimeout(function () { document.body.appendChild(modal); }, 30);
+}
+function showTab(name) {
+    document.querySelectorAll('#inputs .tabs .tab').forEach(function (t) {
+        t.className = t.textContent === name ? 'tab selected' : 'tab';
+    });
+    var content = document.getElementById('input-content');
+    content.innerHTML = '';
+    record.inputs[name].components.forEach(function (compound) {
+        var btn = document.createElement('div');
+        btn.className = 'button';
+        btn.textContent = 'raw';
+        btn.onclick = function () { openModal(compound); };
+        content.appendChild(btn);
+    });
+}
+function render() {
+    var tabs = document.querySelector('#inputs .tabs');
+    tabNames.forEach(function (name) {
+        var t = document.createElement('div');
+        t.className = 'tab';
+        t.textContent = name;
+        t.onclick = function () { setTimeout(function () { showTab(name); }, 30); };
+        tabs.appendChild(t);
+    });
+    showTab(tabNames[0]);
+    var outcomes = document.getElementById('outcomes');
+    record.outcomes.forEach(function (outcome) {
+        var view = document.createElement('div');
+        view.className = 'outcomes-view';
+        outcome.products.forEach(function (product) {
+            var cv = document.createElement('div');
+            cv.className = 'compound-view';
+            cv.innerHTML = '<div class="raw"><div class="button">raw</div></div>';
+            cv.querySelector('.button').onclick = function () { openModal(product); };
+            view.appendChild(cv);
+            if (!product.measurements.length) return;
+            var table = document.createElement('div');
+            table.className = 'measurements';
+            product.measurements.forEach(function (m) {
+                var cells = [m.type, 'analysis', m.display, '', 'false'];
+                cells.forEach(function (text) {
+                    var cell = document.createElement('div');
+                    cell.className = 'value';
+                    cell.textContent = text;
+                    table.appendChild(cell);
+                });
+            });
+            view.appendChild(table);
+        });
+        outcomes.appendChild(view);
+    });
+}
+setTimeout(render, 50);
+"""
+
+
+def ord_detail(config, reaction_id):
+    record = ord_reaction_record(config, reaction_id)
+    for outcome in record["outcomes"]:
+        for product in outcome["products"]:
+            for measurement in product["measurements"]:
+                measurement["display"] = measurement_display(measurement)
+    # "</" would end the script element early; "<\/" is the same string to JSON.
+    embedded = json.dumps(record).replace("</", "<\\/")
+    body = f"""<h1>{reaction_id}</h1>
+<div id="inputs"><div class="tabs"></div><div id="input-content"></div></div>
+<div id="outcomes"></div>
+<script type="application/json" id="record">{embedded}</script>"""
+    return ord_page(reaction_id, body, ORD_DETAIL_JS)
+
+
+# ---------------------------------------------------------------- CRD ----
+
+def crd_set_name(index):
+    return f"Bench Author {index} et al. Org. Lett. 20{10 + index % 15}"
+
+
+def crd_archive(config):
+    items = "".join(
+        f'<li>{escape(crd_set_name(s))} <a href="/data/reaction/{s}?page=1">reaction data</a> | <a href="#doi">DOI</a></li>'
+        for s in range(config.crd_sets)
+    )
+    return f"<!DOCTYPE html><html><body><h1>Archive</h1><ul>{items}</ul></body></html>"
+
+
+def crd_reaction_page(config, set_index, page):
+    rng = random.Random(f"{config.seed}:crd:{set_index}:{page}")
+    buttons = []
+    for _ in range(config.crd_reactions_per_page):
+        smiles = f"{random_smiles(rng)}.{random_smiles(rng)}>{rng.choice(SOLVENTS)}.{rng.choice(REAGENTS)}>{random_smiles(rng)}"
+        buttons.append(
+            f'<div class="reaction"><button class="btn btn-outline-success btn-sm" data-toggle="modal" '
+            f'data-target="#smiles" data-reaction-smiles="{escape(smiles)}">Smiles</button></div>'
+        )
+    total = config.crd_reactions_per_page
+    next_link = f'<a href="/data/reaction/{set_index}?page={page + 1}">Next</a>' if page < config.crd_pages_per_set else ""
+    return f"""<!DOCTYPE html><html><body>
+<button class="btn btn-info">Results {total}</button>
+{''.join(buttons)}
+<nav>{next_link}</nav>
+<div class="modal" id="smiles" style="display:none"><button class="close">x</button><div class="modal-body"></div></div>
+<script>
+document.querySelectorAll('button[data-reaction-smiles]').forEach(function (b) {{
+    b.onclick = function () {{
+        document.querySelector('#smiles .modal-body').textContent = b.getAttribute('data-reaction-smiles');
+        document.getElementById('smiles').style.display = 'block';
+    }};
+}});
+document.querySelector('#smiles .close').onclick = function () {{ document.getElementById('smiles').style.display = 'none'; }};
+</script></body></html>"""
+
+
+# ------------------------------------------------------------- server ----
+
+def make_handler(config):
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def send_body(self, body, content_type="text/html; charset=utf-8", status=200):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if config.latency_ms:
+                time.sleep(config.latency_ms / 1000)
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            parts = [p for p in url.path.split("/") if p]
+            page = int(query.get("page", ["1"])[0])
+            if not parts:
+                return self.send_body(ord_home())
+            if parts == ["browse"]:
+                return self.send_body(ord_browse(config, page))
+            if len(parts) == 2 and parts[0] == "dataset":
+                return self.send_body(ord_dataset(config, parts[1]))
+            if len(parts) == 2 and parts[0] == "id":
+                return self.send_body(ord_detail(config, parts[1]))
+            if len(parts) == 3 and parts[:2] == ["api", "reaction"]:
+                return self.send_body(json.dumps(ord_reaction_record(config, parts[2])), "application/json")
+            if parts == ["archive"]:
+                return self.send_body(crd_archive(config))
+            if len(parts) == 3 and parts[:2] == ["data", "reaction"]:
+                return self.send_body(crd_reaction_page(config, int(parts[2]), page))
+            return self.send_body("not found", "text/plain", 404)
+
+    return StandInHandler
+
+
+def start_server(config, host="127.0.0.1", port=0):
+    # Returns (server, base_url); the server runs on a daemon thread until server.shutdown().
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the synthetic ORD and CRD stand-in sites")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--ord-pages", type=int, default=2)
+    parser.add_argument("--datasets-per-page", type=int, default=3)
+    parser.add_argument("--reactions-per-dataset", type=int, default=5)
+    parser.add_argument("--measurements-per-product", type=int, default=4)
+    parser.add_argument("--crd-sets", type=int, default=4)
+    parser.add_argument("--crd-pages-per-set", type=int, default=3)
+    parser.add_argument("--crd-reactions-per-page", type=int, default=10)
+    args = parser.parse_args()
+    config = SiteConfig(
+        ord_pages=args.ord_pages, datasets_per_page=args.datasets_per_page,
+        reactions_per_dataset=args.reactions_per_dataset, measurements_per_product=args.measurements_per_product,
+        crd_sets=args.crd_sets, crd_pages_per_set=args.crd_pages_per_set,
+        crd_reactions_per_page=args.crd_reactions_per_page, latency_ms=args.latency_ms,
+    )
+    server, base_url = start_server(config, port=args.port)
+    print(f"Stand-in sites running at {base_url} (ORD: /, CRD: /archive). Ctrl+C to stop.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
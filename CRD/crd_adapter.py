@@ -0,0 +1,198 @@
+import asyncio
+import os
+import sys
+
+from crd_parse import parse_archive, parse_reaction_page, csv_rows_for, safe_filename_for, CSV_HEADER
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Scraper_Helpers.crawl_ledger import listing_digest
+from Scraper_Helpers.engine import no_browser
+from Scraper_Helpers.http_fetch import fetch_text
+from Scraper_Helpers.instrumentation import log, phase
+from Scraper_Helpers.molecule_dictionary import get_molecules, encode_header
+from Scraper_Helpers.row_sink import CsvRowSink
+from Scraper_Helpers.scheduler import navigation, navigation_async
+from Scraper_Helpers.snapshot_cache import get_snapshots, save_snapshot
+
+BASE_URL = "https://kmt.vander-lingen.nl"
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) CRD-scraper"
+
+
+class CrdColumnarSink:
+    # Drop-in for CsvRowSink that sends a reaction set's rows to the crawl-wide ColumnarStore.
+    # The set is the store's unit: its rows are held until finalize(), which replaces
+    # whatever an earlier crawl stored for the set; abort() drops them.
+    def __init__(self, store, dataset_id, molecules=None):
+        self.store = store
+        self.dataset_id = dataset_id
+        self.molecules = molecules
+        self.rows = []
+        self.rows_written = 0
+
+    def write_rows(self, rows):
+        for row_type, smiles in rows:
+            if self.molecules is not None:
+                smiles = self.molecules.shared(smiles)
+            self.rows.append({"row_index": self.rows_written, "type": row_type, "smiles": smiles})
+            self.rows_written += 1
+
+    def flush(self):
+        pass
+
+    def finalize(self):
+        self.store.replace_unit(self.dataset_id, self.dataset_id, {"crd_smiles": self.rows})
+        self.rows = []
+
+    def abort(self):
+        self.rows = []
+
+
+def open_crd_sink(out_dir, reaction_name, store=None):
+    # (sink, molecules for csv_rows_for): <out_dir>/<name>.csv, or the columnar store,
+    # which interns SMILES itself; a CSV gets Molecule_IDs from csv_rows_for instead.
+    molecules = get_molecules()
+    safe_filename = safe_filename_for(reaction_name)
+    if store is not None:
+        return CrdColumnarSink(store, safe_filename, molecules), None
+    csv_file = os.path.join(out_dir, f"{safe_filename}.csv")
+    return CsvRowSink(csv_file, header=encode_header(CSV_HEADER) if molecules is not None else CSV_HEADER), molecules
+
+
+def set_fingerprint(page):
+    # A reaction set's fingerprint: its result count and the SMILES on its first page.
+    return page["total_results"], listing_digest(page["smiles"])
+
+
+def retire_unlisted_sets(ledger, reaction_data_list):
+    # Archive entries seen before but missing now are marked removed (their CSVs stay on disk).
+    unlisted = ledger.listed_keys("crd_set") - {entry["name"] for entry in reaction_data_list}
+    for name in sorted(unlisted):
+        print(f"{name} is no longer in the archive -> marked removed")
+    ledger.mark_removed("crd_set", unlisted)
+
+
+# CRD for the shared engine (python -m Scraper_Helpers crd): the archive page
+# lists the reaction sets, and each set is one unit whose listing pages are
+# followed through their Next links. The SMILES sit in each button's
+# data-reaction-smiles attribute, so the same parser reads the HTML whether it
+# came over plain HTTP or, with browser=True, from a browser's page_source
+# (the pages are server-rendered; no modal has to be opened). Over plain HTTP
+# the engine runs scrape_async instead, as asyncio tasks on one event loop.
+class CrdAdapter:
+    name = "crd"
+    base_url = BASE_URL
+    unit_kind = "crd_set"
+    ledger_file = "crd_ledger.sqlite"
+    metrics_file = "crd_metrics.jsonl"
+
+    def __init__(self, browser=False):
+        self.needs_browser = browser
+
+    def prepare(self, engine):
+        # A refresh re-checks every finished set; unchanged ones are skipped by fingerprint.
+        if engine.refresh:
+            engine.ledger.reset([self.unit_kind])
+
+    def fetch(self, get_driver, url):
+        if not self.needs_browser:
+            with navigation(), phase("http_fetch"):
+                return fetch_text(url, {"User-Agent": USER_AGENT})
+        driver = get_driver()
+        with phase("page_load"), navigation():
+            driver.get(url)
+        return driver.page_source
+
+    def load_page(self, get_driver, url, raw_pages=None):
+        # The parsed reaction page; raw_pages collects the HTML for a snapshot.
+        html = self.fetch(get_driver, url)
+        if raw_pages is not None:
+            raw_pages.append({"url": url, "html": html})
+        return parse_reaction_page(html, url)
+
+    async def fetch_async(self, url):
+        # Paced on the event loop; only the blocking read itself runs in a thread.
+        async with navigation_async():
+            with phase("http_fetch"):
+                return await asyncio.to_thread(fetch_text, url, {"User-Agent": USER_AGENT})
+
+    async def load_page_async(self, url, raw_pages=None):
+        html = await self.fetch_async(url)
+        if raw_pages is not None:
+            raw_pages.append({"url": url, "html": html})
+        return parse_reaction_page(html, url)
+
+    def discover(self, engine):
+        archive_url = engine.base_url.rstrip("/") + "/archive"
+        get_driver = engine.main_session.get_driver if self.needs_browser else no_browser
+        reaction_data_list = parse_archive(self.fetch(get_driver, archive_url), archive_url)
+        log(f"Found {len(reaction_data_list)} reaction data entries")
+        retire_unlisted_sets(engine.ledger, reaction_data_list)
+        engine.ledger.discover_many(self.unit_kind, [(entry["name"], entry["url"]) for entry in reaction_data_list])
+
+    def unchanged(self, engine, reaction_name, fingerprint):
+        csv_file = os.path.join(engine.out_dir, f"{safe_filename_for(reaction_name)}.csv")
+        if engine.refresh and engine.ledger.fingerprint(self.unit_kind, reaction_name) == fingerprint \
+                and (engine.store is not None or os.path.exists(csv_file)):
+            log(f"{reaction_name}: unchanged ({fingerprint[0]} results), skipped")
+            return True
+        return False
+
+    def write_page(self, sink, page, csv_molecules):
+        # One listing page's rows; returns the Next page's URL, if any.
+        for smile_data in page["smiles"]:
+            sink.write_rows(csv_rows_for(smile_data.strip(), csv_molecules))
+        sink.flush()
+        return page["next_url"]
+
+    def publish(self, engine, unit, sink, fingerprint, raw_pages, pages):
+        with phase("csv_write"):
+            sink.finalize()
+        if raw_pages is not None:
+            save_snapshot("crd", unit.url, {"format": "crd_pages", "name": unit.key, "url": unit.url, "pages": raw_pages})
+        engine.ledger.record_fingerprint(self.unit_kind, unit.key, *fingerprint)
+        log(f"{unit.key}: {pages} pages, saved {sink.rows_written} reactions")
+
+    def scrape(self, get_driver, engine, unit, prefetcher=None):
+        raw_pages = [] if get_snapshots() is not None else None
+        page = self.load_page(get_driver, unit.url, raw_pages)
+        fingerprint = set_fingerprint(page)
+        if self.unchanged(engine, unit.key, fingerprint):
+            return
+
+        # Pages are parsed as they arrive; the CSV (and snapshot) only appear once the last page is in,
+        # so a set cut short by a failed Next page publishes nothing.
+        sink, csv_molecules = open_crd_sink(engine.out_dir, unit.key, engine.store)
+        pages = 0
+        try:
+            while page["total_results"]:
+                pages += 1
+                next_url = self.write_page(sink, page, csv_molecules)
+                if not next_url:
+                    break
+                page = self.load_page(get_driver, next_url, raw_pages)
+        except BaseException:
+            sink.abort()
+            raise
+        self.publish(engine, unit, sink, fingerprint, raw_pages, pages)
+
+    async def scrape_async(self, engine, unit):
+        # scrape() over plain HTTP, awaiting each page instead of blocking a worker thread on it.
+        raw_pages = [] if get_snapshots() is not None else None
+        page = await self.load_page_async(unit.url, raw_pages)
+        fingerprint = set_fingerprint(page)
+        if self.unchanged(engine, unit.key, fingerprint):
+            return
+
+        sink, csv_molecules = open_crd_sink(engine.out_dir, unit.key, engine.store)
+        pages = 0
+        try:
+            while page["total_results"]:
+                pages += 1
+                next_url = self.write_page(sink, page, csv_molecules)
+                if not next_url:
+                    break
+                page = await self.load_page_async(next_url, raw_pages)
+        except BaseException:
+            sink.abort()
+            raise
+        self.publish(engine, unit, sink, fingerprint, raw_pages, pages)
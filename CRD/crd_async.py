@@ -0,0 +1,56 @@
+import argparse
+import time
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Scraper_Helpers.engine import ScrapeEngine
+from Scraper_Helpers.instrumentation import set_verbose
+from Scraper_Helpers.scheduler import MAX_RATE
+from crd_adapter import CrdAdapter, BASE_URL
+
+# Browser-free crawl of kmt.vander-lingen.nl: the SMILES string is already in
+# each button's data-reaction-smiles attribute, so the listing HTML is all we
+# need. This is the shared engine with the CRD adapter over plain HTTP, which
+# runs on asyncio: `concurrency` reaction sets are tasks on one event loop,
+# paced by the scheduler. Like main.py it scrapes every set on each run unless
+# --refresh (skip unchanged sets) or --resume is given.
+CONCURRENCY = 8
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl kmt.vander-lingen.nl reaction data over plain HTTP")
+    parser.add_argument("--base-url", default=BASE_URL, help="site root; point at a local stand-in for testing")
+    parser.add_argument("--out", default=None, help="directory for the per-reaction CSVs (default: this folder)")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="reaction sets crawled in parallel")
+    parser.add_argument("--max-rate", type=float, default=MAX_RATE, help="maximum requests per second")
+    parser.add_argument("--limit", type=int, default=None, help="only crawl the first N archive entries")
+    parser.add_argument("--output-backend", choices=["csv", "parquet"], default="csv",
+                        help="csv: one CSV per reaction set; parquet: one store under <out>/columnar")
+    parser.add_argument("--quiet", action="store_true", help="only print errors and the end-of-run summary")
+    parser.add_argument("--molecules", default=None,
+                        help="molecule dictionary (e.g. <out>/molecules.sqlite); CSVs then store Molecule_ID instead of SMILES")
+    parser.add_argument("--refresh", action="store_true",
+                        help="only re-crawl reaction sets whose result count or first page changed since the last run")
+    parser.add_argument("--resume", action="store_true", help="only crawl the sets an interrupted run did not finish")
+    parser.add_argument("--snapshots", default=None,
+                        help="save a compressed snapshot of each reaction set's pages here (e.g. <out>/snapshots); "
+                             "re-extract later with Scraper_Helpers/snapshot_replay.py")
+    args = parser.parse_args(argv)
+    set_verbose(not args.quiet)
+    out_dir = args.out or os.path.dirname(os.path.abspath(__file__))
+
+    started = time.time()
+    engine = ScrapeEngine(CrdAdapter(browser=False), out_dir, args.base_url, args.concurrency, args.max_rate, args.limit,
+                          args.output_backend, args.molecules, args.snapshots, refresh=args.refresh,
+                          rescrape=not args.resume)
+    try:
+        engine.run()
+    finally:
+        engine.close()
+    print(f"\n✓ Crawled {engine.counts['done']} reaction sets in {time.time() - started:.1f}s")
+    return 1 if engine.counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+import re
+
+CSV_HEADER = ["Type", "SMILES"]
+ROW_TYPE_ORDER = {"Reactant": 0, "Solvent/Reagent": 1, "Product": 2}
+SMILES_BUTTON_CLASSES = {"btn", "btn-outline-success", "btn-sm"}
+RESULTS_BUTTON_CLASSES = {"btn", "btn-info"}
+
+
+def split_reaction_smiles(smile_data):
+    # Split into Reactant, Solvent/Reagent, Product
+    parts = smile_data.split('>')
+    reactant = parts[0].strip() if len(parts) > 0 else ''
+    solvent = parts[1].strip() if len(parts) > 1 else ''
+    product = parts[2].strip() if len(parts) > 2 else ''
+
+    rows = []
+    if reactant:
+        rows.append({"type": "Reactant", "smiles": reactant})
+    if solvent:
+        rows.append({"type": "Solvent/Reagent", "smiles": solvent})
+    if product:
+        rows.append({"type": "Product", "smiles": product})
+    return rows
+
+
+def csv_rows_for(smile_data, molecules=None):
+    # [Type, SMILES] rows, or [Type, Molecule_ID] when a molecule dictionary is given
+    if molecules is None:
+        return [[item["type"], item["smiles"]] for item in split_reaction_smiles(smile_data)]
+    return [[item["type"], molecules.intern(item["smiles"])] for item in split_reaction_smiles(smile_data)]
+
+
+def group_reaction_rows(rows):
+    # A CSV holds Reactant / Solvent/Reagent / Product rows per reaction, in that
+    # order; a type that does not come later than the previous one starts the next reaction.
+    components, last_order = [], -1
+    for row in rows:
+        order = ROW_TYPE_ORDER.get(row[0], 1)
+        if components and order <= last_order:
+            yield components
+            components = []
+        components.append(row)
+        last_order = order
+    if components:
+        yield components
+
+
+def safe_filename_for(reaction_name):
+    # Sanitize filename (remove invalid characters)
+    return re.sub(r'[<>:"/\\|?*]', '_', reaction_name)
+
+
+def collapse_whitespace(text):
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class _ArchiveParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.items = []
+        self.li_stack = []
+        self.link_href = None
+        self.link_text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "li":
+            self.li_stack.append({"text": [], "url": None})
+        elif tag == "a" and self.li_stack:
+            self.link_href = dict(attrs).get("href")
+            self.link_text = []
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self.link_href is not None:
+            if self.li_stack and collapse_whitespace("".join(self.link_text)) == "reaction data" and self.li_stack[-1]["url"] is None:
+                self.li_stack[-1]["url"] = self.link_href
+            self.link_href = None
+        elif tag == "li" and self.li_stack:
+            item = self.li_stack.pop()
+            text = "".join(item["text"])
+            if self.li_stack:
+                self.li_stack[-1]["text"].append(text)
+            if item["url"]:
+                self.items.append({"text": text, "url": item["url"]})
+
+    def handle_data(self, data):
+        if self.li_stack:
+            self.li_stack[-1]["text"].append(data)
+        if self.link_href is not None:
+            self.link_text.append(data)
+
+
+def parse_archive(html, base_url):
+    parser = _ArchiveParser()
+    parser.feed(html)
+    reaction_data_list = []
+    for item in parser.items:
+        # Remove "reaction data | DOI" part to get just the name
+        reaction_name = collapse_whitespace(item["text"]).split("reaction data")[0].strip()
+        reaction_data_list.append({"name": reaction_name, "url": urljoin(base_url, item["url"])})
+    return reaction_data_list
+
+
+class _ReactionPageParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.smiles = []
+        self.results_text = None
+        self.in_results = False
+        self.results_parts = []
+        self.next_href = None
+        self.link_href = None
+        self.link_text = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = set((attrs.get("class") or "").split())
+        if tag == "button":
+            if SMILES_BUTTON_CLASSES <= classes and attrs.get("data-toggle") == "modal" and "data-reaction-smiles" in attrs:
+                self.smiles.append(attrs["data-reaction-smiles"] or "")
+            elif RESULTS_BUTTON_CLASSES <= classes and self.results_text is None:
+                self.in_results = True
+                self.results_parts = []
+        elif tag == "a":
+            self.link_href = attrs.get("href")
+            self.link_text = []
+
+    def handle_endtag(self, tag):
+        if tag == "button" and self.in_results:
+            self.results_text = collapse_whitespace("".join(self.results_parts))
+            self.in_results = False
+        elif tag == "a" and self.link_href is not None:
+            if self.next_href is None and collapse_whitespace("".join(self.link_text)) == "Next":
+                self.next_href = self.link_href
+            self.link_href = None
+
+    def handle_data(self, data):
+        if self.in_results:
+            self.results_parts.append(data)
+        if self.link_href is not None:
+            self.link_text.append(data)
+
+
+def parse_reaction_page(html, page_url):
+    parser = _ReactionPageParser()
+    parser.feed(html)
+    try:
+        total_results = int(parser.results_text.split()[-1])
+    except Exception:
+        total_results = 0
+    return {
+        "total_results": total_results,
+        "smiles": parser.smiles[:total_results],
+        "next_url": urljoin(page_url, parser.next_href) if parser.next_href else None,
+    }
@@ -0,0 +1,213 @@
+from sklearn.cluster import MiniBatchKMeans
+from functools import lru_cache
+import numpy as np
+import argparse
+import glob
+import json
+import zlib
+import csv
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [REPO_ROOT, os.path.join(REPO_ROOT, "ORD_SCRAPPER"), os.path.join(REPO_ROOT, "CRD")]
+from ord_records import read_ord_csv, reaction_csv_paths
+from crd_parse import group_reaction_rows
+from Scraper_Helpers.molecule_dictionary import MoleculeDictionary
+
+# The Lesson 9 K-Means workflow applied to the scraped reactions, sized for
+# data that does not fit in RAM:
+#   1. every reaction (ORD CSVs and/or CRD CSVs) becomes a hashed vector of
+#      role-tagged SMILES character n-grams, streamed in chunks to a float32
+#      file that is opened as a np.memmap;
+#   2. MiniBatchKMeans.partial_fit walks the memmap batch by batch;
+#   3. labels are assigned batch by batch and written next to the features
+#      (labels.csv, centroids.npy) so only one batch is ever in memory.
+N_FEATURES = 512
+NGRAM_SIZES = (2, 3, 4)
+BATCH_SIZE = 4096
+ROLE_NAMES = {"REACTANT": "reactant", "Reactant": "reactant", "PRODUCT": "product", "Product": "product",
+              "Products": "product"}
+
+
+# At most one batch worth of molecule vectors is cached: BATCH_SIZE * N_FEATURES * 4 bytes (8 MB).
+@lru_cache(maxsize=BATCH_SIZE)
+def molecule_vector(role, smiles, n_features=N_FEATURES):
+    # Signed feature hashing: a reagent repeated across nearby reactions is hashed once.
+    vector = np.zeros(n_features, dtype=np.float32)
+    for n in NGRAM_SIZES:
+        for i in range(len(smiles) - n + 1):
+            h = zlib.crc32(f"{role}:{smiles[i:i + n]}".encode("utf-8"))
+            vector[h % n_features] += -1.0 if h & 0x80000000 else 1.0
+    vector.flags.writeable = False
+    return vector
+
+
+def reaction_vector(components, n_features=N_FEATURES):
+    # components: [(role, smiles)] -> L2-normalised float32 vector
+    vector = np.zeros(n_features, dtype=np.float32)
+    for role, smiles in components:
+        if smiles:
+            vector += molecule_vector(ROLE_NAMES.get(role, "agent"), smiles, n_features)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def decoder(header, molecules):
+    # Reads either the identifier text or a Molecule_ID through the dictionary.
+    if "Molecule_ID" not in header:
+        return lambda cell: cell
+    if molecules is None:
+        raise ValueError("these CSVs store Molecule_ID; pass --molecules with the dictionary they were written with")
+    return lambda cell: molecules.text(cell) if cell else None
+
+
+def iter_ord_reactions(root, molecules=None):
+    for dataset_id, reaction_id, path in reaction_csv_paths(root):
+        components = []
+        for section, (header, rows) in read_ord_csv(path).items():
+            if section not in ("Inputs", "Products"):
+                continue
+            decode = decoder(header, molecules)
+            text_column = header.index("Molecule_ID" if "Molecule_ID" in header else "Identifiers")
+            role_column = header.index("Reaction_Role")
+            components.extend((row[role_column] or section, decode(row[text_column])) for row in rows)
+        yield ("ord", dataset_id, reaction_id), components
+
+
+def iter_crd_reactions(crd_dir, molecules=None):
+    for path in sorted(glob.glob(os.path.join(crd_dir, "*.csv"))):
+        reaction_set = os.path.splitext(os.path.basename(path))[0]
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header or header[0] != "Type":
+                continue
+            decode = decoder(header, molecules)
+            for index, rows in enumerate(group_reaction_rows(reader)):
+                yield ("crd", reaction_set, str(index)), [(row[0], decode(row[1])) for row in rows]
+
+
+def write_feature_chunks(chunks, out_dir, n_features):
+    # chunks: iterable of (rows, n_features) arrays -> read-only memmap over all of them
+    os.makedirs(out_dir, exist_ok=True)
+    rows = 0
+    with open(os.path.join(out_dir, "features.f32"), "wb") as f:
+        for chunk in chunks:
+            chunk = np.ascontiguousarray(chunk, dtype=np.float32)
+            f.write(chunk.tobytes())
+            rows += len(chunk)
+    with open(os.path.join(out_dir, "features.json"), "w", encoding="utf-8") as f:
+        json.dump({"rows": rows, "n_features": n_features, "dtype": "float32"}, f)
+    return open_features(out_dir)
+
+
+def open_features(out_dir):
+    with open(os.path.join(out_dir, "features.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    return np.memmap(os.path.join(out_dir, "features.f32"), dtype=meta["dtype"], mode="r",
+                     shape=(meta["rows"], meta["n_features"]))
+
+
+def featurize(reactions, out_dir, n_features=N_FEATURES, chunk_rows=BATCH_SIZE):
+    # Streams reactions to features.f32 and their keys to reactions.csv (same row order).
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "reactions.csv"), "w", newline="", encoding="utf-8") as keys_file:
+        writer = csv.writer(keys_file)
+        writer.writerow(["source", "dataset_id", "reaction_id"])
+
+        def chunks():
+            chunk = []
+            for key, components in reactions:
+                writer.writerow(key)
+                chunk.append(reaction_vector(components, n_features))
+                if len(chunk) >= chunk_rows:
+                    yield np.vstack(chunk)
+                    chunk = []
+            if chunk:
+                yield np.vstack(chunk)
+
+        return write_feature_chunks(chunks(), out_dir, n_features)
+
+
+def batch_starts(rows, batch_size):
+    return range(0, rows, batch_size)
+
+
+def fit_streaming(features, n_clusters, batch_size=BATCH_SIZE, epochs=3, random_state=42):
+    if len(features) < n_clusters:
+        raise ValueError(f"{len(features)} reactions cannot form {n_clusters} clusters")
+    km = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, random_state=random_state, n_init=3)
+    rng = np.random.default_rng(random_state)
+    starts = np.array(batch_starts(len(features), batch_size))
+    for _ in range(epochs):
+        for start in rng.permutation(starts):
+            batch = np.asarray(features[start:start + batch_size])
+            if not hasattr(km, "cluster_centers_") and len(batch) < n_clusters:
+                continue  # the first call needs at least n_clusters rows to initialise
+            km.partial_fit(batch)
+    return km
+
+
+def assign_streaming(km, features, batch_size=BATCH_SIZE):
+    # Labels for every row plus the total inertia, one batch at a time.
+    labels = np.empty(len(features), dtype=np.int32)
+    inertia = 0.0
+    centers = km.cluster_centers_
+    for start in batch_starts(len(features), batch_size):
+        batch = np.asarray(features[start:start + batch_size])
+        batch_labels = km.predict(batch)
+        labels[start:start + len(batch)] = batch_labels
+        inertia += float(((batch - centers[batch_labels]) ** 2).sum())
+    return labels, inertia
+
+
+def write_clusters(out_dir, labels, centers):
+    np.save(os.path.join(out_dir, "centroids.npy"), centers)
+    with open(os.path.join(out_dir, "reactions.csv"), newline="", encoding="utf-8") as keys_file, \
+            open(os.path.join(out_dir, "labels.csv"), "w", newline="", encoding="utf-8") as labels_file:
+        reader = csv.reader(keys_file)
+        writer = csv.writer(labels_file)
+        writer.writerow(next(reader) + ["cluster"])
+        for key, label in zip(reader, labels):
+            writer.writerow(key + [int(label)])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cluster scraped reactions with streaming K-Means")
+    parser.add_argument("--ord", default=None, help="ORD output directory (SCRAPPED_DATA)")
+    parser.add_argument("--crd", default=None, help="directory with the CRD reaction-set CSVs")
+    parser.add_argument("--molecules", default=None, help="molecule dictionary, if the CSVs store Molecule_ID")
+    parser.add_argument("--out", default="clusters", help="where features, labels.csv and centroids.npy go")
+    parser.add_argument("--clusters", type=int, default=8)
+    parser.add_argument("--features", type=int, default=N_FEATURES, help="hashed feature dimensions")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--epochs", type=int, default=3, help="passes over the memmap")
+    parser.add_argument("--reuse-features", action="store_true", help="cluster the features already in --out")
+    args = parser.parse_args()
+
+    if args.reuse_features:
+        features = open_features(args.out)
+    else:
+        if not args.ord and not args.crd:
+            parser.error("pass --ord and/or --crd")
+        molecules = MoleculeDictionary(args.molecules) if args.molecules else None
+
+        def reactions():
+            if args.ord:
+                yield from iter_ord_reactions(args.ord, molecules)
+            if args.crd:
+                yield from iter_crd_reactions(args.crd, molecules)
+
+        features = featurize(reactions(), args.out, args.features, args.batch_size)
+        if molecules is not None:
+            molecules.close()
+    print(f"{features.shape[0]} reactions x {features.shape[1]} features in {args.out}/features.f32")
+
+    km = fit_streaming(features, args.clusters, args.batch_size, args.epochs)
+    labels, inertia = assign_streaming(km, features, args.batch_size)
+    write_clusters(args.out, labels, km.cluster_centers_)
+    print(f"Inertia: {inertia:.2f}")
+    for cluster, size in enumerate(np.bincount(labels, minlength=args.clusters)):
+        print(f"  Group {cluster}: {size} reactions")
+    print(f"Labels in {args.out}/labels.csv, centroids in {args.out}/centroids.npy")
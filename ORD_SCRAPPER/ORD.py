@@ -1,93 +1,96 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
-from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
-import time
-import re
-import csv
+from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import os
+import sys
+import argparse
+import time
 
-def scrape_ord_details(driver, ord_url, dataset_dir):
-    wait = WebDriverWait(driver, 20)
-    driver.get(ord_url)
-    time.sleep(2)
-
-    inputs_scraped_data = []
-    products_scraped_data = []
-    measurements_scraped_data = []
-
-    def extract_identifiers_and_role(pre_elements):
-        identifiers_value = None
-        reaction_role_value = None
-        for pre in pre_elements:
-            pre_text = pre.text
-            if pre_text.startswith('identifiers:'):
-                match_val = re.search(r'"value":\s*"([^"]+)"', pre_text)
-                if match_val:
-                    identifiers_value = match_val.group(1)
-            elif pre_text.startswith('reaction_role:'):
-                match_role = re.match(r'reaction_role:\s*([^\s]+)', pre_text)
-                if match_role:
-                    reaction_role_value = match_role.group(1)
-        return identifiers_value, reaction_role_value
-
-    def extract_measurement_type_value(measurements_section):
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Scraper_Helpers import waits
+from Scraper_Helpers.crawl_ledger import listing_digest, FAILED
+from Scraper_Helpers.driver_session import MAX_COMMANDS, MAX_BROWSER_MB
+from Scraper_Helpers.instrumentation import set_verbose, log, phase, record, add_time
+from Scraper_Helpers.scheduler import navigation, MAX_RATE
+from Scraper_Helpers.snapshot_cache import get_snapshots, save_snapshot
+from ord_records import (
+    extract_identifiers_and_role,
+    reaction_id_from_url,
+    dataset_id_from_url,
+    measurement_pairs_from_cells,
+    open_ord_sink,
+)
+import ord_http
+import ord_batch_js
+
+def scrape_ord_details(driver, ord_url, dataset_dir, batched=True, store=None, preloaded=False):
+    # preloaded: the driver is already on ord_url's tab (loaded in the background by ReactionPrefetcher)
+    wait = WebDriverWait(driver, waits.WAIT_CEILING)
+    if not preloaded:
+        with phase("page_load"), navigation():
+            driver.get(ord_url)
+
+    # Rows stream straight to SCRAPPED_DATA/DATASET_LINK/ord-xxxx.csv(.part), or to the columnar store
+    sink = open_ord_sink(ord_url, dataset_dir, store)
+    # The modal <pre> texts and measurement cells as read, saved with the DOM when --snapshots is on
+    raw = {"format": "ord_dom", "url": ord_url, "inputs": [], "products": [], "measurements": []}
+
+    def extract_measurement_type_value(measurements_section, block):
         results = []
         try:
             value_cells = measurements_section.find_elements(By.CSS_SELECTOR, 'div.value')
-            for i in range(0, len(value_cells), 5):
-                if i + 2 < len(value_cells):
-                    t = value_cells[i].text.strip()
-                    v = value_cells[i + 2].text.strip()
-                    if t:
-                        results.append({"type": t, "value": v})
+            block["cells"] = [cell.text for cell in value_cells]
+            results = measurement_pairs_from_cells(block["cells"])
         except Exception as e:
             print(f"Error extracting (type, value) from measurements: {e}")
         return results
 
     try:
-        # Inputs Section
-        inputs_section = wait.until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div#inputs"))
-        )
+        # Inputs Section (a timeout here is reported to the scheduler)
+        inputs_section = waits.wait_until(driver, EC.presence_of_element_located((By.CSS_SELECTOR, "div#inputs")))
         driver.execute_script("arguments[0].scrollIntoView();", inputs_section)
-        time.sleep(2)
         tabs = wait.until(
             EC.presence_of_all_elements_located((By.CSS_SELECTOR, "#inputs .tabs .tab"))
         )
-        print(f"Found {len(tabs)} tabs inside Inputs section\n")
+        log(f"Found {len(tabs)} tabs inside Inputs section\n")
+
+        batched_inputs = ord_batch_js.collect_inputs(driver, raw) if batched else None
+        if batched_inputs is not None:
+            sink.add_inputs(batched_inputs)
+            tabs = []
 
         for tab in tabs:
             tab_name = tab.text.strip()
-            print(f"Clicking tab → {tab_name}")
-            driver.execute_script("arguments[0].click();", tab)
-            time.sleep(2)
+            log(f"Clicking tab → {tab_name}")
+            with phase("tab"):
+                previous_buttons = inputs_section.find_elements(By.CSS_SELECTOR, "div.button")
+                already_selected = waits.tab_is_selected(tab)
+                driver.execute_script("arguments[0].click();", tab)
+                if not already_selected:
+                    waits.wait_quietly(driver, waits.tab_content_swapped(tab, previous_buttons[0] if previous_buttons else None))
 
             input_buttons = inputs_section.find_elements(By.CSS_SELECTOR, "div.button")
-            print(f"Found {len(input_buttons)} in tab {tab_name}.")
+            log(f"Found {len(input_buttons)} in tab {tab_name}.")
             for idx, btn in enumerate(input_buttons):
+                modal_started = time.perf_counter()
                 try:
                     driver.execute_script("arguments[0].scrollIntoView();", btn)
                     try:
-                        print(f"Clicking Inputs#{idx+1}")
+                        log(f"Clicking Inputs#{idx+1}")
                         driver.execute_script("arguments[0].click();", btn)
                     except Exception as click_error:
                         print(f"Cannot click Inputs raw button #{idx+1} in tab {tab_name}: {click_error}")
                         continue
 
-                    time.sleep(1.5)
                     try:
-                        data_section = WebDriverWait(driver, 5).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, "div.data"))
-                        )
-                        pre_elements = data_section.find_elements(By.CSS_SELECTOR, "pre")
-                        identifiers_value, reaction_role_value = extract_identifiers_and_role(pre_elements)
-                        print(f"   Scraped identifiers value: {identifiers_value} | reaction_role: {reaction_role_value}")
-                        inputs_scraped_data.append({
+                        data_section = waits.wait_for_modal_open(driver, 5)
+                        pre_texts = [pre.text for pre in data_section.find_elements(By.CSS_SELECTOR, "pre")]
+                        raw["inputs"].append({"tab": tab_name, "raw_button_index": idx + 1, "pre_texts": pre_texts})
+                        identifiers_value, reaction_role_value = extract_identifiers_and_role(pre_texts)
+                        log(f"   Scraped identifiers value: {identifiers_value} | reaction_role: {reaction_role_value}")
+                        sink.add_input({
                             "tab": tab_name,
                             "raw_button_index": idx + 1,
                             "identifiers_value": identifiers_value,
@@ -95,29 +98,33 @@ def scrape_ord_details(driver, ord_url, dataset_dir):
                         })
                     except Exception as dscrape:
                         print(f"Could not scrape data section for raw button #{idx+1} in tab {tab_name}: {dscrape}")
-                    time.sleep(1.5)
                     try:
-                        close_btn = WebDriverWait(driver, 5).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, "div.close"))
-                        )
+                        close_btn = waits.wait_until(driver, EC.element_to_be_clickable(waits.MODAL_CLOSE), 5)
                         driver.execute_script("arguments[0].click();", close_btn)
-                        time.sleep(1)
+                        waits.wait_for_modal_closed(driver, 5)
                     except Exception as e:
                         print(f"Could not click Inputs close button #{idx+1}: {e}")
                 except Exception as e:
                     print(f"Could not process Inputs raw button #{idx+1} in tab {tab_name}: {e}")
+                add_time("modal", time.perf_counter() - modal_started)
 
-        print("\nFinished cycling through all input tabs.")
+        log("\nFinished cycling through all input tabs.")
 
         # Outcomes Section
         outcomes_section = wait.until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "div#outcomes"))
         )
         driver.execute_script("arguments[0].scrollIntoView();", outcomes_section)
-        time.sleep(2)
-        print("Stayed on Outcomes section for 2 seconds.\n")
+        log("Reached Outcomes section.\n")
 
-        outcomes_views = outcomes_section.find_elements(By.CSS_SELECTOR, "div.outcomes-view")
+        batched_outcomes = ord_batch_js.collect_outcomes(driver, raw) if batched else None
+        if batched_outcomes is not None:
+            sink.add_products(batched_outcomes[0])
+            sink.add_measurement_blocks(batched_outcomes[1])
+            outcomes_views = []
+        else:
+            raw["products"], raw["measurements"] = [], []
+            outcomes_views = outcomes_section.find_elements(By.CSS_SELECTOR, "div.outcomes-view")
         for outcome_idx, outcome_view in enumerate(outcomes_views):
             # PRODUCTS RAW BUTTONS
             try:
@@ -126,6 +133,7 @@ def scrape_ord_details(driver, ord_url, dataset_dir):
                     try:
                         prod_raw_btns = compound_view.find_elements(By.CSS_SELECTOR, ".raw .button")
                         for raw_btn_idx, prod_raw_btn in enumerate(prod_raw_btns):
+                            modal_started = time.perf_counter()
                             driver.execute_script("arguments[0].scrollIntoView();", prod_raw_btn)
                             try:
                                 driver.execute_script("arguments[0].click();", prod_raw_btn)
@@ -133,15 +141,13 @@ def scrape_ord_details(driver, ord_url, dataset_dir):
                                 print(f"Cannot click Product raw button Outcome {outcome_idx+1} Product {prod_idx+1}: {click_error}")
                                 continue
 
-                            time.sleep(1.2)
                             try:
-                                data_section = WebDriverWait(driver, 5).until(
-                                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.data"))
-                                )
-                                pre_elements = data_section.find_elements(By.CSS_SELECTOR, "pre")
-                                identifiers_value, reaction_role_value = extract_identifiers_and_role(pre_elements)
-                                print(f"   [Products] identifiers: {identifiers_value} | reaction_role: {reaction_role_value}")
-                                products_scraped_data.append({
+                                data_section = waits.wait_for_modal_open(driver, 5)
+                                pre_texts = [pre.text for pre in data_section.find_elements(By.CSS_SELECTOR, "pre")]
+                                raw["products"].append({"outcome_index": outcome_idx + 1, "product_index": prod_idx + 1, "pre_texts": pre_texts})
+                                identifiers_value, reaction_role_value = extract_identifiers_and_role(pre_texts)
+                                log(f"   [Products] identifiers: {identifiers_value} | reaction_role: {reaction_role_value}")
+                                sink.add_product({
                                     "outcome_index": outcome_idx + 1,
                                     "product_index": prod_idx + 1,
                                     "identifiers_value": identifiers_value,
@@ -149,15 +155,13 @@ def scrape_ord_details(driver, ord_url, dataset_dir):
                                 })
                             except Exception as dscrape:
                                 print(f"Could not scrape product data for Outcome {outcome_idx+1} Product {prod_idx+1}: {dscrape}")
-                            time.sleep(1)
                             try:
-                                close_btn = WebDriverWait(driver, 5).until(
-                                    EC.element_to_be_clickable((By.CSS_SELECTOR, "div.close"))
-                                )
+                                close_btn = waits.wait_until(driver, EC.element_to_be_clickable(waits.MODAL_CLOSE), 5)
                                 driver.execute_script("arguments[0].click();", close_btn)
-                                time.sleep(0.3)
+                                waits.wait_for_modal_closed(driver, 5)
                             except Exception as e:
                                 print(f"Could not close Products raw for Outcome {outcome_idx+1} Product {prod_idx+1}: {e}")
+                            add_time("modal", time.perf_counter() - modal_started)
                     except Exception as e:
                         print(f"Error locating/clicking Product raw button: {e}")
             except Exception as e:
@@ -167,13 +171,15 @@ def scrape_ord_details(driver, ord_url, dataset_dir):
             try:
                 measurements_sections = outcome_view.find_elements(By.CSS_SELECTOR, ".measurements")
                 for meas_idx, m_section in enumerate(measurements_sections):
-                    pairs = extract_measurement_type_value(m_section)
-                    print(f"Outcome# {outcome_idx+1}, Measurement block #{meas_idx+1}:")
+                    block = {"outcome_index": outcome_idx + 1, "measurement_index": meas_idx + 1, "cells": []}
+                    raw["measurements"].append(block)
+                    pairs = extract_measurement_type_value(m_section, block)
+                    log(f"Outcome# {outcome_idx+1}, Measurement block #{meas_idx+1}:")
                     for p in pairs:
-                        print(f"   Type: {p['type']} | Value: {p['value']}")
-                    print(f"Finished printing all pairs for Outcome# {outcome_idx+1} Block# {meas_idx+1}")
-                    print(f"Total measurement pairs: {len(pairs)}\n")
-                    measurements_scraped_data.append({
+                        log(f"   Type: {p['type']} | Value: {p['value']}")
+                    log(f"Finished printing all pairs for Outcome# {outcome_idx+1} Block# {meas_idx+1}")
+                    log(f"Total measurement pairs: {len(pairs)}\n")
+                    sink.add_measurements({
                         "outcome_index": outcome_idx + 1,
                         "measurement_index": meas_idx + 1,
                         "pairs": pairs
@@ -181,247 +187,392 @@ def scrape_ord_details(driver, ord_url, dataset_dir):
             except Exception as e:
                 print(f"Error extracting (type, value) for Outcome {outcome_idx+1}: {e}")
 
-    finally:
-        pass
-
-    # Extract ORD identifier from URL for the filename
-    match = re.search(r'(ord-[\w\d]+)', ord_url)
-    if match:
-        csv_basename = f"{match.group(1)}.csv"
-    else:
-        csv_basename = "scraped_output.csv"
-
-    # Save in SCRAPPED_DATA/DATASET_LINK/ord-xxxx.csv
-    os.makedirs(dataset_dir, exist_ok=True)
-    csv_path = os.path.join(dataset_dir, csv_basename)
-
-    with open(csv_path, "w", newline='', encoding="utf-8") as csvfile:
-        writer = csv.writer(csvfile, delimiter=',')
-        # Inputs header and data
-        writer.writerow(["Section", "Tab", "Raw_Index", "Identifiers", "Reaction_Role"])
-        for entry in inputs_scraped_data:
-            writer.writerow([
-                "Inputs",
-                entry['tab'],
-                entry['raw_button_index'],
-                entry['identifiers_value'],
-                entry['reaction_role']
-            ])
-        # Products header and data
-        writer.writerow([])
-        writer.writerow(["Section", "Outcome_Index", "Product_Index", "Identifiers", "Reaction_Role"])
-        for entry in products_scraped_data:
-            writer.writerow([
-                "Products",
-                entry['outcome_index'],
-                entry['product_index'],
-                entry['identifiers_value'],
-                entry['reaction_role']
-            ])
-        # Measurements header and data
-        writer.writerow([])
-        writer.writerow(["Section", "Outcome_Index", "Measurement_Block_Index", "Type", "Value"])
-        for entry in measurements_scraped_data:
-            for p in entry["pairs"]:
-                writer.writerow([
-                    "Measurements",
-                    entry['outcome_index'],
-                    entry['measurement_index'],
-                    p['type'],
-                    p['value']
-                ])
-    print(f"\nCSV saved as: {csv_path}")
-
-    print("\nScraped data from Inputs tabs:")
-    for entry in inputs_scraped_data:
-        print(f"Tab: {entry['tab']} | Raw#: {entry['raw_button_index']} | identifiers: {entry['identifiers_value']} | reaction_role: {entry['reaction_role']}")
-
-    print("\nScraped data from Outcomes → Products raw:")
-    for entry in products_scraped_data:
-        print(f"Outcome# {entry['outcome_index']} Product# {entry['product_index']} | identifiers: {entry['identifiers_value']} | reaction_role: {entry['reaction_role']}")
-
-    print("\nScraped data from Outcomes → Measurements:")
-    for entry in measurements_scraped_data:
-        print(f"Outcome# {entry['outcome_index']} Block# {entry['measurement_index']}:")
-        for p in entry["pairs"]:
-            print(f"   Type: {p['type']} | Value: {p['value']}")
-        print(f"Finished printing all pairs for Outcome# {entry['outcome_index']} Block# {entry['measurement_index']}")
-        print(f"Total measurement pairs: {len(entry['pairs'])}\n")
-
-def click_all_view_full_details_on_dataset(driver, dataset_dir):
-    driver.execute_script("window.scrollTo(0, 0);")
-    time.sleep(1)
-    a_links = driver.find_elements(By.CSS_SELECTOR, 'div.col.full > a[href^="/id/ord-"]')
-    print(f"Found {len(a_links)} full details links in this dataset page.")
-
-    original_window = driver.current_window_handle
+    except BaseException:
+        sink.abort()
+        raise
 
-    for idx, a_el in enumerate(a_links):
-        details_url = a_el.get_attribute('href')
-        if not details_url:
-            continue
-        driver.execute_script('window.open(arguments[0], "_blank");', details_url)
-        driver.switch_to.window(driver.window_handles[-1])
-        print(f"Opened full details link in new tab: {details_url}")
+    if get_snapshots() is not None:
+        with phase("snapshot"):
+            raw["html"] = driver.page_source
+            save_snapshot("ord", reaction_id_from_url(ord_url) or ord_url, raw, os.path.basename(os.path.normpath(dataset_dir)))
 
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div#inputs, div#outcomes, h1, h2"))
-            )
-            print(f"Full details page loaded for button #{idx+1}")
-        except TimeoutException:
-            print(f"Timeout: full details page did not load for button #{idx+1}")
+    with phase("csv_write"):
+        sink.finalize()
 
-        scrape_ord_details(driver, details_url, dataset_dir)
-        time.sleep(3)
+def try_fast_path(details_url, dataset_dir, store=None, prefetcher=None):
+    try:
+        reaction = prefetcher.reaction(details_url) if prefetcher is not None else None
+        ord_http.scrape_ord_details_http(details_url, dataset_dir, reaction, store)
+        return True
+    except Exception as e:
+        print(f"HTTP fast path failed for {details_url}, falling back to Selenium: {e}")
+        return False
 
-        driver.close()
-        driver.switch_to.window(original_window)
-        print(f"Returned to dataset page after clicking full details #{idx+1} of {len(a_links)}.")
+def already_done(ledger, kind, key):
+    if ledger is not None and ledger.is_done(kind, key):
+        log(f"Skipping {kind} {key} (already done in a previous run)")
+        return True
+    return False
 
-    print("Done clicking all View Full Details buttons in current dataset link!\n")
+def dataset_reaction_links(driver):
+    # [(reaction_id, details_url)] listed on the loaded dataset page
+    driver.execute_script("window.scrollTo(0, 0);")
+    a_links = driver.find_elements(By.CSS_SELECTOR, 'div.col.full > a[href^="/id/ord-"]')
+    details_urls = [a_el.get_attribute('href') for a_el in a_links]
+    return [(reaction_id_from_url(url) or url, url) for url in details_urls if url]
+
+def discover_dataset_reactions(driver, dataset_id, ledger):
+    # Records the dataset's /id/ord-... links in the frontier; nothing is scraped here.
+    # The link count + digest is the dataset's fingerprint: when it matches the
+    # last one there is nothing to do, otherwise new links become pending and
+    # links the dataset no longer lists are marked removed.
+    keyed_urls = dataset_reaction_links(driver)
+    fingerprint = (len(keyed_urls), listing_digest(key for key, _ in keyed_urls))
+    if ledger.fingerprint("dataset", dataset_id) == fingerprint:
+        log(f"{dataset_id} unchanged ({len(keyed_urls)} reactions).")
+        return len(keyed_urls)
+    added, removed = ledger.sync_listing("reaction", dataset_id, keyed_urls)
+    ledger.record_fingerprint("dataset", dataset_id, *fingerprint)
+    log(f"Found {len(keyed_urls)} full details links in {dataset_id} ({len(added)} new, {len(removed)} no longer listed).")
+    return len(keyed_urls)
 
 def set_dataset_pagination_to_100(driver):
     try:
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(1)
         dropdown = WebDriverWait(driver, 10).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "div.select select#pagination"))
         )
         driver.execute_script("arguments[0].scrollIntoView();", dropdown)
-        time.sleep(1)
+        if dropdown.get_attribute("value") == "100":
+            return
+        old_links = driver.find_elements(By.CSS_SELECTOR, 'div.col.full > a[href^="/id/ord-"]')
         try:
             Select(dropdown).select_by_value("100")
-            print("Changed dataset entries to 100 (via Select)")
+            log("Changed dataset entries to 100 (via Select)")
         except:
             driver.execute_script("""
                 var s=document.querySelector('div.select select#pagination');
                 s.value='100';
                 s.dispatchEvent(new Event('change',{bubbles:true}));
             """)
-            print("Changed dataset entries to 100 (via JS fallback)")
-        time.sleep(2)
+            log("Changed dataset entries to 100 (via JS fallback)")
+        waits.wait_for_refresh(driver, old_links[0] if old_links else None, 10)
     except Exception as e:
         print(f"Could not set dataset pagination dropdown: {e}")
 
+def set_browse_pagination_to_100(driver):
+    try:
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        dropdown = WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "div.select select#pagination"))
+        )
+        driver.execute_script("arguments[0].scrollIntoView();", dropdown)
+        if dropdown.get_attribute("value") == "100":
+            return
+        old_links = driver.find_elements(By.CSS_SELECTOR, 'a[href^="/dataset/ord_dataset-"]')
+        try:
+            Select(dropdown).select_by_value("100")
+            log("Changed browse entries to 100 (via Select)")
+        except:
+            driver.execute_script("""
+                var s=document.querySelector('div.select select#pagination');
+                s.value='100';
+                s.dispatchEvent(new Event('change',{bubbles:true}));
+            """)
+            log("Changed browse entries to 100 (via JS fallback)")
+        waits.wait_for_refresh(driver, old_links[0] if old_links else None, 10)
+    except Exception as e:
+        print(f"Could not set browse pagination dropdown: {e}")
+
+def selected_page_text(driver):
+    try:
+        return driver.find_element(By.CSS_SELECTOR, ".paginav .button.word.selected").text.strip()
+    except Exception:
+        return None
+
 def wait_for_dataset_to_load(driver):
     try:
         WebDriverWait(driver, 20).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "div#overview, .card-header, h1, h2"))
         )
-        print("Dataset page loaded!")
+        log("Dataset page loaded!")
         return True
     except Exception as e:
         print(f"Timeout waiting for dataset page to load: {e}")
         return False
 
-def process_current_page(driver, scrapped_data_dir):
+# [href, reaction count or null] for every dataset link on a browse page, in one
+# round trip. The count is the last number in the link's row (the listing's
+# size column), not counting the link text itself.
+BROWSE_LISTING_JS = r"""
+return Array.from(document.querySelectorAll('a[href^="/dataset/ord_dataset-"]')).map(function (a) {
+    var row = a.closest('tr, .row') || a.parentElement;
+    var numbers = (row.innerText || '').replace(a.innerText, '').match(/\b\d[\d,]*\b/g);
+    return [a.href, numbers ? numbers[numbers.length - 1].replace(/,/g, '') : null];
+});
+"""
+
+def browse_page_datasets(driver, page):
+    # ([(dataset_id, url)], {dataset_id: reaction count}) listed on the current browse page
     driver.execute_script("window.scrollTo(0, 0);")
-    time.sleep(1)
-    links = driver.find_elements(By.CSS_SELECTOR, 'a[href^="/dataset/ord_dataset-"]')
-    dataset_urls = [link.get_attribute("href") for link in links]
-    original_window = driver.current_window_handle
-
-    for i, url in enumerate(dataset_urls):
-        print(f"\n========= Working on dataset link {i+1}/{len(dataset_urls)}: {url} =========")
-        driver.execute_script("window.open(arguments[0], '_blank');", url)
-        driver.switch_to.window(driver.window_handles[-1])
-        print(f"Opened dataset link in new tab: {url}")
+    keyed_urls = []
+    sizes = {}
+    for i, (url, size) in enumerate(driver.execute_script(BROWSE_LISTING_JS)):
+        if not url:
+            continue
+        dataset_id = dataset_id_from_url(url) or f"DATASET_{page}_{i+1}"
+        keyed_urls.append((dataset_id, url))
+        if size is not None:
+            sizes[dataset_id] = int(size)
+    return keyed_urls, sizes
+
+def listing_changed(ledger, dataset_id, size):
+    # True when the browse listing's reaction count differs from the one it showed when the
+    # dataset was last enumerated; an unknown count on either side counts as unchanged.
+    recorded = ledger.fingerprint("dataset_size", dataset_id)
+    return size is not None and recorded is not None and recorded[0] != size
+
+def load_dataset(driver, url):
+    with phase("dataset_load"), navigation() as slot:
+        driver.get(url)
+        log(f"Opened dataset link: {url}")
         loaded = wait_for_dataset_to_load(driver)
-        if loaded:
-            set_dataset_pagination_to_100(driver)
-            driver.execute_script("window.scrollTo(0, 0);")
-            # Prepare path for this DATASET_LINK folder
-            dataset_match = re.search(r'(ord_dataset-[\w\d]+)', url)
-            if dataset_match:
-                dataset_dir = os.path.join(scrapped_data_dir, dataset_match.group(1))
+        if not loaded:
+            slot.failed()
+    if loaded:
+        set_dataset_pagination_to_100(driver)
+    return loaded
+
+def discover_current_page(session, page, ledger, keyed_urls, enumerate_datasets=True, sizes=None):
+    # Records every dataset on this browse page, then (unless enumerate_datasets
+    # is False) enumerates the reactions of each dataset not enumerated before,
+    # or whose reaction count in the listing (sizes) changed since it was.
+    # Returns True when all of them were.
+    # Datasets load in the session's reusable "dataset" tab; the browse tab keeps its page.
+    ledger.discover_many("dataset", keyed_urls, parent=str(page))
+    if not enumerate_datasets:
+        return True
+    sizes = sizes or {}
+    all_done = True
+
+    for i, (dataset_id, url) in enumerate(keyed_urls):
+        log(f"\n========= Discovering dataset link {i+1}/{len(keyed_urls)}: {url} =========")
+        size = sizes.get(dataset_id)
+        if listing_changed(ledger, dataset_id, size):
+            log(f"{dataset_id} now lists {size} reactions -> reopening it")
+        elif already_done(ledger, "dataset", dataset_id):
+            if size is not None and ledger.fingerprint("dataset_size", dataset_id) is None:
+                ledger.record_fingerprint("dataset_size", dataset_id, size, "")
+            continue
+        ledger.start("dataset", dataset_id, str(page))
+        driver = session.tab("dataset")
+        try:
+            if load_dataset(driver, url):
+                discover_dataset_reactions(driver, dataset_id, ledger)
+                if size is not None:
+                    ledger.record_fingerprint("dataset_size", dataset_id, size, "")
+                ledger.done("dataset", dataset_id)
             else:
-                dataset_dir = os.path.join(scrapped_data_dir, f"DATASET_{i+1}")
-            os.makedirs(dataset_dir, exist_ok=True)
-            click_all_view_full_details_on_dataset(driver, dataset_dir)
-            print(f"Now moving to the next dataset link (if any)...\n")
-            time.sleep(10)
-        else:
-            print("Could not verify dataset loaded (timeout or structure change).")
-        driver.close()
-        driver.switch_to.window(original_window)
-        time.sleep(2)
-
-if __name__ == "__main__":
-    MAX_NEXT_PAGES = 5
-    scrapped_data_dir = os.path.abspath("SCRAPPED_DATA")
-    os.makedirs(scrapped_data_dir, exist_ok=True)
-
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-    driver.maximize_window()
-    driver.get("https://open-reaction-database.org/")
-    print("Opened homepage and maximized window!")
-    time.sleep(2)
-
+                print("Could not verify dataset loaded (timeout or structure change).")
+                ledger.failed("dataset", dataset_id, "dataset page did not load")
+                all_done = False
+        except Exception as e:
+            print(f"Failed to enumerate reactions of {url}: {e}")
+            ledger.failed("dataset", dataset_id, e)
+            all_done = False
+    session.tab("browse")
+    return all_done
+
+def open_browse(driver, base_url):
+    with navigation():
+        driver.get(base_url)
+    log("Opened homepage!")
     try:
         browse_link = WebDriverWait(driver, 10).until(
             EC.element_to_be_clickable((By.CSS_SELECTOR, "nav a[href='/browse']"))
         )
         driver.execute_script("arguments[0].scrollIntoView();", browse_link)
-        time.sleep(0.5)
-        browse_link.click()
-        print("Clicked Browse in navbar!")
+        with navigation():
+            browse_link.click()
+        log("Clicked Browse in navbar!")
+        return True
     except TimeoutException:
         print("Could not find the Browse link in navbar!")
-        driver.quit()
-        exit(1)
-
-    time.sleep(3)
-
-    def set_browse_pagination_to_100(driver):
-        try:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)
-            dropdown = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.select select#pagination"))
-            )
-            driver.execute_script("arguments[0].scrollIntoView();", dropdown)
-            time.sleep(1)
-            try:
-                Select(dropdown).select_by_value("100")
-                print("Changed browse entries to 100 (via Select)")
-            except:
-                driver.execute_script("""
-                    var s=document.querySelector('div.select select#pagination');
-                    s.value='100';
-                    s.dispatchEvent(new Event('change',{bubbles:true}));
-                """)
-                print("Changed browse entries to 100 (via JS fallback)")
-            time.sleep(3)
-        except Exception as e:
-            print(f"Could not set browse pagination dropdown: {e}")
+        return False
 
+def resume_browse(driver, base_url, page):
+    # After a browser recycle: reopen Browse and page forward to where the walk was.
+    if not open_browse(driver, base_url):
+        return False
+    set_browse_pagination_to_100(driver)
+    while selected_page_text(driver) != str(page):
+        current = selected_page_text(driver)
+        next_btn = driver.find_element(By.CSS_SELECTOR, "div.next.paginav span.word")
+        if "disabled" in next_btn.get_attribute("class"):
+            return False
+        driver.execute_script("arguments[0].scrollIntoView(true);", next_btn)
+        with navigation() as slot:
+            next_btn.click()
+            if waits.wait_quietly(driver, lambda d: selected_page_text(d) != current, 10) is None:
+                slot.failed()
+                return False
+    log(f"Resumed browsing at page {page}")
+    return True
+
+def discover_browse_pages(session, base_url, ledger, max_pages=None, enumerate_datasets=True):
+    # Phase 1: walk the browse pagination once and fill the frontier with every
+    # browse page, dataset and reaction URL (only pages and datasets when
+    # enumerate_datasets is False). Returns True when the walk reached the last
+    # page (rather than stopping at max_pages or on an error).
+    # The session may recycle its browser between pages; the walk then resumes at the same page.
+    driver = session.tab("browse")
+    if not open_browse(driver, base_url):
+        return False
     page = 1
     last_page = 1
-    while page <= MAX_NEXT_PAGES:
-        print(f"\nProcessing Page: {page}")
+    listed = set()
+    while max_pages is None or page <= max_pages:
+        log(f"\nDiscovering Page: {page}")
+        if session.checkpoint():
+            driver = session.tab("browse")
+            if not resume_browse(driver, base_url, page):
+                print(f"Could not get back to browse page {page} after recycling the browser -> stopping discovery")
+                return False
         set_browse_pagination_to_100(driver)
-        process_current_page(driver, scrapped_data_dir)
+        ledger.discover("page", str(page), driver.current_url)
+        keyed_urls, sizes = browse_page_datasets(driver, page)
+        listed.update(key for key, _ in keyed_urls)
+        if not already_done(ledger, "page", str(page)):
+            ledger.start("page", str(page))
+            try:
+                page_done = discover_current_page(session, page, ledger, keyed_urls, enumerate_datasets, sizes)
+            except Exception as e:
+                ledger.failed("page", str(page), e)
+                raise
+            if page_done:
+                ledger.done("page", str(page))
+            else:
+                ledger.failed("page", str(page), "datasets not enumerated")
         try:
             last_page_elem = driver.find_element(By.CSS_SELECTOR, ".paginav .button.word.selected")
             last_page = int(last_page_elem.text.strip())
             next_btn = driver.find_element(By.CSS_SELECTOR, "div.next.paginav span.word")
             if "disabled" in next_btn.get_attribute("class"):
-                print("NEXT disabled -> Finished!")
-                break
+                print("NEXT disabled -> Finished discovery!")
+                retire_unlisted_datasets(ledger, listed)
+                return True
             driver.execute_script("arguments[0].scrollIntoView(true);", next_btn)
-            next_btn.click()
-            time.sleep(4)
+            with navigation() as slot:
+                next_btn.click()
+                if waits.wait_quietly(driver, lambda d: selected_page_text(d) != str(last_page), 10) is None:
+                    slot.failed()
             current_page_elem = driver.find_element(By.CSS_SELECTOR, ".paginav .button.word.selected")
             current_page = int(current_page_elem.text.strip())
             if current_page == 1 and page != 1:
                 print("Went back to page 1 unexpectedly -> Exiting loop!")
-                break
+                return False
             page += 1
-            print(f"NEXT clicked (page {page})")
+            log(f"NEXT clicked (page {page})")
+        except NoSuchElementException:
+            print("No NEXT button -> Finished discovery!")
+            retire_unlisted_datasets(ledger, listed)
+            return True
         except Exception as e:
-            print("No NEXT button or error -> Finished!", e)
-            break
+            print("Error moving to the next page -> stopping discovery:", e)
+            return False
+    return False
+
+def run_discovery(session, base_url, ledger, max_pages=None):
+    # Phase 1: walk the browse pages once; the ledger remembers a complete walk until --refresh.
+    if already_done(ledger, "discovery", "browse"):
+        log("Frontier is complete; pass --refresh or --rediscover to walk the browse pages again.")
+        return
+    with record("discovery", "browse"):
+        complete = discover_browse_pages(session, base_url, ledger, max_pages)
+    if complete and not ledger.keys("page", FAILED) and not ledger.keys("dataset", FAILED):
+        ledger.done("discovery", "browse")
+
+def retire_unlisted_datasets(ledger, listed):
+    # After a complete walk: datasets the browse pages no longer list, and their
+    # reactions, are marked removed (their CSVs stay on disk).
+    unlisted = ledger.listed_keys("dataset") - listed
+    for dataset_id in sorted(unlisted):
+        ledger.mark_removed("reaction", ledger.listed_keys("reaction", dataset_id))
+        print(f"{dataset_id} is no longer listed -> marked removed")
+    ledger.mark_removed("dataset", unlisted)
+
+def print_frontier(ledger):
+    counts = ledger.frontier_counts()
+    print("\nFrontier:")
+    for kind, label in (("page", "enumerated"), ("dataset", "enumerated"), ("reaction", "scraped")):
+        discovered, done, removed = counts.get(kind, (0, 0, 0))
+        line = f"  {kind:<10} {discovered:>8} discovered {done:>8} {label}"
+        print(line + (f" {removed:>8} removed" if removed else ""))
 
-
-    driver.quit()
+if __name__ == "__main__":
+    from Scraper_Helpers.engine import ScrapeEngine, parse_shard
+    from ord_adapter import OrdAdapter
+    parser = argparse.ArgumentParser(description="Scrape reactions from open-reaction-database.org")
+    parser.add_argument("--phase", choices=["discover", "fetch", "all"], default="all",
+                        help="discover: fill the URL frontier; fetch: scrape what the frontier holds; all: both")
+    parser.add_argument("--fast-path", action="store_true",
+                        help="read each reaction's JSON record over HTTP instead of rendering its detail page; "
+                             "records that fail validation or cannot be fetched are scraped through the browser")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="number of browser workers scraping reactions in parallel (0 = one)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="ignore the crawl ledger and frontier and scrape everything again")
+    parser.add_argument("--refresh", action="store_true",
+                        help="walk the browse listings again: new datasets are enumerated, unlisted ones marked removed; "
+                             "known datasets are reopened only when the listing shows a different reaction count")
+    parser.add_argument("--rediscover", action="store_true",
+                        help="like --refresh, but also reopen every dataset and diff its reaction list against its "
+                             "fingerprint (scraped reactions stay done)")
+    parser.add_argument("--shard", type=parse_shard, default=None,
+                        help="I/N: fetch only a stable 1/N slice of the frontier, for splitting a crawl across machines")
+    parser.add_argument("--prioritize", nargs="*", default=[], metavar="DATASET_ID",
+                        help="fetch the reactions of these datasets first")
+    parser.add_argument("--output-backend", choices=["csv", "parquet"], default="csv",
+                        help="csv: one ord-xxxx.csv per reaction; parquet: one store under SCRAPPED_DATA/columnar")
+    parser.add_argument("--headed", action="store_true",
+                        help="show the browser windows instead of running headless")
+    parser.add_argument("--browser-cache", default=None,
+                        help="persistent Chrome disk cache directory reused across runs")
+    parser.add_argument("--quiet", action="store_true",
+                        help="only print errors and summaries, not every click and scraped value")
+    parser.add_argument("--metrics", default=None,
+                        help="JSON-lines file for per-reaction timings (default: SCRAPPED_DATA/metrics.jsonl)")
+    parser.add_argument("--base-url", default="https://open-reaction-database.org/",
+                        help="site root; point at a local stand-in (BENCHMARKS/stand_in_sites.py) for offline runs")
+    parser.add_argument("--out", default="SCRAPPED_DATA", help="output directory")
+    parser.add_argument("--max-pages", type=int, default=None, help="stop discovery after N browse pages (default: all)")
+    parser.add_argument("--max-rate", type=float, default=MAX_RATE,
+                        help="upper bound on navigations per second; the scheduler adapts below it from latency and timeouts")
+    parser.add_argument("--molecules", default=None,
+                        help="molecule dictionary (e.g. SCRAPPED_DATA/molecules.sqlite); CSVs then store Molecule_ID instead of identifiers")
+    parser.add_argument("--recycle-commands", type=int, default=MAX_COMMANDS,
+                        help="restart a browser after it has served this many WebDriver commands (0 = never)")
+    parser.add_argument("--recycle-mb", type=float, default=MAX_BROWSER_MB,
+                        help="restart a browser once its memory passes this many MB (0 = never)")
+    parser.add_argument("--prefetch", type=int, default=0, metavar="K",
+                        help="keep each worker's next K reactions loading while the current one is extracted "
+                             "(reaction records with --fast-path, otherwise background tabs)")
+    parser.add_argument("--snapshots", default=None,
+                        help="save a compressed snapshot of each reaction page here (e.g. <out>/snapshots); "
+                             "re-extract later with Scraper_Helpers/snapshot_replay.py")
+    args = parser.parse_args()
+    set_verbose(not args.quiet)
+
+    # The shared engine runs the crawl: discovery in the main browser, then the
+    # frontier drained by --workers workers, each with its own browser and lookahead.
+    adapter = OrdAdapter(args.fast_path, args.max_pages, args.rediscover, args.prioritize)
+    engine = ScrapeEngine(adapter, args.out, args.base_url, max(1, args.workers), args.max_rate,
+                          output_backend=args.output_backend, molecules_path=args.molecules, snapshots_dir=args.snapshots,
+                          refresh=args.refresh, fresh=args.fresh, headed=args.headed, browser_cache=args.browser_cache,
+                          max_commands=args.recycle_commands, max_memory_mb=args.recycle_mb, metrics_path=args.metrics,
+                          shard=args.shard, prefetch=args.prefetch)
+    try:
+        engine.run(args.phase)
+        print_frontier(engine.ledger)
+    finally:
+        engine.close()
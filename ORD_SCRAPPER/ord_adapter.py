@@ -0,0 +1,61 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Scraper_Helpers.instrumentation import log
+import ord_http
+from ORD import run_discovery, print_frontier, try_fast_path, scrape_ord_details
+from ord_prefetch import ReactionPrefetcher
+
+
+# ORD for the shared engine (python -m Scraper_Helpers ord, and ORD.py's own
+# CLI): the browse pages are walked once in a browser to find every dataset's
+# reactions, then each reaction is one unit, read from its rendered detail page
+# or, with fast_path=True, from its JSON record (falling back to the page).
+#   rediscover   reopen every dataset on the next walk, not just new or resized ones
+#   prioritize   dataset ids whose reactions are fetched first
+class OrdAdapter:
+    name = "ord"
+    base_url = "https://open-reaction-database.org/"
+    unit_kind = "reaction"
+    ledger_file = "crawl_ledger.sqlite"
+    metrics_file = "metrics.jsonl"
+    needs_browser = True  # discovery always; reactions only when the fast path is off or fails
+
+    def __init__(self, fast_path=False, max_pages=None, rediscover=False, prioritize=()):
+        self.fast_path = fast_path
+        self.max_pages = max_pages
+        self.rediscover = rediscover
+        self.prioritize = prioritize
+
+    def prepare(self, engine):
+        if "ORD_REACTION_JSON_URL" not in os.environ:
+            ord_http.REACTION_JSON_URL = engine.base_url.rstrip("/") + "/api/reaction/{reaction_id}"
+        if self.rediscover:
+            engine.ledger.reset(["discovery", "page", "dataset"])
+        elif engine.refresh:
+            engine.ledger.reset(["discovery", "page"])
+
+    def discover(self, engine):
+        run_discovery(engine.main_session, engine.base_url, engine.ledger, self.max_pages)
+        print_frontier(engine.ledger)
+
+    def before_fetch(self, engine):
+        for dataset_id in self.prioritize:
+            log(f"Prioritized {engine.ledger.prioritize(self.unit_kind, dataset_id, 1)} reactions of {dataset_id}")
+
+    def make_prefetcher(self, session, depth):
+        return ReactionPrefetcher(session, depth, self.fast_path)
+
+    def scrape(self, get_driver, engine, unit, prefetcher=None):
+        dataset_dir = os.path.join(engine.out_dir, unit.parent)
+        os.makedirs(dataset_dir, exist_ok=True)
+        if self.fast_path and try_fast_path(unit.url, dataset_dir, engine.store, prefetcher):
+            return
+        driver = get_driver()
+        preloaded = prefetcher is not None and prefetcher.open_page(unit.url) is not None
+        try:
+            scrape_ord_details(driver, unit.url, dataset_dir, store=engine.store, preloaded=preloaded)
+        finally:
+            if preloaded:
+                prefetcher.session.release_preloaded()
@@ -0,0 +1,176 @@
+from ord_records import input_records, product_records, measurement_records
+from Scraper_Helpers import waits
+from Scraper_Helpers.instrumentation import log, phase
+
+# Each collector below is one execute_script / execute_async_script round trip
+# that walks a whole section inside the browser and returns plain JSON, instead
+# of one WebDriver command per tab, button, <pre> and div.value cell.
+# Every collector returns None when the script fails so the caller can fall
+# back to the per-element path.
+
+SCRIPT_TIMEOUT = 600
+
+_MODAL_HELPERS = """
+var done = arguments[arguments.length - 1];
+var stepTimeout = arguments[0];
+function sleep(ms) { return new Promise(function (r) { setTimeout(r, ms); }); }
+async function until(fn) {
+    var end = Date.now() + stepTimeout;
+    while (Date.now() < end) {
+        try { var v = fn(); if (v) return v; } catch (e) {}
+        await sleep(50);
+    }
+    return null;
+}
+function visible(el) { return !!(el && el.getClientRects().length); }
+function isSelected(tab) { return /(^|\\s)(selected|active)(\\s|$)/.test(tab.className); }
+async function readModal(btn) {
+    // Only <pre>s that appear after the click count, so a previous modal still
+    // closing (or a hidden one left in the DOM) is never read as this one.
+    var before = new Set(document.querySelectorAll('div.data pre'));
+    try { btn.scrollIntoView(); btn.click(); } catch (e) { return {error: 'click failed: ' + e}; }
+    var pres = await until(function () {
+        var p = Array.prototype.filter.call(document.querySelectorAll('div.data pre'), function (pre) {
+            return !before.has(pre) && visible(pre);
+        });
+        return p.length ? p : null;
+    });
+    if (!pres) return {error: 'modal did not open'};
+    var texts = Array.prototype.map.call(pres, function (p) { return p.innerText; });
+    var close = await until(function () {
+        var c = document.querySelector('div.close');
+        return visible(c) ? c : null;
+    });
+    if (close) {
+        close.click();
+        await until(function () { return !visible(document.querySelector('div.close')); });
+    }
+    return {pre_texts: texts};
+}
+function run(body) {
+    body().then(function (rows) { done({rows: rows}); }, function (e) { done({error: String(e)}); });
+}
+"""
+
+COLLECT_INPUTS_JS = _MODAL_HELPERS + """
+run(async function () {
+    var section = document.querySelector('div#inputs');
+    var tabs = section.querySelectorAll('.tabs .tab');
+    var rows = [];
+    for (var t = 0; t < tabs.length; t++) {
+        var tab = tabs[t];
+        var name = tab.innerText.trim();
+        var before = section.querySelector('div.button');
+        var wasSelected = isSelected(tab);
+        tab.click();
+        if (!wasSelected) {
+            await until(function () { return (before && !before.isConnected) || isSelected(tab); });
+        }
+        var buttons = section.querySelectorAll('div.button');
+        for (var i = 0; i < buttons.length; i++) {
+            var row = await readModal(buttons[i]);
+            row.tab = name;
+            row.raw_button_index = i + 1;
+            rows.push(row);
+        }
+    }
+    return rows;
+});
+"""
+
+COLLECT_PRODUCTS_JS = _MODAL_HELPERS + """
+run(async function () {
+    var views = document.querySelectorAll('div#outcomes div.outcomes-view');
+    var rows = [];
+    for (var o = 0; o < views.length; o++) {
+        var compounds = views[o].querySelectorAll('.compound-view');
+        for (var p = 0; p < compounds.length; p++) {
+            var buttons = compounds[p].querySelectorAll('.raw .button');
+            for (var b = 0; b < buttons.length; b++) {
+                var row = await readModal(buttons[b]);
+                row.outcome_index = o + 1;
+                row.product_index = p + 1;
+                rows.push(row);
+            }
+        }
+    }
+    return rows;
+});
+"""
+
+COLLECT_MEASUREMENTS_JS = """
+var blocks = [];
+document.querySelectorAll('div#outcomes div.outcomes-view').forEach(function (view, o) {
+    view.querySelectorAll('.measurements').forEach(function (section, m) {
+        blocks.push({
+            outcome_index: o + 1,
+            measurement_index: m + 1,
+            cells: Array.prototype.map.call(section.querySelectorAll('div.value'), function (c) { return c.innerText; })
+        });
+    });
+});
+return blocks;
+"""
+
+
+def _run_modal_script(driver, script, label):
+    try:
+        driver.set_script_timeout(SCRIPT_TIMEOUT)
+        with phase(f"batched_{label.lower()}"):
+            result = driver.execute_async_script(script, int(waits.WAIT_CEILING * 1000))
+    except Exception as e:
+        print(f"Batched {label} extraction failed, falling back to per-element reads: {e}")
+        return None
+    if not result or result.get("error"):
+        print(f"Batched {label} extraction failed, falling back to per-element reads: {result and result.get('error')}")
+        return None
+    for row in result["rows"]:
+        if row.get("error"):
+            log(f"   [{label}] skipped raw button: {row['error']}")
+    return [row for row in result["rows"] if not row.get("error")]
+
+
+def collect_inputs(driver, raw=None):
+    # raw, when given, receives the modal payloads as read (for the snapshot cache).
+    rows = _run_modal_script(driver, COLLECT_INPUTS_JS, "Inputs")
+    if rows is None:
+        return None
+    if raw is not None:
+        raw["inputs"] = rows
+    inputs_scraped_data = input_records(rows)
+    log(f"Batched Inputs extraction: {len(inputs_scraped_data)} raw buttons in one call")
+    return inputs_scraped_data
+
+
+def collect_products(driver, raw=None):
+    rows = _run_modal_script(driver, COLLECT_PRODUCTS_JS, "Products")
+    if rows is None:
+        return None
+    if raw is not None:
+        raw["products"] = rows
+    products_scraped_data = product_records(rows)
+    log(f"Batched Products extraction: {len(products_scraped_data)} raw buttons in one call")
+    return products_scraped_data
+
+
+def collect_outcomes(driver, raw=None):
+    # Products and measurements are used together; a failure in either means the caller re-walks both.
+    products_scraped_data = collect_products(driver, raw)
+    if products_scraped_data is None:
+        return None
+    measurements_scraped_data = collect_measurements(driver, raw)
+    if measurements_scraped_data is None:
+        return None
+    return products_scraped_data, measurements_scraped_data
+
+
+def collect_measurements(driver, raw=None):
+    try:
+        with phase("batched_measurements"):
+            blocks = driver.execute_script(COLLECT_MEASUREMENTS_JS)
+    except Exception as e:
+        print(f"Batched Measurements extraction failed, falling back to per-element reads: {e}")
+        return None
+    if raw is not None:
+        raw["measurements"] = blocks
+    return measurement_records(blocks)
@@ -0,0 +1,230 @@
+from functools import partial
+import multiprocessing
+import argparse
+import shutil
+import glob
+import time
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Scraper_Helpers.crawl_ledger import CrawlLedger
+from Scraper_Helpers.driver_factory import create_driver
+from Scraper_Helpers.driver_session import DriverSession
+from Scraper_Helpers.engine import ScrapeEngine, Unit
+from Scraper_Helpers.instrumentation import set_verbose, log, sleep
+from Scraper_Helpers.scheduler import MAX_RATE
+from Scraper_Helpers.snapshot_cache import SnapshotCache, set_snapshots
+from Scraper_Helpers.work_queue import WorkQueue, Heartbeat, Beacon, BeaconWatch, worker_name, LEASE_SECONDS, JOURNAL_MODE, JOURNAL_MODES
+from ORD import (
+    discover_browse_pages,
+    load_dataset,
+    dataset_reaction_links,
+    print_frontier,
+)
+from ord_adapter import OrdAdapter
+
+# Splits one ORD crawl across processes and machines through a shared
+# WorkQueue (a SQLite file on a directory every participant can reach):
+#   coordinator  walks the browse pages once and publishes a "dataset" task per
+#                dataset (plus any reactions an earlier discovery already knows);
+#   worker       leases tasks: a dataset task enumerates the dataset's reactions
+#                and publishes them as "reaction" tasks, a reaction task is one
+#                unit of the shared engine (OrdAdapter), scraped into the shared
+#                output tree; the queue stands in for the engine's ledger, and
+#                each worker writes its own metrics-<host>-<pid>.jsonl;
+#   status       prints the queue; merge copies per-host output trees into one.
+# Workers exit once the coordinator has finished publishing and nothing is
+# pending or leased. While publishing, the coordinator keeps a beacon in the
+# queue; if it dies, workers drain what was published and exit once the beacon
+# has been unchanged for BEACON_TIMEOUT (rerun the coordinator to publish the
+# rest, then the workers). On a single box: start the coordinator, then
+# `worker --processes N`. Across hosts, every role runs with --journal delete
+# on a mount with working file locks (see work_queue.py). --max-rate paces
+# each worker process on its own; --crawl-rate caps the whole crawl through a
+# budget kept in the queue file.
+IDLE_POLL = 2.0  # seconds between lease attempts when the queue is empty
+DATASET_PRIORITY = 1  # datasets are leased before reactions so the queue keeps filling
+PUBLISHED = "published"
+COORDINATOR = "coordinator_beacon"
+
+
+def run_coordinator(queue, out_dir, base_url, max_pages=None, headed=False):
+    ledger = CrawlLedger(os.path.join(out_dir, "crawl_ledger.sqlite"))
+    queue.set_meta(PUBLISHED, "running")
+    beacon = Beacon(queue, COORDINATOR).start()
+    try:
+        session = DriverSession(partial(create_driver, headless=not headed), name="coordinator")
+        try:
+            discover_browse_pages(session, base_url, ledger, max_pages, enumerate_datasets=False)
+        finally:
+            session.close()
+        print_frontier(ledger)
+        # Datasets whose reactions are already known (from an ORD.py discovery) go in as reactions directly.
+        known_reactions = ledger.frontier("reaction")
+        enumerated = {parent for _, _, parent in known_reactions}
+        datasets = [(key, url) for key, url, _ in ledger.frontier("dataset") if key not in enumerated]
+        published = queue.publish_many("dataset", datasets, priority=DATASET_PRIORITY)
+        for dataset_id in sorted(enumerated):
+            keyed_urls = [(key, url) for key, url, parent in known_reactions if parent == dataset_id]
+            published += queue.publish_many("reaction", keyed_urls, parent=dataset_id)
+        queue.set_meta(PUBLISHED, "done")
+    finally:
+        beacon.stop()
+        ledger.close()
+    print(f"Published {published} new tasks to {queue.path}")
+
+
+def enumerate_dataset(get_driver, lease, queue):
+    driver = get_driver()
+    if not load_dataset(driver, lease.url):
+        raise RuntimeError("dataset page did not load")
+    keyed_urls = dataset_reaction_links(driver)
+    added = queue.publish_many("reaction", keyed_urls, parent=lease.key)
+    log(f"{lease.key}: {len(keyed_urls)} reactions ({added} new)")
+
+
+def run_task(engine, session, queue, lease):
+    if lease.kind == "dataset":
+        session.run(enumerate_dataset, lease, queue)
+    elif lease.kind == "reaction":
+        engine.scrape_unit(session, Unit(lease.key, lease.url, lease.parent))
+    else:
+        raise ValueError(f"unknown task kind {lease.kind}")
+
+
+def run_worker(queue_path, out_dir, base_url, fast_path=False, max_rate=MAX_RATE, lease_seconds=LEASE_SECONDS,
+               quiet=False, snapshots_dir=None, journal_mode=JOURNAL_MODE, crawl_rate=None):
+    # One worker process: lease, run, complete, until the crawl is drained.
+    set_verbose(not quiet)
+    queue = WorkQueue(queue_path, journal_mode)
+    owner = worker_name()
+    # The queue tracks every task, so the engine's own ledger only lives in memory.
+    engine = ScrapeEngine(OrdAdapter(fast_path), out_dir, base_url, max_rate=max_rate, ledger_path=":memory:",
+                          metrics_path=os.path.join(out_dir, f"metrics-{owner.replace(':', '-')}.jsonl"),
+                          shared_budget=partial(queue.take_token, crawl_rate) if crawl_rate else None)
+    engine.adapter.prepare(engine)
+    snapshots = set_snapshots(SnapshotCache(snapshots_dir, journal_mode)) if snapshots_dir else None
+    heartbeat = Heartbeat(queue, lease_seconds / 3, lease_seconds).start()
+    coordinator = BeaconWatch(queue, COORDINATOR)
+    session = engine.new_session(owner)
+    counts = {"done": 0, "failed": 0, "lost": 0}
+    try:
+        while True:
+            leases = queue.lease(owner, lease_seconds=lease_seconds)
+            if not leases:
+                published = queue.get_meta(PUBLISHED)
+                stalled = published == "running" and coordinator.stale()
+                if (published == "done" or stalled) and not queue.outstanding():
+                    if stalled:
+                        print(f"[{owner}] coordinator stopped before it finished publishing "
+                              f"(no beacon for {coordinator.age():.0f}s); exiting with the queue drained")
+                    break
+                sleep(IDLE_POLL, "idle")
+                continue
+            lease = leases[0]
+            heartbeat.hold(lease)
+            try:
+                run_task(engine, session, queue, lease)
+            except Exception as e:
+                print(f"[{owner}] {lease.kind} {lease.key} failed: {e}")
+                queue.fail(lease, e)
+                counts["failed"] += 1
+            else:
+                # Output files are written atomically, so a late duplicate only rewrites the same CSV.
+                if queue.complete(lease):
+                    counts["done"] += 1
+                else:
+                    print(f"[{owner}] lease on {lease.kind} {lease.key} was lost before completion")
+                    counts["lost"] += 1
+            finally:
+                heartbeat.release(lease)
+    finally:
+        heartbeat.stop()
+        engine.close()
+        queue.close()
+        if snapshots is not None:
+            snapshots.close()
+    print(f"[{owner}] {counts['done']} tasks done | {counts['failed']} failed | {counts['lost']} lost leases")
+
+
+def merge_trees(sources, out_dir):
+    # Copies ord_dataset-*/ord-*.csv from per-host output trees into out_dir; existing files win.
+    copied = 0
+    for source in sources:
+        for path in glob.glob(os.path.join(source, "ord_dataset-*", "ord-*.csv")):
+            target = os.path.join(out_dir, os.path.relpath(path, source))
+            if os.path.exists(target):
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(path, target + ".part")
+            os.replace(target + ".part", target)
+            copied += 1
+    return copied
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distributed ORD crawl over a shared SQLite work queue")
+    parser.add_argument("role", choices=["coordinator", "worker", "status", "merge"])
+    parser.add_argument("--queue", default="SCRAPPED_DATA/work_queue.sqlite",
+                        help="work queue file, on a directory every coordinator/worker can reach")
+    parser.add_argument("--out", default="SCRAPPED_DATA", help="output directory (shared, or per host and merged later)")
+    parser.add_argument("--base-url", default="https://open-reaction-database.org/")
+    parser.add_argument("--max-pages", type=int, default=None, help="coordinator: stop after N browse pages")
+    parser.add_argument("--headed", action="store_true", help="coordinator: show the browser window")
+    parser.add_argument("--processes", type=int, default=1, help="worker: worker processes to start on this host")
+    parser.add_argument("--fast-path", action="store_true",
+                        help="worker: read reaction records over HTTP, falling back to the browser")
+    parser.add_argument("--max-rate", type=float, default=MAX_RATE, help="worker: navigations per second, per process")
+    parser.add_argument("--crawl-rate", type=float, default=None,
+                        help="worker: navigations per second across every worker of the crawl (budget kept in --queue)")
+    parser.add_argument("--journal", choices=JOURNAL_MODES, default=JOURNAL_MODE,
+                        help="queue/snapshot journal: wal (one host) or delete (hosts sharing a mount with working locks)")
+    parser.add_argument("--lease-seconds", type=float, default=LEASE_SECONDS,
+                        help="worker: lease length; heartbeats renew it every third of that")
+    parser.add_argument("--snapshots", default=None,
+                        help="worker: save a compressed snapshot of each reaction page here (shared, like --queue)")
+    parser.add_argument("--retry-failed", action="store_true", help="status: put failed tasks back in the queue")
+    parser.add_argument("--sources", nargs="*", default=[], help="merge: per-host output trees to merge into --out")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+    set_verbose(not args.quiet)
+
+    out_dir = os.path.abspath(args.out)
+    os.makedirs(out_dir, exist_ok=True)
+    queue_path = os.path.abspath(args.queue)
+    os.makedirs(os.path.dirname(queue_path), exist_ok=True)
+
+    if args.role == "coordinator":
+        queue = WorkQueue(queue_path, args.journal)
+        run_coordinator(queue, out_dir, args.base_url, args.max_pages, args.headed)
+        queue.print_summary()
+        queue.close()
+    elif args.role == "worker":
+        worker_args = (queue_path, out_dir, args.base_url, args.fast_path, args.max_rate, args.lease_seconds, args.quiet,
+                       args.snapshots and os.path.abspath(args.snapshots), args.journal, args.crawl_rate)
+        if args.processes <= 1:
+            run_worker(*worker_args)
+        else:
+            processes = [multiprocessing.Process(target=run_worker, args=worker_args, name=f"ord-worker-{i}")
+                         for i in range(1, args.processes + 1)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+        queue = WorkQueue(queue_path, args.journal)
+        queue.print_summary()
+        queue.close()
+    elif args.role == "status":
+        queue = WorkQueue(queue_path, args.journal)
+        if args.retry_failed:
+            print(f"Requeued {queue.retry_failed()} failed tasks")
+        published = queue.get_meta(PUBLISHED) or "not started"
+        beacon = queue.get_meta(COORDINATOR)
+        if published == "running" and beacon:
+            published += f" (coordinator beacon {time.time() - float(beacon.split()[0]):.0f}s ago)"
+        print(f"Publishing: {published}")
+        queue.print_summary()
+        queue.close()
+    else:
+        print(f"Copied {merge_trees(args.sources, out_dir)} reaction CSVs into {out_dir}")
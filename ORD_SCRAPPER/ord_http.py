@@ -0,0 +1,187 @@
+import json
+import os
+
+from ord_records import (
+    UNIT_SYMBOLS,
+    extract_identifiers_and_role,
+    reaction_id_from_url,
+    open_ord_sink,
+    write_ord_records,
+)
+from Scraper_Helpers.http_fetch import fetch_text
+from Scraper_Helpers.instrumentation import log, phase
+from Scraper_Helpers.scheduler import navigation
+from Scraper_Helpers.snapshot_cache import save_snapshot
+
+# The detail page is a client-side app rendered from the reaction record it
+# fetches as JSON; reading that record directly skips the browser entirely.
+REACTION_JSON_URL = os.environ.get(
+    "ORD_REACTION_JSON_URL",
+    "https://open-reaction-database.org/api/reaction/{reaction_id}",
+)
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) ORD-scraper"
+
+
+def field(message, snake_name):
+    # Records may be serialised with proto field names or JSON camelCase names.
+    if snake_name in message:
+        return message[snake_name]
+    head, *rest = snake_name.split("_")
+    return message.get(head + "".join(part.title() for part in rest))
+
+
+def fetch_reaction_json(reaction_id, url_template=None):
+    url = (url_template or REACTION_JSON_URL).format(reaction_id=reaction_id)
+    with navigation():
+        return json.loads(fetch_text(url, {"User-Agent": USER_AGENT, "Accept": "application/json"}))
+
+
+def load_reaction_fixture(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def raw_pre_texts(compound):
+    # Rebuild the <pre> blocks shown by a raw button so the Selenium regexes apply unchanged.
+    pre_texts = []
+    identifiers = field(compound, "identifiers")
+    if identifiers:
+        pre_texts.append("identifiers: " + json.dumps(identifiers, indent=2, ensure_ascii=False))
+    reaction_role = field(compound, "reaction_role")
+    if reaction_role is not None:
+        pre_texts.append(f"reaction_role: {reaction_role}")
+    return pre_texts
+
+
+def format_number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def format_measurement_value(measurement):
+    percentage = field(measurement, "percentage")
+    if percentage:
+        return f"{format_number(field(percentage, 'value'))}%"
+    for name in ("amount", "retention_time", "wavelength"):
+        quantity = field(measurement, name)
+        if not quantity:
+            continue
+        if name == "amount":
+            quantity = field(quantity, "mass") or field(quantity, "moles") or field(quantity, "volume") or quantity
+        units = UNIT_SYMBOLS.get(field(quantity, "units"), field(quantity, "units") or "")
+        return f"{format_number(field(quantity, 'value'))} {units}".strip()
+    float_value = field(measurement, "float_value")
+    if float_value:
+        return format_number(field(float_value, "value"))
+    string_value = field(measurement, "string_value")
+    if string_value is not None:
+        return str(string_value)
+    return ""
+
+
+def validate_reaction_json(reaction):
+    # Raises ValueError unless the response has the shape parse_reaction_json reads (inputs ->
+    # components, outcomes -> products -> measurements, each compound with string identifier
+    # values), so an API change sends the reaction back to the browser instead of into the CSVs.
+    def check(condition, problem):
+        if not condition:
+            raise ValueError(f"unexpected reaction record: {problem}")
+
+    check(isinstance(reaction, dict), f"a {type(reaction).__name__}, not an object")
+    inputs = field(reaction, "inputs")
+    outcomes = field(reaction, "outcomes")
+    check(inputs or outcomes, "no inputs or outcomes")
+    check(isinstance(inputs or {}, dict), "inputs is not an object")
+    check(isinstance(outcomes or [], list), "outcomes is not a list")
+    compounds = []
+    for tab_name, reaction_input in (inputs or {}).items():
+        components = field(reaction_input, "components") if isinstance(reaction_input, dict) else None
+        check(isinstance(components, list), f"input {tab_name} has no components list")
+        compounds.extend(components)
+    for outcome in outcomes or []:
+        products = field(outcome, "products") if isinstance(outcome, dict) else None
+        check(isinstance(products or [], list), "an outcome's products is not a list")
+        for product in products or []:
+            measurements = field(product, "measurements") if isinstance(product, dict) else None
+            check(isinstance(measurements or [], list) and all(isinstance(m, dict) for m in measurements or []),
+                  "a product's measurements is not a list of objects")
+        compounds.extend(products or [])
+    for compound in compounds:
+        identifiers = field(compound, "identifiers") if isinstance(compound, dict) else None
+        check(isinstance(identifiers, list) and identifiers, "a compound has no identifiers list")
+        check(all(isinstance(identifier, dict) and isinstance(field(identifier, "value"), str) for identifier in identifiers),
+              "an identifier has no string value")
+
+
+def parse_reaction_json(reaction):
+    inputs_scraped_data = []
+    products_scraped_data = []
+    measurements_scraped_data = []
+
+    for tab_name, reaction_input in (field(reaction, "inputs") or {}).items():
+        for idx, component in enumerate(field(reaction_input, "components") or []):
+            identifiers_value, reaction_role_value = extract_identifiers_and_role(raw_pre_texts(component))
+            inputs_scraped_data.append({
+                "tab": tab_name,
+                "raw_button_index": idx + 1,
+                "identifiers_value": identifiers_value,
+                "reaction_role": reaction_role_value
+            })
+
+    for outcome_idx, outcome in enumerate(field(reaction, "outcomes") or []):
+        # Numbered like the page's .measurements sections: per outcome, one per product that has measurements.
+        measurement_index = 0
+        for prod_idx, product in enumerate(field(outcome, "products") or []):
+            identifiers_value, reaction_role_value = extract_identifiers_and_role(raw_pre_texts(product))
+            products_scraped_data.append({
+                "outcome_index": outcome_idx + 1,
+                "product_index": prod_idx + 1,
+                "identifiers_value": identifiers_value,
+                "reaction_role": reaction_role_value
+            })
+            measurements = field(product, "measurements") or []
+            if not measurements:
+                continue
+            measurement_index += 1
+            pairs = []
+            for measurement in measurements:
+                t = str(field(measurement, "type") or "").strip()
+                if t:
+                    pairs.append({"type": t, "value": format_measurement_value(measurement).strip()})
+            measurements_scraped_data.append({
+                "outcome_index": outcome_idx + 1,
+                "measurement_index": measurement_index,
+                "pairs": pairs
+            })
+
+    return inputs_scraped_data, products_scraped_data, measurements_scraped_data
+
+
+def scrape_ord_details_http(ord_url, dataset_dir, reaction=None, store=None):
+    reaction_id = reaction_id_from_url(ord_url)
+    if reaction is None:
+        if not reaction_id:
+            raise ValueError(f"No ord- reaction id in URL: {ord_url}")
+        with phase("http_fetch"):
+            reaction = fetch_reaction_json(reaction_id)
+    validate_reaction_json(reaction)
+    inputs_scraped_data, products_scraped_data, measurements_scraped_data = parse_reaction_json(reaction)
+    if not inputs_scraped_data and not products_scraped_data:
+        raise ValueError(f"Reaction record for {ord_url} has no inputs or products")
+    save_snapshot("ord", reaction_id or ord_url, {"format": "ord_json", "url": ord_url, "record": reaction},
+                  os.path.basename(os.path.normpath(dataset_dir)))
+    log(f"[HTTP] {reaction_id}: {len(inputs_scraped_data)} inputs, {len(products_scraped_data)} products")
+    with phase("csv_write"):
+        write_ord_records(open_ord_sink(ord_url, dataset_dir, store), inputs_scraped_data, products_scraped_data, measurements_scraped_data)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Scrape one ORD reaction without a browser")
+    parser.add_argument("ord_url", help="reaction URL, e.g. https://open-reaction-database.org/id/ord-...")
+    parser.add_argument("--fixture", help="read the reaction record from a saved JSON file instead of fetching it")
+    parser.add_argument("--out", default="SCRAPPED_DATA", help="directory the ord-xxxx.csv is written to")
+    args = parser.parse_args()
+    reaction = load_reaction_fixture(args.fixture) if args.fixture else None
+    scrape_ord_details_http(args.ord_url, args.out, reaction)
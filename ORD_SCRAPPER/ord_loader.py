@@ -0,0 +1,129 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import pandas as pd
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ord_records import INPUTS_HEADER, PRODUCTS_HEADER, MEASUREMENTS_HEADER, read_ord_csv, reaction_csv_paths
+
+# Reads scraped ORD output back into pandas, whichever backend wrote it:
+# the per-reaction CSVs under SCRAPPED_DATA/<dataset>/ord-xxxx.csv or the
+# columnar store under SCRAPPED_DATA/columnar. Column names follow the
+# columnar tables (reaction_id, outcome_index, ..., dataset_id) either way.
+SECTIONS = {"inputs": "Inputs", "products": "Products", "measurements": "Measurements"}
+HEADERS = {"inputs": INPUTS_HEADER, "products": PRODUCTS_HEADER, "measurements": MEASUREMENTS_HEADER}
+INT_COLUMNS = {"raw_index", "outcome_index", "product_index", "measurement_block_index", "molecule_id"}
+MIN_FILES_PER_CHUNK = 64
+MAX_FILES_PER_CHUNK = 2000
+
+
+def column_name(header_name):
+    return header_name.lower()
+
+
+def empty_columns(header):
+    return {"reaction_id": [], **{column_name(name): [] for name in header[1:]}, "dataset_id": []}
+
+
+def collect_sections(paths, sections=tuple(SECTIONS)):
+    # {section: column lists} across many CSVs, reading each file once.
+    wanted = {SECTIONS[section]: section for section in sections}
+    columns = {}
+    for dataset_id, reaction_id, path in paths:
+        for section_name, (header, rows) in read_ord_csv(path).items():
+            section = wanted.get(section_name)
+            if section is None or not rows:
+                continue
+            target = columns.get(section)
+            if target is None:
+                target = columns[section] = empty_columns(header)
+            names = [column_name(name) for name in header[1:]]
+            if any(name not in target for name in names):
+                raise ValueError(f"{path}: {section_name} header {header} differs from earlier files "
+                                 "(mixed --molecules and plain runs in one directory?)")
+            lists = [target[name] for name in names]
+            for row in rows:
+                target["reaction_id"].append(reaction_id)
+                # A row cut short (a file truncated mid-write) reads its missing cells as empty.
+                cells = row[1:len(names) + 1]
+                for values, cell in zip(lists, cells + [""] * (len(names) - len(cells))):
+                    values.append(cell)
+                target["dataset_id"].append(dataset_id)
+    return {section: columns.get(section) or empty_columns(HEADERS[section]) for section in sections}
+
+
+def columns_to_frame(columns):
+    frame = pd.DataFrame(columns)
+    for name in frame.columns:
+        if name in INT_COLUMNS:
+            frame[name] = pd.to_numeric(frame[name], errors="coerce").astype("Int64")
+    return frame
+
+
+def load_chunk(paths, sections):
+    # Process-pool task: one slice of the tree -> {section: DataFrame}
+    return {section: columns_to_frame(columns) for section, columns in collect_sections(paths, sections).items()}
+
+
+def concat_frames(frames):
+    non_empty = [frame for frame in frames if len(frame)]
+    return pd.concat(non_empty, ignore_index=True) if non_empty else frames[0]
+
+
+def load_csv_sections(root, sections=tuple(SECTIONS), dataset_ids=None, workers=None):
+    # Fans the CSVs out over a process pool in chunks of files; each worker
+    # parses its chunk into DataFrames, which are concatenated in file order.
+    paths = reaction_csv_paths(root, dataset_ids)
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers <= 1 or len(paths) < 2 * MIN_FILES_PER_CHUNK:
+        return load_chunk(paths, sections)
+    chunk_size = max(MIN_FILES_PER_CHUNK, min(MAX_FILES_PER_CHUNK, -(-len(paths) // (workers * 4))))
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(load_chunk, chunks, repeat(sections)))
+    return {section: concat_frames([part[section] for part in parts]) for section in sections}
+
+
+def has_columnar(root):
+    return os.path.isdir(os.path.join(root, "columnar"))
+
+
+def load_sections(root, sections=tuple(SECTIONS), dataset_ids=None, backend="auto", workers=None):
+    # {section: DataFrame}; backend is "csv", "parquet" or "auto" (parquet when SCRAPPED_DATA/columnar exists).
+    if backend == "parquet" or (backend == "auto" and has_columnar(root)):
+        from Scraper_Helpers.columnar_store import load_table
+        return {section: load_table(os.path.join(root, "columnar"), section, dataset_ids) for section in sections}
+    return load_csv_sections(root, sections, dataset_ids, workers)
+
+
+def load_section(root, section, dataset_ids=None, backend="auto", workers=None):
+    return load_sections(root, (section,), dataset_ids, backend, workers)[section]
+
+
+def load_measurements(root, dataset_ids=None, backend="auto", workers=None):
+    return load_section(root, "measurements", dataset_ids, backend, workers)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Load a scraped ORD tree into Inputs/Products/Measurements tables")
+    parser.add_argument("root", nargs="?", default="SCRAPPED_DATA", help="ORD output directory")
+    parser.add_argument("--dataset", nargs="*", default=None, help="only these ord_dataset-... ids")
+    parser.add_argument("--backend", choices=["auto", "csv", "parquet"], default="auto")
+    parser.add_argument("--workers", type=int, default=None, help="loader processes (default: one per CPU)")
+    parser.add_argument("--out", default=None, help="write <out>/<section>.parquet for each table")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    tables = load_sections(os.path.abspath(args.root), dataset_ids=args.dataset, backend=args.backend, workers=args.workers)
+    elapsed = time.perf_counter() - started
+    for section, frame in tables.items():
+        print(f"{section:<13} {len(frame):>10} rows  {frame['reaction_id'].nunique():>8} reactions")
+    print(f"Loaded in {elapsed:.2f}s")
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        for section, frame in tables.items():
+            frame.to_parquet(os.path.join(args.out, f"{section}.parquet"), index=False)
+        print(f"Wrote {', '.join(tables)} to {args.out}")
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import argparse
+import os
+
+from ord_records import UNIT_SYMBOLS
+from ord_loader import load_measurements
+
+# Typed analytics over the scraped Measurements rows. Value is free text
+# ("85%", "12.5 mg", "3.2 min", "254 NANOMETER", "0.93", ...); it is split into
+# magnitude + unit and normalised to one base unit per quantity, so yields,
+# masses and times can be aggregated directly.
+# Only the distinct value strings are parsed (a few thousand even for millions
+# of rows); the results are broadcast back with the factorize codes.
+VALUE_PATTERN = r'^\s*(?P<magnitude>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*(?P<unit>[^\d\s].*?)?\s*$'
+
+# unit (lower case) -> (quantity, factor to the base unit, base unit)
+UNITS = {
+    "%": ("percentage", 1.0, "%"),
+    "g": ("mass", 1.0, "g"), "mg": ("mass", 1e-3, "g"), "µg": ("mass", 1e-6, "g"), "ug": ("mass", 1e-6, "g"),
+    "kg": ("mass", 1e3, "g"),
+    "mol": ("amount", 1.0, "mol"), "mmol": ("amount", 1e-3, "mol"), "µmol": ("amount", 1e-6, "mol"),
+    "umol": ("amount", 1e-6, "mol"), "nmol": ("amount", 1e-9, "mol"),
+    "l": ("volume", 1.0, "L"), "ml": ("volume", 1e-3, "L"), "µl": ("volume", 1e-6, "L"),
+    "ul": ("volume", 1e-6, "L"), "nl": ("volume", 1e-9, "L"),
+    "s": ("time", 1 / 60, "min"), "sec": ("time", 1 / 60, "min"), "min": ("time", 1.0, "min"),
+    "h": ("time", 60.0, "min"), "hr": ("time", 60.0, "min"), "d": ("time", 1440.0, "min"),
+    "nm": ("wavelength", 1.0, "nm"), "nanometer": ("wavelength", 1.0, "nm"),
+    "": ("number", 1.0, ""),
+}
+# The record enum names (MILLIGRAM, HOUR, ...) that ord_http falls back to for unknown symbols.
+UNITS.update({name.lower(): UNITS[symbol.lower()] for name, symbol in UNIT_SYMBOLS.items()})
+
+YIELD_BINS = np.arange(0, 110, 10)
+
+
+def parse_values(values):
+    # values: Series of Value strings -> DataFrame of magnitude, unit, quantity, normalized_value, normalized_unit.
+    codes, uniques = pd.factorize(values.fillna("").astype(str))
+    parts = pd.Series(uniques, dtype=object).str.extract(VALUE_PATTERN)
+    magnitude = pd.to_numeric(parts["magnitude"], errors="coerce").to_numpy(dtype=float)
+    unit = parts["unit"].fillna("").to_numpy(dtype=object)
+    lookup = [UNITS.get(u.lower()) for u in unit]
+    quantity = np.array([entry[0] if entry else None for entry in lookup], dtype=object)
+    factor = np.array([entry[1] if entry else np.nan for entry in lookup], dtype=float)
+    base_unit = np.array([entry[2] if entry else None for entry in lookup], dtype=object)
+    # Free text gets a NaN magnitude; it and unknown units (ranges, ...) get no quantity and no normalized_value.
+    quantity[np.isnan(magnitude)] = None
+    base_unit[np.isnan(magnitude)] = None
+
+    # codes are -1 only for missing values, which fillna("") already removed.
+    return pd.DataFrame({
+        "magnitude": magnitude[codes],
+        "unit": pd.Categorical(unit[codes]),
+        "quantity": pd.Categorical(quantity[codes]),
+        "normalized_value": (magnitude * factor)[codes],
+        "normalized_unit": pd.Categorical(base_unit[codes]),
+    }, index=values.index)
+
+
+def typed_measurements(measurements):
+    typed = measurements.join(parse_values(measurements["value"]))
+    typed["type"] = typed["type"].astype("category")
+    return typed
+
+
+def dataset_summary(typed):
+    # Count/mean/median/min/max per dataset, measurement type and quantity.
+    parsed = typed.dropna(subset=["normalized_value"])
+    return (parsed.groupby(["dataset_id", "type", "quantity", "normalized_unit"], observed=True)["normalized_value"]
+            .agg(["count", "mean", "median", "min", "max"])
+            .reset_index())
+
+
+def yield_distribution(typed, bins=YIELD_BINS):
+    # Per-dataset yield statistics plus a histogram (one column per bin).
+    yields = typed[(typed["type"] == "YIELD") & (typed["quantity"] == "percentage")]
+    if yields.empty:
+        return pd.DataFrame()
+    values = yields["normalized_value"].clip(bins[0], bins[-1])
+    stats = values.groupby(yields["dataset_id"]).describe(percentiles=[0.1, 0.5, 0.9])
+    labels = [f"{int(low)}-{int(high)}%" for low, high in zip(bins[:-1], bins[1:])]
+    histogram = pd.crosstab(yields["dataset_id"], pd.cut(values, bins, labels=labels, include_lowest=True))
+    histogram = histogram.reindex(columns=labels, fill_value=0)
+    return stats.join(histogram)
+
+
+def write_frame(frame, path):
+    if path.endswith(".parquet"):
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_csv(path, index=False)
+    print(f"Wrote {len(frame)} rows to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse scraped ORD measurement values into typed tables")
+    parser.add_argument("root", nargs="?", default="SCRAPPED_DATA", help="ORD output directory")
+    parser.add_argument("--dataset", nargs="*", default=None, help="only these ord_dataset-... ids")
+    parser.add_argument("--backend", choices=["auto", "csv", "parquet"], default="auto")
+    parser.add_argument("--typed-out", help="write the typed measurement rows (.parquet or .csv)")
+    parser.add_argument("--summary-out", help="write per-dataset/type statistics (.parquet or .csv)")
+    args = parser.parse_args()
+
+    measurements = load_measurements(os.path.abspath(args.root), args.dataset, args.backend)
+    typed = typed_measurements(measurements)
+    parsed = typed["normalized_value"].notna().sum()
+    print(f"{len(typed)} measurement rows, {parsed} with a numeric value "
+          f"({typed['dataset_id'].nunique()} datasets, {typed['reaction_id'].nunique()} reactions)")
+    if args.typed_out:
+        write_frame(typed, args.typed_out)
+    if args.summary_out:
+        write_frame(dataset_summary(typed), args.summary_out)
+    with pd.option_context("display.width", 200, "display.max_columns", 30):
+        print("\nYield distribution per dataset:")
+        print(yield_distribution(typed))
@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Scraper_Helpers.instrumentation import phase
+from ord_records import reaction_id_from_url
+import ord_http
+
+# One engine worker's lookahead (OrdAdapter.make_prefetcher): while the current
+# reaction is being extracted, the next ones are already on their way, so
+# page-load latency hides behind extraction instead of adding to it.
+#   fast path on:  a small thread pool fetches the upcoming reaction records;
+#   fast path off: the upcoming detail pages load in background tabs of the
+#                  session's browser.
+# `depth` counts the reactions after the current one: up to `depth` of them
+# load while it is extracted, besides whatever is still held for the current
+# one. Requests still go through the shared scheduler, so pacing and back-off
+# apply as usual.
+DEFAULT_DEPTH = 3
+
+
+class ReactionPrefetcher:
+    def __init__(self, session, depth=DEFAULT_DEPTH, fast_path=True):
+        self.session = session
+        self.depth = max(1, depth)
+        self.fast_path = fast_path
+        self.records = {}
+        self.executor = ThreadPoolExecutor(max_workers=self.depth, thread_name_prefix="ord-prefetch") if fast_path else None
+
+    def ahead(self, current_url, upcoming_urls):
+        # Starts loading the first `depth` of upcoming_urls (the reactions after current_url)
+        # that are not loading yet. What is held for current_url stays for it to use;
+        # anything loaded for a URL outside the window is let go.
+        window = upcoming_urls[:self.depth]
+        keep = set(window) | {current_url}
+        for url in [url for url in self.records if url not in keep]:
+            self.records.pop(url).cancel()
+        if self.fast_path:
+            for url in window:
+                reaction_id = reaction_id_from_url(url)
+                if url not in self.records and reaction_id:
+                    self.records[url] = self.executor.submit(ord_http.fetch_reaction_json, reaction_id)
+            return
+        try:
+            for url in [url for url in self.session.preloaded if url not in keep]:
+                self.session.drop_preloaded(url)
+            for url in window:
+                self.session.preload(url)
+        except Exception as e:
+            # The current reaction then loads normally, on a fresh browser if this one is gone.
+            print(f"Could not preload upcoming reactions: {e}")
+            self.session.discard()
+
+    def reaction(self, url):
+        # The prefetched reaction record (raises what the fetch raised), or None if it was never requested.
+        future = self.records.pop(url, None)
+        if future is None:
+            return None
+        with phase("prefetch_wait"):
+            return future.result()
+
+    def open_page(self, url):
+        # The session's driver switched to url's preloaded tab, or None if there is none.
+        if self.fast_path:
+            return None
+        return self.session.adopt_preloaded(url)
+
+    def close(self):
+        if self.executor is not None:
+            for future in self.records.values():
+                future.cancel()
+            self.executor.shutdown(wait=True)
+        self.records = {}
@@ -0,0 +1,304 @@
+import glob
+import csv
+import re
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Scraper_Helpers.row_sink import SectionedCsvSink
+from Scraper_Helpers.instrumentation import log
+from Scraper_Helpers.molecule_dictionary import get_molecules, encode_header
+
+# Shared by the Selenium path (ORD.py) and the browser-free path (ord_http.py)
+# so both produce byte-identical CSVs.
+
+INPUTS_HEADER = ["Section", "Tab", "Raw_Index", "Identifiers", "Reaction_Role"]
+PRODUCTS_HEADER = ["Section", "Outcome_Index", "Product_Index", "Identifiers", "Reaction_Role"]
+MEASUREMENTS_HEADER = ["Section", "Outcome_Index", "Measurement_Block_Index", "Type", "Value"]
+
+MEASUREMENT_COLUMNS = 5
+IDENTIFIERS_COLUMN = INPUTS_HEADER.index("Identifiers")  # same position in PRODUCTS_HEADER
+
+# Display units used by the measurements table on the detail page.
+UNIT_SYMBOLS = {
+    "GRAM": "g", "MILLIGRAM": "mg", "MICROGRAM": "µg", "KILOGRAM": "kg",
+    "MOLE": "mol", "MILLIMOLE": "mmol", "MICROMOLE": "µmol", "NANOMOLE": "nmol",
+    "LITER": "L", "MILLILITER": "mL", "MICROLITER": "µL", "NANOLITER": "nL",
+    "SECOND": "s", "MINUTE": "min", "HOUR": "h", "DAY": "d",
+}
+
+
+def extract_identifiers_and_role(pre_texts):
+    identifiers_value = None
+    reaction_role_value = None
+    for pre_text in pre_texts:
+        if pre_text.startswith('identifiers:'):
+            match_val = re.search(r'"value":\s*"([^"]+)"', pre_text)
+            if match_val:
+                identifiers_value = match_val.group(1)
+        elif pre_text.startswith('reaction_role:'):
+            match_role = re.match(r'reaction_role:\s*([^\s]+)', pre_text)
+            if match_role:
+                reaction_role_value = match_role.group(1)
+    return identifiers_value, reaction_role_value
+
+
+def measurement_pairs_from_cells(cell_texts):
+    # The measurements table is a flat list of div.value cells, five per row:
+    # the first is the type and the third the displayed value.
+    results = []
+    for i in range(0, len(cell_texts), MEASUREMENT_COLUMNS):
+        if i + 2 < len(cell_texts):
+            t = cell_texts[i].strip()
+            v = cell_texts[i + 2].strip()
+            if t:
+                results.append({"type": t, "value": v})
+    return results
+
+
+# Raw modal payloads -> records. Used by the batched collectors and by snapshot
+# replay, so re-extracting a cached page runs exactly the code a live crawl runs.
+def input_records(rows):
+    # rows: [{"tab", "raw_button_index", "pre_texts"}]
+    records = []
+    for row in rows:
+        identifiers_value, reaction_role_value = extract_identifiers_and_role(row["pre_texts"])
+        records.append({
+            "tab": row["tab"],
+            "raw_button_index": row["raw_button_index"],
+            "identifiers_value": identifiers_value,
+            "reaction_role": reaction_role_value
+        })
+    return records
+
+
+def product_records(rows):
+    # rows: [{"outcome_index", "product_index", "pre_texts"}]
+    records = []
+    for row in rows:
+        identifiers_value, reaction_role_value = extract_identifiers_and_role(row["pre_texts"])
+        records.append({
+            "outcome_index": row["outcome_index"],
+            "product_index": row["product_index"],
+            "identifiers_value": identifiers_value,
+            "reaction_role": reaction_role_value
+        })
+    return records
+
+
+def measurement_records(blocks):
+    # blocks: [{"outcome_index", "measurement_index", "cells"}]
+    return [
+        {
+            "outcome_index": block["outcome_index"],
+            "measurement_index": block["measurement_index"],
+            "pairs": measurement_pairs_from_cells(block["cells"])
+        }
+        for block in blocks
+    ]
+
+
+def reaction_id_from_url(ord_url):
+    match = re.search(r'(ord-[\w\d]+)', ord_url)
+    return match.group(1) if match else None
+
+
+def dataset_id_from_url(url):
+    match = re.search(r'(ord_dataset-[\w\d]+)', url)
+    return match.group(1) if match else None
+
+
+def csv_path_for(ord_url, dataset_dir):
+    reaction_id = reaction_id_from_url(ord_url)
+    csv_basename = f"{reaction_id}.csv" if reaction_id else "scraped_output.csv"
+    return os.path.join(dataset_dir, csv_basename)
+
+
+def read_ord_csv(path):
+    # {section: (header, rows)}. Sections are separated by a blank row and
+    # each starts with its own header; the first cell of a data row names its section.
+    sections = {}
+    header = None
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if not row:
+                header = None
+                continue
+            if row[0] == "Section":
+                header = row
+                continue
+            sections.setdefault(row[0], (header, []))[1].append(row)
+    return sections
+
+
+def reaction_csv_paths(root, dataset_ids=None):
+    # [(dataset_id, reaction_id, path)] in a stable order.
+    if dataset_ids:
+        dataset_dirs = [os.path.join(root, dataset_id) for dataset_id in dataset_ids]
+    else:
+        dataset_dirs = sorted(glob.glob(os.path.join(root, "ord_dataset-*")))
+    paths = []
+    for dataset_dir in dataset_dirs:
+        dataset_id = os.path.basename(dataset_dir)
+        for path in sorted(glob.glob(os.path.join(dataset_dir, "ord-*.csv"))):
+            paths.append((dataset_id, os.path.splitext(os.path.basename(path))[0], path))
+    return paths
+
+
+def input_row(entry):
+    return ["Inputs", entry['tab'], entry['raw_button_index'], entry['identifiers_value'], entry['reaction_role']]
+
+
+def product_row(entry):
+    return ["Products", entry['outcome_index'], entry['product_index'], entry['identifiers_value'], entry['reaction_role']]
+
+
+def measurement_rows(entry):
+    return [
+        ["Measurements", entry['outcome_index'], entry['measurement_index'], p['type'], p['value']]
+        for p in entry["pairs"]
+    ]
+
+
+class OrdCsvSink:
+    # Streams one reaction's rows into SCRAPPED_DATA/<dataset>/ord-xxxx.csv as they are scraped.
+    # With a molecule dictionary the Identifiers column becomes Molecule_ID.
+    def __init__(self, csv_path, molecules=None):
+        self.csv_path = csv_path
+        self.molecules = molecules
+        encode = encode_header if molecules is not None else list
+        self.sink = SectionedCsvSink(csv_path, [
+            ("Inputs", encode(INPUTS_HEADER)),
+            ("Products", encode(PRODUCTS_HEADER)),
+            ("Measurements", MEASUREMENTS_HEADER),
+        ])
+
+    def _encoded(self, row):
+        if self.molecules is not None:
+            row[IDENTIFIERS_COLUMN] = self.molecules.intern(row[IDENTIFIERS_COLUMN])
+        return row
+
+    def add_input(self, entry):
+        self.sink.write_row("Inputs", self._encoded(input_row(entry)))
+
+    def add_inputs(self, entries):
+        for entry in entries:
+            self.add_input(entry)
+
+    def add_product(self, entry):
+        self.sink.write_row("Products", self._encoded(product_row(entry)))
+
+    def add_products(self, entries):
+        for entry in entries:
+            self.add_product(entry)
+
+    def add_measurements(self, entry):
+        self.sink.write_rows("Measurements", measurement_rows(entry))
+
+    def add_measurement_blocks(self, entries):
+        for entry in entries:
+            self.add_measurements(entry)
+
+    def finalize(self):
+        self.sink.finalize()
+        counts = self.sink.counts()
+        log(f"\nCSV saved as: {self.csv_path} "
+            f"({counts['Inputs']} inputs, {counts['Products']} products, {counts['Measurements']} measurements)")
+        return self.csv_path
+
+    def abort(self):
+        self.sink.abort()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finalize()
+        else:
+            self.abort()
+
+
+class OrdColumnarSink:
+    # Same interface as OrdCsvSink, but rows go to the crawl-wide ColumnarStore.
+    # A reaction's rows are held until finalize(), which replaces anything the
+    # store held for the reaction, so a failed scrape adds nothing and a re-scrape
+    # never duplicates rows.
+    # Parquet already dictionary-encodes strings on disk; the molecule dictionary
+    # keeps one copy of each identifier in the store's buffers.
+    def __init__(self, store, dataset_id, reaction_id, molecules=None):
+        self.store = store
+        self.dataset_id = dataset_id
+        self.reaction_id = reaction_id
+        self.molecules = molecules
+        self.rows = {"inputs": [], "products": [], "measurements": []}
+
+    def _identifier(self, value):
+        return self.molecules.shared(value) if self.molecules is not None else value
+
+    def add_input(self, entry):
+        self.rows["inputs"].append({
+            "reaction_id": self.reaction_id, "tab": entry['tab'], "raw_index": entry['raw_button_index'],
+            "identifiers": self._identifier(entry['identifiers_value']), "reaction_role": entry['reaction_role'],
+        })
+
+    def add_inputs(self, entries):
+        for entry in entries:
+            self.add_input(entry)
+
+    def add_product(self, entry):
+        self.rows["products"].append({
+            "reaction_id": self.reaction_id, "outcome_index": entry['outcome_index'], "product_index": entry['product_index'],
+            "identifiers": self._identifier(entry['identifiers_value']), "reaction_role": entry['reaction_role'],
+        })
+
+    def add_products(self, entries):
+        for entry in entries:
+            self.add_product(entry)
+
+    def add_measurements(self, entry):
+        for p in entry["pairs"]:
+            self.rows["measurements"].append({
+                "reaction_id": self.reaction_id, "outcome_index": entry['outcome_index'],
+                "measurement_block_index": entry['measurement_index'], "type": p['type'], "value": p['value'],
+            })
+
+    def add_measurement_blocks(self, entries):
+        for entry in entries:
+            self.add_measurements(entry)
+
+    def finalize(self):
+        self.store.replace_unit(self.dataset_id, self.reaction_id, self.rows)
+        log(f"\nStored {self.reaction_id} in {self.store.root} "
+            f"({len(self.rows['inputs'])} inputs, {len(self.rows['products'])} products, {len(self.rows['measurements'])} measurements)")
+
+    def abort(self):
+        self.rows = {"inputs": [], "products": [], "measurements": []}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finalize()
+        else:
+            self.abort()
+
+
+def open_ord_sink(ord_url, dataset_dir, store=None):
+    if store is None:
+        return OrdCsvSink(csv_path_for(ord_url, dataset_dir), get_molecules())
+    reaction_id = reaction_id_from_url(ord_url) or ord_url
+    return OrdColumnarSink(store, os.path.basename(os.path.normpath(dataset_dir)), reaction_id, get_molecules())
+
+
+def write_ord_records(sink, inputs_scraped_data, products_scraped_data, measurements_scraped_data):
+    with sink:
+        sink.add_inputs(inputs_scraped_data)
+        sink.add_products(products_scraped_data)
+        sink.add_measurement_blocks(measurements_scraped_data)
+
+
+def write_ord_csv(csv_path, inputs_scraped_data, products_scraped_data, measurements_scraped_data):
+    write_ord_records(OrdCsvSink(csv_path, get_molecules()), inputs_scraped_data, products_scraped_data, measurements_scraped_data)
+    return csv_path
@@ -0,0 +1,6 @@
+import sys
+
+from Scraper_Helpers.engine import main
+
+# python -m Scraper_Helpers {ord,crd} [options]; see engine.py
+sys.exit(main())
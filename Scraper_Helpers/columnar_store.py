@@ -0,0 +1,251 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pyarrow.dataset as ds
+import threading
+import sqlite3
+import json
+import uuid
+import os
+
+# One Parquet store per crawl instead of one small CSV per reaction:
+#   <root>/<table>/dataset_id=<id>/part-<batch>.parquet
+# Scrapers hand the store whole units (an ORD reaction, a CRD reaction set)
+# once they are complete, through replace_unit(). Units are buffered per
+# dataset and written as one batch (a part file per table) of large row
+# groups, so a crawl produces a handful of files per dataset that load in one
+# call. Committed units are also appended to a JSON-lines spool under
+# <root>/_spool; a restarted store writes any leftover spool out first, so
+# nothing the crawl ledger already marked done is lost with the process.
+# <root>/_units.sqlite maps each (dataset, unit) to the batch holding its
+# rows. Writing a unit again (a retry, refresh or re-scrape) replaces it: the
+# older batch is rewritten without it, so every unit's rows appear once.
+# Batches are recorded as "writing" before their files exist and only become
+# "live" together with the unit mapping; a store opened after a crash removes
+# the files of batches that never went live or were already superseded.
+ROWS_PER_FILE = 100_000
+
+TABLES = {
+    "inputs": pa.schema([
+        ("reaction_id", pa.string()),
+        ("tab", pa.string()),
+        ("raw_index", pa.int32()),
+        ("identifiers", pa.string()),
+        ("reaction_role", pa.string()),
+    ]),
+    "products": pa.schema([
+        ("reaction_id", pa.string()),
+        ("outcome_index", pa.int32()),
+        ("product_index", pa.int32()),
+        ("identifiers", pa.string()),
+        ("reaction_role", pa.string()),
+    ]),
+    "measurements": pa.schema([
+        ("reaction_id", pa.string()),
+        ("outcome_index", pa.int32()),
+        ("measurement_block_index", pa.int32()),
+        ("type", pa.string()),
+        ("value", pa.string()),
+    ]),
+    "crd_smiles": pa.schema([
+        ("row_index", pa.int32()),
+        ("type", pa.string()),
+        ("smiles", pa.string()),
+    ]),
+}
+
+# Column naming the unit a row belongs to; None when the unit is the dataset itself (one CRD set per dataset_id).
+UNIT_COLUMNS = {"inputs": "reaction_id", "products": "reaction_id", "measurements": "reaction_id", "crd_smiles": None}
+
+WRITING = "writing"
+LIVE = "live"
+DEAD = "dead"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    dataset_id TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    batch TEXT NOT NULL,
+    PRIMARY KEY (dataset_id, unit)
+);
+CREATE INDEX IF NOT EXISTS units_batch ON units (batch);
+CREATE TABLE IF NOT EXISTS batches (
+    batch TEXT PRIMARY KEY,
+    dataset_id TEXT NOT NULL,
+    state TEXT NOT NULL
+);
+"""
+
+
+class ColumnarStore:
+    def __init__(self, root, rows_per_file=ROWS_PER_FILE):
+        self.root = root
+        self.rows_per_file = rows_per_file
+        self.lock = threading.Lock()
+        self.buffers = {}  # dataset_id -> {unit: {table: rows}}
+        self.buffered_rows = {}
+        self.spool_dir = os.path.join(root, "_spool")
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(root, "_units.sqlite"), check_same_thread=False, isolation_level=None)
+        self.conn.executescript(SCHEMA)
+        self._remove_unfinished_batches()
+        self._recover_spool()
+
+    def _spool_path(self, dataset_id):
+        return os.path.join(self.spool_dir, f"{dataset_id}.jsonl")
+
+    def _part_path(self, table, dataset_id, batch):
+        return os.path.join(self.root, table, f"dataset_id={dataset_id}", f"part-{batch}.parquet")
+
+    def _remove_batch_files(self, dataset_id, batch):
+        for table in TABLES:
+            path = self._part_path(table, dataset_id, batch)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _remove_unfinished_batches(self):
+        rows = self.conn.execute("SELECT batch, dataset_id FROM batches WHERE state != ?", (LIVE,)).fetchall()
+        for batch, dataset_id in rows:
+            self._remove_batch_files(dataset_id, batch)
+            self.conn.execute("DELETE FROM batches WHERE batch = ?", (batch,))
+
+    def _recover_spool(self):
+        for name in os.listdir(self.spool_dir):
+            if not name.endswith(".jsonl"):
+                continue
+            dataset_id = name[:-len(".jsonl")]
+            units = {}
+            with open(os.path.join(self.spool_dir, name), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by the crash; its unit was never reported done
+                    units[entry["unit"]] = entry["tables"]
+            self._write(dataset_id, units)
+            os.remove(os.path.join(self.spool_dir, name))
+            print(f"Recovered {len(units)} spooled units for {dataset_id}")
+
+    def replace_unit(self, dataset_id, unit, tables):
+        # tables: {table: [row dicts keyed by the table's column names]}, everything the unit has;
+        # whatever the store held for (dataset_id, unit) before is replaced.
+        unknown = set(tables) - set(TABLES)
+        if unknown:
+            raise ValueError(f"Unknown table: {', '.join(sorted(unknown))}")
+        with self.lock:
+            with open(self._spool_path(dataset_id), "a", encoding="utf-8") as spool:
+                spool.write(json.dumps({"unit": unit, "tables": tables}, ensure_ascii=False) + "\n")
+            buffer = self.buffers.setdefault(dataset_id, {})
+            buffer[unit] = tables
+            self.buffered_rows[dataset_id] = sum(len(rows) for units in buffer.values() for rows in units.values())
+            if self.buffered_rows[dataset_id] >= self.rows_per_file:
+                self._write_buffered(dataset_id)
+
+    def _write_table(self, table, dataset_id, batch, arrow_table):
+        partition_dir = os.path.dirname(self._part_path(table, dataset_id, batch))
+        os.makedirs(partition_dir, exist_ok=True)
+        tmp_path = os.path.join(partition_dir, f".part-{batch}.parquet.tmp")
+        pq.write_table(arrow_table, tmp_path, compression="zstd")
+        os.replace(tmp_path, self._part_path(table, dataset_id, batch))
+
+    def _without_units(self, table, dataset_id, batch, dropped):
+        # The rows of one of batch's files that belong to units not in dropped.
+        arrow_table = pq.read_table(self._part_path(table, dataset_id, batch), columns=TABLES[table].names)
+        column = UNIT_COLUMNS[table]
+        if column is None:
+            return arrow_table if dataset_id not in dropped else arrow_table.slice(0, 0)
+        return arrow_table.filter(pc.invert(pc.is_in(arrow_table[column], value_set=pa.array(sorted(dropped), pa.string()))))
+
+    def _write(self, dataset_id, units):
+        # Writes units as one new batch and rewrites the batches that held earlier copies of them.
+        if not units:
+            return
+        current = dict(self.conn.execute("SELECT unit, batch FROM units WHERE dataset_id = ?", (dataset_id,)).fetchall())
+        superseded = {}
+        for unit in units:
+            if unit in current:
+                superseded.setdefault(current[unit], set()).add(unit)
+        batch = uuid.uuid4().hex
+        survivors = {}  # old batch -> (new batch, units kept)
+        for old_batch, dropped in superseded.items():
+            kept = {unit for unit, held_in in current.items() if held_in == old_batch} - dropped
+            survivors[old_batch] = (uuid.uuid4().hex if kept else None, kept)
+        new_batches = [batch] + [new_batch for new_batch, _ in survivors.values() if new_batch]
+        self.conn.executemany("INSERT INTO batches (batch, dataset_id, state) VALUES (?, ?, ?)",
+                              [(new_batch, dataset_id, WRITING) for new_batch in new_batches])
+
+        for table, schema in TABLES.items():
+            rows = [row for tables in units.values() for row in tables.get(table, [])]
+            if rows:
+                self._write_table(table, dataset_id, batch, pa.Table.from_pylist(rows, schema=schema))
+            for old_batch, (new_batch, _) in survivors.items():
+                if new_batch and os.path.exists(self._part_path(table, dataset_id, old_batch)):
+                    kept_rows = self._without_units(table, dataset_id, old_batch, superseded[old_batch])
+                    if kept_rows.num_rows:
+                        self._write_table(table, dataset_id, new_batch, kept_rows)
+
+        self.conn.execute("BEGIN")
+        try:
+            mapping = [(dataset_id, unit, batch) for unit in units]
+            mapping += [(dataset_id, unit, new_batch) for new_batch, kept in survivors.values() for unit in kept]
+            self.conn.executemany("INSERT OR REPLACE INTO units (dataset_id, unit, batch) VALUES (?, ?, ?)", mapping)
+            self.conn.executemany("UPDATE batches SET state = ? WHERE batch = ?", [(LIVE, new_batch) for new_batch in new_batches])
+            self.conn.executemany("INSERT OR REPLACE INTO batches (batch, dataset_id, state) VALUES (?, ?, ?)",
+                                  [(old_batch, dataset_id, DEAD) for old_batch in superseded])
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        for old_batch in superseded:
+            self._remove_batch_files(dataset_id, old_batch)
+            self.conn.execute("DELETE FROM batches WHERE batch = ?", (old_batch,))
+
+    def _write_buffered(self, dataset_id):
+        self._write(dataset_id, self.buffers.pop(dataset_id, {}))
+        self.buffered_rows.pop(dataset_id, None)
+        spool_path = self._spool_path(dataset_id)
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+
+    def flush(self, dataset_id=None):
+        with self.lock:
+            for buffered_dataset in list(self.buffers):
+                if dataset_id is None or buffered_dataset == dataset_id:
+                    self._write_buffered(buffered_dataset)
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def load_table(root, table, dataset_ids=None, columns=None):
+    path = os.path.join(root, table)
+    if not os.path.isdir(path):
+        return TABLES[table].append(pa.field("dataset_id", pa.string())).empty_table().to_pandas()
+    dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    row_filter = ds.field("dataset_id").isin(list(dataset_ids)) if dataset_ids else None
+    return dataset.to_table(columns=columns, filter=row_filter).to_pandas()
+
+
+def list_datasets(root, table):
+    path = os.path.join(root, table)
+    if not os.path.isdir(path):
+        return []
+    return sorted(name.split("=", 1)[1] for name in os.listdir(path) if name.startswith("dataset_id="))
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Summarise a columnar scrape store")
+    parser.add_argument("root", help="store directory, e.g. SCRAPPED_DATA/columnar")
+    args = parser.parse_args()
+    for table in TABLES:
+        df = load_table(args.root, table)
+        print(f"{table:<13} {len(df):>10} rows  {len(list_datasets(args.root, table)):>6} datasets")
@@ -0,0 +1,234 @@
+from contextlib import contextmanager
+import threading
+import hashlib
+import sqlite3
+import time
+import zlib
+
+# Persistent record of crawl progress so a restarted run skips finished work.
+# Every unit (browse page, dataset, reaction, ...) is a (kind, key) row whose
+# status is in_progress, done or failed. Anything not done is retried.
+# The frontier table holds URLs found by a discovery pass (kind, key, url,
+# parent, priority) so a separate fetch pass can drain them without walking
+# pagination again; a frontier entry is pending until its work row is done.
+# For refreshes, fingerprints keeps a (count, digest) per listing (an ORD
+# dataset's reaction links, a CRD set's result count and first page); an entry
+# that a later listing no longer shows is marked removed rather than deleted.
+IN_PROGRESS = "in_progress"
+DONE = "done"
+FAILED = "failed"
+REMOVED = "removed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS work (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    parent TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS work_status ON work (kind, status);
+CREATE TABLE IF NOT EXISTS frontier (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    url TEXT NOT NULL,
+    parent TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    discovered_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    item_count INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    checked_at REAL NOT NULL,
+    changed_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+"""
+
+
+def listing_digest(items):
+    # Order-independent digest of the entries a listing shows.
+    return hashlib.sha1("\n".join(sorted(items)).encode("utf-8")).hexdigest()
+
+
+class CrawlLedger:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def status(self, kind, key):
+        with self.lock:
+            row = self.conn.execute("SELECT status FROM work WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        return row[0] if row else None
+
+    def is_done(self, kind, key):
+        return self.status(kind, key) == DONE
+
+    def start(self, kind, key, parent=None):
+        with self.lock:
+            self.conn.execute(
+                """INSERT INTO work (kind, key, parent, status, attempts, updated_at) VALUES (?, ?, ?, ?, 1, ?)
+                   ON CONFLICT (kind, key) DO UPDATE SET
+                       status = excluded.status, parent = COALESCE(excluded.parent, work.parent),
+                       attempts = work.attempts + 1, error = NULL, updated_at = excluded.updated_at""",
+                (kind, key, parent, IN_PROGRESS, time.time()),
+            )
+
+    def _set(self, kind, key, status, error=None):
+        with self.lock:
+            self.conn.execute(
+                """INSERT INTO work (kind, key, status, error, updated_at) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (kind, key) DO UPDATE SET
+                       status = excluded.status, error = excluded.error, updated_at = excluded.updated_at""",
+                (kind, key, status, error, time.time()),
+            )
+
+    def done(self, kind, key):
+        self._set(kind, key, DONE)
+
+    def failed(self, kind, key, error):
+        self._set(kind, key, FAILED, str(error)[:500])
+
+    def discover(self, kind, key, url, parent=None, priority=0):
+        # Adds a URL to the frontier; rediscovering it keeps the original entry and priority.
+        self.discover_many(kind, [(key, url)], parent, priority)
+
+    def discover_many(self, kind, keyed_urls, parent=None, priority=0):
+        # An entry marked removed that shows up again becomes pending again.
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(
+                    """INSERT INTO frontier (kind, key, url, parent, priority, discovered_at) VALUES (?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (kind, key) DO UPDATE SET url = excluded.url, parent = COALESCE(excluded.parent, frontier.parent)""",
+                    [(kind, key, url, parent, priority, now) for key, url in keyed_urls],
+                )
+                self.conn.executemany("DELETE FROM work WHERE kind = ? AND key = ? AND status = ?",
+                                      [(kind, key, REMOVED) for key, _ in keyed_urls])
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def listed_keys(self, kind, parent=None):
+        # Frontier keys of this kind (under parent, if given) not marked removed.
+        query = """SELECT f.key FROM frontier f LEFT JOIN work w ON w.kind = f.kind AND w.key = f.key
+                   WHERE f.kind = ? AND (w.status IS NULL OR w.status != ?)"""
+        params = [kind, REMOVED]
+        if parent is not None:
+            query += " AND f.parent = ?"
+            params.append(parent)
+        with self.lock:
+            return {row[0] for row in self.conn.execute(query, params)}
+
+    def mark_removed(self, kind, keys):
+        for key in keys:
+            self._set(kind, key, REMOVED)
+
+    def sync_listing(self, kind, parent, keyed_urls):
+        # Makes the frontier under parent match a fresh listing. Returns (added, removed) keys.
+        before = self.listed_keys(kind, parent)
+        self.discover_many(kind, keyed_urls, parent)
+        present = {key for key, _ in keyed_urls}
+        removed = before - present
+        self.mark_removed(kind, removed)
+        return present - before, removed
+
+    def fingerprint(self, kind, key):
+        # (item_count, digest) recorded the last time this listing was read, or None.
+        with self.lock:
+            row = self.conn.execute("SELECT item_count, digest FROM fingerprints WHERE kind = ? AND key = ?",
+                                    (kind, key)).fetchone()
+        return tuple(row) if row else None
+
+    def record_fingerprint(self, kind, key, item_count, digest):
+        # Returns True when the listing is new or differs from the recorded one.
+        changed = self.fingerprint(kind, key) != (item_count, digest)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                """INSERT INTO fingerprints (kind, key, item_count, digest, checked_at, changed_at) VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (kind, key) DO UPDATE SET item_count = excluded.item_count, digest = excluded.digest,
+                       checked_at = excluded.checked_at,
+                       changed_at = CASE WHEN ? THEN excluded.changed_at ELSE fingerprints.changed_at END""",
+                (kind, key, item_count, digest, now, now, changed),
+            )
+        return changed
+
+    def prioritize(self, kind, parent, priority):
+        with self.lock:
+            return self.conn.execute("UPDATE frontier SET priority = ? WHERE kind = ? AND parent = ?",
+                                     (priority, kind, parent)).rowcount
+
+    def frontier(self, kind, pending_only=True, shard=None):
+        # [(key, url, parent)] by priority, grouped by parent; shard=(index, count) keeps a stable 1/count slice.
+        skipped = (REMOVED, DONE) if pending_only else (REMOVED,)
+        query = f"""SELECT f.key, f.url, f.parent FROM frontier f
+                    LEFT JOIN work w ON w.kind = f.kind AND w.key = f.key
+                    WHERE f.kind = ? AND (w.status IS NULL OR w.status NOT IN ({', '.join('?' for _ in skipped)}))
+                    ORDER BY f.priority DESC, f.parent, f.key"""
+        with self.lock:
+            rows = self.conn.execute(query, (kind, *skipped)).fetchall()
+        if shard is not None:
+            index, count = shard
+            rows = [row for row in rows if zlib.crc32(row[0].encode("utf-8")) % count == index]
+        return rows
+
+    def frontier_counts(self):
+        # {kind: (discovered, done, removed)}; discovered excludes removed entries.
+        with self.lock:
+            rows = self.conn.execute(
+                """SELECT f.kind, SUM(CASE WHEN w.status = ? THEN 0 ELSE 1 END),
+                          SUM(CASE WHEN w.status = ? THEN 1 ELSE 0 END), SUM(CASE WHEN w.status = ? THEN 1 ELSE 0 END)
+                   FROM frontier f LEFT JOIN work w ON w.kind = f.kind AND w.key = f.key GROUP BY f.kind""",
+                (REMOVED, DONE, REMOVED)).fetchall()
+        return {kind: (total or 0, done or 0, removed or 0) for kind, total, done, removed in rows}
+
+    def reset(self, kinds):
+        # Forgets the status of these kinds (e.g. to rediscover) without touching the frontier; removed stays removed.
+        with self.lock:
+            self.conn.executemany("DELETE FROM work WHERE kind = ? AND status != ?", [(kind, REMOVED) for kind in kinds])
+
+    def keys(self, kind, status):
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT key FROM work WHERE kind = ? AND status = ?", (kind, status))]
+
+    def summary(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT kind, status, COUNT(*) FROM work GROUP BY kind, status ORDER BY kind, status").fetchall()
+        return {(kind, status): count for kind, status, count in rows}
+
+    def print_summary(self):
+        print("\nCrawl ledger:")
+        for (kind, status), count in self.summary().items():
+            print(f"  {kind:<10} {status:<12} {count}")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+@contextmanager
+def tracked(ledger, kind, key, parent=None):
+    # Marks the unit in_progress, then done or failed; a no-op when ledger is None.
+    if ledger is None:
+        yield
+        return
+    ledger.start(kind, key, parent)
+    try:
+        yield
+    except BaseException as e:
+        ledger.failed(kind, key, e)
+        raise
+    ledger.done(kind, key)
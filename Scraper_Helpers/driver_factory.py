@@ -0,0 +1,129 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+import socket
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from Scraper_Helpers.instrumentation import instrument_driver
+
+# One place that builds Chrome for both scrapers: pinned driver binary (no
+# webdriver-manager lookup on every start), headless, eager page loads and a
+# profile that never downloads images, fonts or media we do not read.
+DRIVER_PATH_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "scraper_helpers", "chromedriver_path")
+
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav",
+]
+
+# Browser caches live in a fixed pool of slot directories per host, reused
+# across browsers, recycles and runs. A browser holds its slot's lock file
+# until it quits, so concurrent Chromes (in this or any other process) never
+# share one cache.
+CACHE_SLOTS = int(os.environ.get("SCRAPER_CACHE_SLOTS", 16))
+
+
+def chromedriver_path():
+    # CHROMEDRIVER_PATH pins an explicit binary; otherwise the path resolved once
+    # by webdriver-manager is cached and reused until the file disappears.
+    pinned = os.environ.get("CHROMEDRIVER_PATH")
+    if pinned and os.path.exists(pinned):
+        return pinned
+    if os.path.exists(DRIVER_PATH_CACHE):
+        with open(DRIVER_PATH_CACHE, encoding="utf-8") as f:
+            cached = f.read().strip()
+        if cached and os.path.exists(cached):
+            return cached
+    from webdriver_manager.chrome import ChromeDriverManager
+    path = ChromeDriverManager().install()
+    os.makedirs(os.path.dirname(DRIVER_PATH_CACHE), exist_ok=True)
+    with open(DRIVER_PATH_CACHE, "w", encoding="utf-8") as f:
+        f.write(path)
+    return path
+
+
+def build_options(headless=True, block_media=True, eager=True, cache_dir=None):
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--no-first-run")
+    options.add_argument("--no-default-browser-check")
+    if eager:
+        # Return from driver.get at DOMContentLoaded; our waits cover the rest.
+        options.page_load_strategy = "eager"
+    if block_media:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--autoplay-policy=user-gesture-required")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.images": 2,
+        })
+    if cache_dir:
+        options.add_argument(f"--disk-cache-dir={cache_dir}")
+    return options
+
+
+def _try_lock(lock_file):
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def claim_cache_slot(cache_dir):
+    # (slot_dir, lock_file) for the first free slot of this host's pool; closing lock_file frees it.
+    for index in range(CACHE_SLOTS):
+        slot_dir = os.path.join(os.path.abspath(cache_dir), f"{socket.gethostname()}-slot-{index}")
+        os.makedirs(slot_dir, exist_ok=True)
+        lock_file = open(os.path.join(slot_dir, ".lock"), "a+")
+        if _try_lock(lock_file):
+            return slot_dir, lock_file
+        lock_file.close()
+    print(f"All {CACHE_SLOTS} browser cache slots under {cache_dir} are in use; this browser runs without one")
+    return None, None
+
+
+def create_driver(headless=True, block_media=True, eager=True, cache_dir=None):
+    # cache_dir is a root shared by all browsers; each browser claims a slot of it (see CACHE_SLOTS).
+    slot_dir, lock_file = claim_cache_slot(cache_dir) if cache_dir else (None, None)
+    options = build_options(headless, block_media, eager, slot_dir)
+    try:
+        driver = instrument_driver(webdriver.Chrome(service=Service(chromedriver_path()), options=options))
+    except BaseException:
+        if lock_file is not None:
+            lock_file.close()
+        raise
+    if lock_file is not None:
+        original_quit = driver.quit
+
+        def quit():
+            try:
+                original_quit()
+            finally:
+                lock_file.close()
+
+        driver.quit = quit
+    if block_media:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            print(f"Could not block font/media requests: {e}")
+    if not headless:
+        driver.maximize_window()
+    return driver
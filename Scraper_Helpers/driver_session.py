@@ -0,0 +1,218 @@
+from selenium.common.exceptions import WebDriverException
+import os
+
+from Scraper_Helpers.driver_factory import create_driver
+from Scraper_Helpers.instrumentation import log, phase
+from Scraper_Helpers.scheduler import pace
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# One long-lived browser per worker, kept healthy over multi-hour crawls:
+#   - named tabs are opened once and reused with driver.get instead of a
+#     window.open / close / switch_to round trip per dataset or reaction;
+#   - the browser is recycled (quit + fresh start) at the next unit boundary
+#     once it has served MAX_COMMANDS WebDriver commands or grown past
+#     MAX_BROWSER_MB, so memory stays flat and late-crawl slowdowns don't build up.
+# The caller calls checkpoint() between units and simply carries on with the
+# next one; a recycle is invisible apart from the log line.
+# preload() starts pages loading in background tabs so their network time
+# overlaps work on the current page; a recycle drops them with the browser.
+MAX_COMMANDS = int(os.environ.get("SCRAPER_MAX_COMMANDS", 20_000))
+MAX_BROWSER_MB = float(os.environ.get("SCRAPER_MAX_BROWSER_MB", 1500))
+MEMORY_CHECK_EVERY = int(os.environ.get("SCRAPER_MEMORY_CHECK_EVERY", 20))  # checkpoints between memory reads
+
+
+def browser_memory_mb(driver):
+    # RSS of chromedriver's Chrome processes when psutil is installed, otherwise
+    # the JS heap of the current tab (smaller, but it grows with the same leaks).
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if psutil is not None and process is not None:
+        try:
+            children = psutil.Process(process.pid).children(recursive=True)
+            return sum(child.memory_info().rss for child in children) / 2**20
+        except psutil.Error:
+            pass
+    try:
+        used = driver.execute_script("return performance.memory ? performance.memory.usedJSHeapSize : null;")
+    except Exception:
+        return None
+    return used / 2**20 if used else None
+
+
+class DriverSession:
+    def __init__(self, make_driver=create_driver, max_commands=MAX_COMMANDS, max_memory_mb=MAX_BROWSER_MB,
+                 memory_check_every=MEMORY_CHECK_EVERY, name="browser"):
+        self.make_driver = make_driver
+        self.max_commands = max_commands
+        self.max_memory_mb = max_memory_mb
+        self.memory_check_every = max(1, memory_check_every)
+        self.name = name
+        self.driver = None
+        self.tabs = {}
+        self.current_tab = None
+        self.preloaded = {}
+        self.adopted = None
+        self.commands_at_start = 0
+        self.checkpoints = 0
+        self.stats = {"browsers": 0, "recycled": 0, "discarded": 0, "peak_mb": 0.0}
+
+    def get_driver(self):
+        # Starts the browser on first use, so runs served by the HTTP fast path never launch one.
+        if self.driver is None:
+            self.driver = self.make_driver()
+            self.tabs = {}
+            self.current_tab = None
+            self.commands_at_start = getattr(self.driver, "commands_served", 0)
+            self.checkpoints = 0
+            self.stats["browsers"] += 1
+        return self.driver
+
+    def tab(self, name):
+        # Switches to the named tab (opened once per browser) and returns the driver.
+        driver = self.get_driver()
+        if name == self.current_tab:
+            return driver
+        handle = self.tabs.get(name)
+        if handle is None:
+            if not self.tabs:
+                handle = driver.current_window_handle
+            else:
+                known = set(driver.window_handles)
+                driver.execute_script("window.open('about:blank', '_blank');")
+                handle = next(h for h in driver.window_handles if h not in known)
+            self.tabs[name] = handle
+        driver.switch_to.window(handle)
+        self.current_tab = name
+        return driver
+
+    def preload(self, url):
+        # Opens url in a new background tab and returns without waiting for it to load.
+        driver = self.get_driver()
+        if url in self.preloaded:
+            return
+        known = set(driver.window_handles)
+        # window.open returns before the page loads, so only the token is taken: timing it would feed
+        # near-zero latencies into the scheduler's back-off.
+        pace()
+        driver.execute_script("window.open(arguments[0], '_blank');", url)
+        self.preloaded[url] = next(h for h in driver.window_handles if h not in known)
+
+    def adopt_preloaded(self, url):
+        # Switches to url's background tab; None when url was not preloaded in the current browser.
+        handle = self.preloaded.pop(url, None)
+        if handle is None:
+            return None
+        self.driver.switch_to.window(handle)
+        self.current_tab = None
+        self.adopted = handle
+        return self.driver
+
+    def release_preloaded(self):
+        # Closes the adopted tab once its page has been read.
+        handle, self.adopted = self.adopted, None
+        if handle is not None and self.driver is not None:
+            self._close_tab(handle)
+
+    def drop_preloaded(self, url):
+        # Closes a background tab that will not be used after all.
+        handle = self.preloaded.pop(url, None)
+        if handle is not None and self.driver is not None:
+            self._close_tab(handle)
+
+    def _close_tab(self, handle):
+        self.driver.switch_to.window(handle)
+        self.driver.close()
+        self.driver.switch_to.window(self.driver.window_handles[0])
+        self.current_tab = None
+
+    def commands_served(self):
+        if self.driver is None:
+            return 0
+        return getattr(self.driver, "commands_served", 0) - self.commands_at_start
+
+    def needs_recycle(self):
+        if self.driver is None:
+            return None
+        commands = self.commands_served()
+        if self.max_commands and commands >= self.max_commands:
+            return f"{commands} commands served"
+        self.checkpoints += 1
+        if self.max_memory_mb and self.checkpoints % self.memory_check_every == 0:
+            memory = browser_memory_mb(self.driver)
+            if memory is not None:
+                self.stats["peak_mb"] = max(self.stats["peak_mb"], memory)
+                if memory >= self.max_memory_mb:
+                    return f"{memory:.0f} MB in use"
+        return None
+
+    def checkpoint(self):
+        # Call between units of work. Returns True when the browser was recycled,
+        # in which case tabs (and any page state) start fresh on the next use.
+        reason = self.needs_recycle()
+        if reason is None:
+            return False
+        log(f"[{self.name}] recycling browser: {reason}")
+        with phase("driver_recycle"):
+            self._quit()
+        self.stats["recycled"] += 1
+        return True
+
+    def discard(self):
+        # Drops a browser that crashed or is in an unknown state; the next get_driver() starts a new one.
+        if self.driver is not None:
+            self._quit()
+            self.stats["discarded"] += 1
+
+    def _quit(self):
+        driver, self.driver = self.driver, None
+        self.tabs = {}
+        self.current_tab = None
+        self.preloaded = {}
+        self.adopted = None
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"[{self.name}] could not quit browser cleanly: {e}")
+
+    def run(self, task, *args, **kwargs):
+        # Runs one unit, task(get_driver, ...), then checkpoints. A failure that
+        # touched the browser discards it; a browser error (crash, dead session)
+        # gets one retry of the same unit on a fresh browser before it is reported.
+        for attempt in (1, 2):
+            used_browser = False
+
+            def get_driver():
+                nonlocal used_browser
+                used_browser = True
+                return self.get_driver()
+
+            try:
+                result = task(get_driver, *args, **kwargs)
+            except Exception as e:
+                if not used_browser:
+                    raise
+                self.discard()
+                if attempt == 2 or not isinstance(e, WebDriverException):
+                    raise
+                print(f"[{self.name}] browser error, retrying on a fresh browser: {e}")
+                continue
+            self.checkpoint()
+            return result
+
+    def close(self):
+        if self.driver is not None:
+            self._quit()
+
+    def summary_line(self):
+        peak = f", peak {self.stats['peak_mb']:.0f} MB" if self.stats["peak_mb"] else ""
+        return (f"{self.stats['browsers']} browsers started, {self.stats['recycled']} recycled, "
+                f"{self.stats['discarded']} discarded after errors{peak}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,349 @@
+from collections import namedtuple
+from functools import partial
+import threading
+import importlib
+import asyncio
+import argparse
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+from Scraper_Helpers.crawl_ledger import CrawlLedger, tracked
+from Scraper_Helpers.instrumentation import Metrics, set_metrics, set_verbose, log, record
+from Scraper_Helpers.molecule_dictionary import MoleculeDictionary, set_molecules
+from Scraper_Helpers.scheduler import AdaptiveScheduler, set_scheduler, MAX_RATE
+from Scraper_Helpers.snapshot_cache import SnapshotCache, set_snapshots
+
+# One crawl pipeline for every site. A site adapter only says what is
+# specific to it:
+#   name, base_url          adapter id and the live site's root
+#   unit_kind               ledger kind of one unit of work (an ORD reaction, a CRD reaction set)
+#   ledger_file, metrics_file  file names under the output directory
+#   needs_browser           whether discover() / scrape() may use a browser
+#   prepare(engine)         per-run setup (e.g. what --refresh resets)
+#   discover(engine)        fills engine.ledger's frontier with units
+#   scrape(get_driver, engine, unit, prefetcher=None)  scrapes one unit into the engine's output
+# and may add optional hooks:
+#   before_fetch(engine)    runs after discovery, before the pending units are read
+#   make_prefetcher(session, depth)  an object with ahead(current_url, upcoming_urls)
+#                           / close() that starts loading a worker's next `depth`
+#                           units while it scrapes the current one
+#   scrape_async(engine, unit)  a coroutine version of scrape(); when the adapter
+#                           runs without a browser, units are then asyncio tasks
+#                           on one event loop instead of worker threads
+# The engine owns the rest: one scheduler pacing every request, the ledger
+# (so runs resume), `concurrency` workers each with its own DriverSession
+# (browsers start on first use and are recycled) and, with prefetch > 0, its
+# own lookahead, a stable shard of the frontier, the output backend (CSV or
+# the columnar store), the molecule dictionary, snapshots and metrics.
+ADAPTERS = {
+    "ord": ("ORD_SCRAPPER", "ord_adapter", "OrdAdapter"),
+    "crd": ("CRD", "crd_adapter", "CrdAdapter"),
+}
+
+Unit = namedtuple("Unit", ["key", "url", "parent"])
+
+
+def load_adapter(name):
+    # The adapter class; its site folder goes on sys.path so it imports its siblings plainly.
+    folder, module_name, class_name = ADAPTERS[name]
+    site_dir = os.path.join(REPO_ROOT, folder)
+    if site_dir not in sys.path:
+        sys.path.insert(0, site_dir)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def no_browser():
+    raise RuntimeError("this adapter was configured to run without a browser")
+
+
+def parse_shard(text):
+    index, count = (int(part) for part in text.split("/"))
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError("shard must be I/N with 0 <= I < N")
+    return index, count
+
+
+class ScrapeEngine:
+    def __init__(self, adapter, out_dir, base_url=None, concurrency=1, max_rate=MAX_RATE, limit=None,
+                 output_backend="csv", molecules_path=None, snapshots_dir=None, refresh=False, fresh=False,
+                 headed=False, browser_cache=None, max_commands=None, max_memory_mb=None, metrics_path=None,
+                 rescrape=False, shard=None, prefetch=0, ledger_path=None, shared_budget=None):
+        self.adapter = adapter
+        self.out_dir = os.path.abspath(out_dir)
+        self.base_url = base_url or adapter.base_url
+        self.concurrency = max(1, concurrency)
+        self.limit = limit
+        self.shard = shard
+        # Only adapters with a make_prefetcher hook look ahead.
+        self.prefetch = prefetch if hasattr(adapter, "make_prefetcher") else 0
+        self.refresh = refresh
+        # rescrape: discovery puts every unit back on the frontier (fingerprints are kept for refresh)
+        self.rescrape = rescrape
+        self.headed = headed
+        self.browser_cache = browser_cache
+        # None keeps DriverSession's defaults (SCRAPER_MAX_COMMANDS / SCRAPER_MAX_BROWSER_MB)
+        self.session_limits = {name: value for name, value in (("max_commands", max_commands), ("max_memory_mb", max_memory_mb))
+                               if value is not None}
+        self.lock = threading.Lock()
+        self.counts = {"done": 0, "failed": 0}
+        # Per worker: {"done", "failed"} counts and, when it used one, its DriverSession.
+        self.worker_counts = {}
+        self.worker_sessions = {}
+        self.sessions = []
+        os.makedirs(self.out_dir, exist_ok=True)
+
+        ledger_path = ledger_path or os.path.join(self.out_dir, adapter.ledger_file)
+        if fresh:
+            # The ledger runs in WAL mode, so the old run may have left -wal / -shm files beside it.
+            for path in (ledger_path, ledger_path + "-wal", ledger_path + "-shm"):
+                if os.path.exists(path):
+                    os.remove(path)
+        self.ledger = CrawlLedger(ledger_path)
+        self.metrics = set_metrics(Metrics(metrics_path or os.path.join(self.out_dir, adapter.metrics_file)))
+        # One scheduler paces the discovery browser, every worker and their lookahead together.
+        self.scheduler = set_scheduler(AdaptiveScheduler(max_rate=max_rate, max_concurrency=self.concurrency * (1 + self.prefetch) + 1,
+                                                         shared_budget=shared_budget))
+        self.molecules = set_molecules(MoleculeDictionary(molecules_path)) if molecules_path else None
+        self.snapshots = set_snapshots(SnapshotCache(snapshots_dir)) if snapshots_dir else None
+        self.store = None
+        if output_backend == "parquet":
+            from Scraper_Helpers.columnar_store import ColumnarStore
+            self.store = ColumnarStore(os.path.join(self.out_dir, "columnar"))
+        self.main_session = self.new_session("discovery browser") if adapter.needs_browser else None
+
+    def new_session(self, name):
+        # Selenium is only imported once an adapter actually needs a browser.
+        from Scraper_Helpers.driver_factory import create_driver
+        from Scraper_Helpers.driver_session import DriverSession
+        session = DriverSession(partial(create_driver, headless=not self.headed, cache_dir=self.browser_cache),
+                                name=name, **self.session_limits)
+        with self.lock:
+            self.sessions.append(session)
+        return session
+
+    def run(self, phase="all"):
+        # phase: "discover", "fetch" or "all"; returns {"done": n, "failed": n} for the fetch.
+        self.ledger.print_summary()
+        self.adapter.prepare(self)
+        if phase in ("discover", "all"):
+            if self.rescrape:
+                self.ledger.reset([self.adapter.unit_kind])
+            self.adapter.discover(self)
+            if self.main_session is not None:
+                self.main_session.close()
+        if phase in ("fetch", "all"):
+            if hasattr(self.adapter, "before_fetch"):
+                self.adapter.before_fetch(self)
+            units = self.pending_units()
+            log(f"\nScraping {len(units)} pending {self.adapter.unit_kind} units with {self.concurrency} workers")
+            self.run_units(units)
+        return self.counts
+
+    def pending_units(self):
+        return [Unit(*row) for row in self.ledger.frontier(self.adapter.unit_kind, shard=self.shard)][:self.limit]
+
+    def run_units(self, units):
+        # Workers pull units in frontier order until none are left.
+        if not self.adapter.needs_browser and hasattr(self.adapter, "scrape_async"):
+            asyncio.run(self.run_units_async(units))
+            return
+        remaining = iter(units)
+        workers = [
+            threading.Thread(target=self._work, args=(worker_id, remaining),
+                             name=f"{self.adapter.name}-worker-{worker_id}", daemon=True)
+            for worker_id in range(1, min(self.concurrency, len(units)) + 1)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    def _work(self, worker_id, remaining):
+        # With prefetch, a worker holds the `prefetch` units after its current one so they load meanwhile.
+        session = self.new_session(f"worker {worker_id}") if self.adapter.needs_browser else None
+        counts = self.new_worker(worker_id, session)
+        prefetcher = self.adapter.make_prefetcher(session, self.prefetch) if self.prefetch > 0 else None
+        upcoming = []
+        parent = None
+        try:
+            while True:
+                with self.lock:
+                    while len(upcoming) < self.prefetch + 1:
+                        unit = next(remaining, None)
+                        if unit is None:
+                            break
+                        upcoming.append(unit)
+                if not upcoming:
+                    return
+                unit = upcoming.pop(0)
+                if prefetcher is not None:
+                    prefetcher.ahead(unit.url, [later.url for later in upcoming])
+                # The columnar store writes out a parent's buffered rows once this worker moves past it.
+                if self.store is not None and parent not in (None, unit.parent):
+                    self.store.flush(parent)
+                parent = unit.parent
+                self.run_unit(session, unit, prefetcher, counts)
+        finally:
+            if prefetcher is not None:
+                prefetcher.close()
+            if session is not None:
+                session.close()
+
+    async def run_units_async(self, units):
+        # `concurrency` tasks share the iterator; the scheduler paces them through navigation_async().
+        remaining = iter(units)
+        await asyncio.gather(*(self._work_async(worker_id, remaining)
+                               for worker_id in range(1, min(self.concurrency, len(units)) + 1)))
+
+    async def _work_async(self, worker_id, remaining):
+        counts = self.new_worker(worker_id)
+        parent = None
+        for unit in remaining:
+            if self.store is not None and parent not in (None, unit.parent):
+                self.store.flush(parent)
+            parent = unit.parent
+            try:
+                await self.scrape_unit_async(unit)
+                counts["done"] += 1
+            except Exception as e:
+                counts["failed"] += 1
+                print(f"Failed {self.adapter.unit_kind} {unit.key}: {e}")
+
+    async def scrape_unit_async(self, unit):
+        kind = self.adapter.unit_kind
+        try:
+            with record(kind, unit.key), tracked(self.ledger, kind, unit.key, unit.parent):
+                await self.adapter.scrape_async(self, unit)
+        except Exception:
+            with self.lock:
+                self.counts["failed"] += 1
+            raise
+        with self.lock:
+            self.counts["done"] += 1
+
+    def scrape_unit(self, session, unit, prefetcher=None):
+        # One unit, tracked in the ledger and counted; raises what the scrape raised.
+        # The session retries it once if its browser dies.
+        kind = self.adapter.unit_kind
+        try:
+            with record(kind, unit.key), tracked(self.ledger, kind, unit.key, unit.parent):
+                if session is None:
+                    self.adapter.scrape(no_browser, self, unit, prefetcher)
+                else:
+                    session.run(self.adapter.scrape, self, unit, prefetcher)
+        except Exception:
+            with self.lock:
+                self.counts["failed"] += 1
+            raise
+        with self.lock:
+            self.counts["done"] += 1
+
+    def new_worker(self, worker_id, session=None):
+        counts = {"done": 0, "failed": 0}
+        with self.lock:
+            self.worker_counts[worker_id] = counts
+            if session is not None:
+                self.worker_sessions[worker_id] = session
+        return counts
+
+    def run_unit(self, session, unit, prefetcher=None, worker_counts=None):
+        # worker_counts: the calling worker's own {"done", "failed"} counts, if it keeps them.
+        try:
+            self.scrape_unit(session, unit, prefetcher)
+            status = "done"
+        except Exception as e:
+            status = "failed"
+            print(f"Failed {self.adapter.unit_kind} {unit.key}: {e}")
+        if worker_counts is not None:
+            worker_counts[status] += 1
+
+    def close(self):
+        for session in self.sessions:
+            session.close()
+        if self.store is not None:
+            self.store.close()
+        self.ledger.print_summary()
+        self.ledger.close()
+        if self.molecules is not None:
+            print(f"Molecule dictionary: {len(self.molecules)} distinct molecules in {self.molecules.path}")
+            self.molecules.close()
+        if self.snapshots is not None:
+            self.snapshots.print_summary()
+            self.snapshots.close()
+        self.scheduler.print_summary()
+        self.metrics.print_summary()
+        self.metrics.close()
+        workers = set(self.worker_sessions.values())
+        for session in self.sessions:
+            if session not in workers and session.stats["browsers"]:
+                print(f"{session.name.capitalize()}: {session.summary_line()}")
+        if self.worker_counts:
+            print("\nWorker summary:")
+        for worker_id, counts in sorted(self.worker_counts.items()):
+            session = self.worker_sessions.get(worker_id)
+            browser = f" | {session.summary_line()}" if session is not None and session.stats["browsers"] else ""
+            print(f"  worker {worker_id}: {counts['done']} done | {counts['failed']} failed{browser}")
+        print(f"\n{self.adapter.name.upper()}: {self.counts['done']} {self.adapter.unit_kind} units done | "
+              f"{self.counts['failed']} failed")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Scraper_Helpers",
+                                     description="Crawl ORD or CRD through the shared scraping engine")
+    parser.add_argument("site", choices=sorted(ADAPTERS))
+    parser.add_argument("--phase", choices=["discover", "fetch", "all"], default="all",
+                        help="discover: fill the frontier; fetch: scrape pending units; all: both")
+    parser.add_argument("--out", default="SCRAPPED_DATA", help="output directory")
+    parser.add_argument("--base-url", default=None, help="site root (default: the live site); point at a local stand-in for testing")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="units scraped in parallel, each worker with its own browser when it needs one")
+    parser.add_argument("--max-rate", type=float, default=MAX_RATE, help="requests per second across all workers")
+    parser.add_argument("--limit", type=int, default=None, help="scrape at most N pending units (reactions / reaction sets)")
+    parser.add_argument("--shard", type=parse_shard, default=None,
+                        help="I/N: scrape only a stable 1/N slice of the frontier, for splitting a crawl across machines")
+    parser.add_argument("--prefetch", type=int, default=0, metavar="K",
+                        help="ord: each worker keeps its next K reactions loading while it extracts the current one")
+    parser.add_argument("--max-pages", type=int, default=None, help="ord: stop discovery after N browse pages")
+    parser.add_argument("--browser", action="store_true", help="crd: load pages in a browser instead of over plain HTTP")
+    parser.add_argument("--fast-path", action="store_true",
+                        help="ord: read reaction records over HTTP, falling back to the browser for any that fail validation")
+    parser.add_argument("--output-backend", choices=["csv", "parquet"], default="csv",
+                        help="csv: the usual per-reaction / per-set CSVs; parquet: one store under <out>/columnar")
+    parser.add_argument("--molecules", default=None,
+                        help="molecule dictionary (e.g. <out>/molecules.sqlite); CSVs then store Molecule_ID")
+    parser.add_argument("--snapshots", default=None, help="save compressed page snapshots here for snapshot_replay.py")
+    parser.add_argument("--refresh", action="store_true",
+                        help="ord: walk the browse pages again; crd: re-check finished reaction sets, skipping unchanged ones")
+    parser.add_argument("--fresh", action="store_true", help="ignore the ledger and start over")
+    parser.add_argument("--rescrape", action="store_true",
+                        help="scrape every discovered unit again instead of resuming (fingerprints stay for --refresh)")
+    parser.add_argument("--headed", action="store_true", help="show the browser windows")
+    parser.add_argument("--browser-cache", default=None, help="persistent browser cache directory")
+    parser.add_argument("--recycle-commands", type=int, default=None,
+                        help="restart a browser after this many WebDriver commands (0 = never)")
+    parser.add_argument("--recycle-mb", type=float, default=None, help="restart a browser past this many MB (0 = never)")
+    parser.add_argument("--metrics", default=None, help="metrics JSONL file (default: under --out)")
+    parser.add_argument("--quiet", action="store_true", help="only print errors and the end-of-run summary")
+    args = parser.parse_args(argv)
+    set_verbose(not args.quiet)
+
+    if args.site == "ord":
+        if args.browser:
+            parser.error("--browser only applies to crd (ord always uses one)")
+        options = {"fast_path": args.fast_path, "max_pages": args.max_pages}
+    else:
+        if args.fast_path or args.max_pages is not None or args.prefetch:
+            parser.error("--fast-path, --max-pages and --prefetch only apply to ord")
+        options = {"browser": args.browser}
+    engine = ScrapeEngine(load_adapter(args.site)(**options), args.out, args.base_url, args.concurrency, args.max_rate,
+                          args.limit, args.output_backend, args.molecules, args.snapshots, args.refresh, args.fresh,
+                          args.headed, args.browser_cache, args.recycle_commands, args.recycle_mb, args.metrics,
+                          args.rescrape, args.shard, args.prefetch)
+    try:
+        engine.run(args.phase)
+    finally:
+        engine.close()
+    return 1 if engine.counts["failed"] else 0
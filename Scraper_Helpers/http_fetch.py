@@ -0,0 +1,13 @@
+import urllib.request
+
+# The one plain-HTTP GET both scrapers use (ORD reaction records, CRD listing
+# pages). Callers pace it with the scheduler's navigation() like a page load.
+HTTP_TIMEOUT = 30
+
+
+def fetch_text(url, headers=None, timeout=HTTP_TIMEOUT):
+    # The response body, decoded with the charset the server declares (UTF-8 otherwise).
+    request = urllib.request.Request(url, headers=headers or {})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        charset = response.headers.get_content_charset() or "utf-8"
+        return response.read().decode(charset, errors="replace")
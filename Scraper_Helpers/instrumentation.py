@@ -0,0 +1,195 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import defaultdict
+import threading
+import asyncio
+import time
+import json
+import os
+
+# Structured timing for the scrapers. A "record" is one unit of work (usually
+# one reaction); phases inside it (page_load, tab, modal, wait, sleep,
+# csv_write, ...) are timed and WebDriver commands are counted. Each finished
+# record is one JSON line, and summary() gives p50/p95 per phase for the run.
+# The current record lives in a ContextVar so worker threads and asyncio tasks
+# each attribute their own work.
+VERBOSE = os.environ.get("SCRAPER_VERBOSE", "1") != "0"
+MAX_SAMPLES_PER_PHASE = 200_000
+
+_current_record = ContextVar("scraper_record", default=None)
+
+
+def set_verbose(verbose):
+    global VERBOSE
+    VERBOSE = verbose
+
+
+def log(*args, **kwargs):
+    if VERBOSE:
+        print(*args, **kwargs)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Metrics:
+    def __init__(self, jsonl_path=None):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.record_counts = defaultdict(int)
+        self.unattributed_commands = 0
+        self.file = None
+        if jsonl_path:
+            os.makedirs(os.path.dirname(os.path.abspath(jsonl_path)), exist_ok=True)
+            self.file = open(jsonl_path, "a", encoding="utf-8")
+
+    def _sample(self, name, seconds):
+        samples = self.samples[name]
+        if len(samples) < MAX_SAMPLES_PER_PHASE:
+            samples.append(seconds)
+
+    @contextmanager
+    def record(self, kind, key):
+        record = {
+            "kind": kind,
+            "key": key,
+            "started_at": time.time(),
+            "phases": defaultdict(float),
+            "phase_counts": defaultdict(int),
+            "webdriver_commands": 0,
+        }
+        token = _current_record.set(record)
+        started = time.perf_counter()
+        status = "done"
+        try:
+            yield record
+        except BaseException:
+            status = "failed"
+            raise
+        finally:
+            _current_record.reset(token)
+            elapsed = time.perf_counter() - started
+            line = {
+                "kind": kind,
+                "key": key,
+                "status": status,
+                "started_at": record["started_at"],
+                "total_s": round(elapsed, 4),
+                "webdriver_commands": record["webdriver_commands"],
+                "phases_s": {name: round(value, 4) for name, value in record["phases"].items()},
+                "phase_counts": dict(record["phase_counts"]),
+            }
+            with self.lock:
+                self._sample(f"{kind}_total", elapsed)
+                self._sample(f"{kind}_webdriver_commands", record["webdriver_commands"])
+                self.record_counts[(kind, status)] += 1
+                if self.file:
+                    self.file.write(json.dumps(line) + "\n")
+                    self.file.flush()
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name, seconds):
+        record = _current_record.get()
+        if record is not None:
+            record["phases"][name] += seconds
+            record["phase_counts"][name] += 1
+        with self.lock:
+            self._sample(name, seconds)
+
+    def count_command(self, n=1):
+        record = _current_record.get()
+        if record is not None:
+            record["webdriver_commands"] += n
+        else:
+            with self.lock:
+                self.unattributed_commands += n
+
+    def summary(self):
+        with self.lock:
+            items = {name: sorted(values) for name, values in self.samples.items()}
+        return {
+            name: {
+                "count": len(values),
+                "total": sum(values),
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+            }
+            for name, values in items.items()
+        }
+
+    def print_summary(self):
+        print("\nRun summary (seconds unless noted):")
+        print(f"  {'phase':<34} {'count':>8} {'total':>10} {'p50':>9} {'p95':>9}")
+        for name, stats in sorted(self.summary().items()):
+            print(f"  {name:<34} {stats['count']:>8} {stats['total']:>10.2f} {stats['p50']:>9.3f} {stats['p95']:>9.3f}")
+        for (kind, status), count in sorted(self.record_counts.items()):
+            print(f"  {kind} {status}: {count}")
+        if self.unattributed_commands:
+            print(f"  WebDriver commands outside any record: {self.unattributed_commands}")
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    return _metrics
+
+
+def set_metrics(metrics):
+    global _metrics
+    _metrics = metrics
+    return metrics
+
+
+def record(kind, key):
+    return _metrics.record(kind, key)
+
+
+def phase(name):
+    return _metrics.phase(name)
+
+
+def add_time(name, seconds):
+    _metrics.add_time(name, seconds)
+
+
+def sleep(seconds, name="sleep"):
+    # Every deliberate pause goes through here (or sleep_async) so it shows up as a phase.
+    with _metrics.phase(name):
+        time.sleep(seconds)
+
+
+async def sleep_async(seconds, name="sleep"):
+    with _metrics.phase(name):
+        await asyncio.sleep(seconds)
+
+
+def instrument_driver(driver):
+    # Every WebDriver command (including WebElement calls) goes through driver.execute.
+    # commands_served is the browser's own total, for DriverSession's recycling.
+    original_execute = driver.execute
+    driver.commands_served = 0
+
+    def execute(driver_command, params=None):
+        driver.commands_served += 1
+        _metrics.count_command()
+        return original_execute(driver_command, params)
+
+    driver.execute = execute
+    return driver
@@ -0,0 +1,139 @@
+from functools import lru_cache
+import threading
+import sqlite3
+import csv
+import re
+
+# Dictionary encoding for molecules. The same solvents, reagents and catalysts
+# show up in thousands of reactions, so each distinct SMILES/identifier is
+# stored once in molecules.sqlite and rows carry its integer id instead.
+# Strings are canonicalized before lookup (RDKit when installed, otherwise
+# whitespace normalization) and the canonical forms are cached, so repeated
+# molecules cost one dict lookup. The canonical form is only the key: an ORD
+# identifier may be a name that happens to parse as SMILES ("BOC"), so each
+# entry also keeps the text as first scraped, and text(id) returns that.
+# One dictionary can be shared by the ORD and CRD scrapers; point both at the
+# same file.
+CANONICAL_CACHE_SIZE = 200_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS molecules (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL UNIQUE,
+    original TEXT
+);
+"""
+
+try:
+    from rdkit import Chem, RDLogger
+    RDLogger.DisableLog("rdApp.*")
+except ImportError:
+    Chem = None
+
+
+@lru_cache(maxsize=CANONICAL_CACHE_SIZE)
+def canonicalize(text):
+    text = re.sub(r'\s+', ' ', text).strip()
+    if Chem is not None and text and " " not in text:
+        mol = Chem.MolFromSmiles(text)
+        if mol is not None:
+            return Chem.MolToSmiles(mol)
+    return text
+
+
+class MoleculeDictionary:
+    def __init__(self, path=None):
+        # path=None keeps the dictionary in memory only (ids are then per run).
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path or ":memory:", check_same_thread=False, isolation_level=None)
+        if path:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        if "original" not in [row[1] for row in self.conn.execute("PRAGMA table_info(molecules)")]:
+            self.conn.execute("ALTER TABLE molecules ADD COLUMN original TEXT")  # dictionaries from before it was kept
+        self.ids = {}  # canonical text -> id
+        self.texts = {}  # id -> text as first scraped
+        self.originals = {}
+        for molecule_id, text, original in self.conn.execute("SELECT id, text, original FROM molecules"):
+            self.ids[text] = molecule_id
+            self.texts[molecule_id] = original or text
+
+    def intern(self, text):
+        # Returns the molecule's id, adding it on first sight; None/empty stays None.
+        if not text:
+            return None
+        canonical = canonicalize(text)
+        molecule_id = self.ids.get(canonical)
+        if molecule_id is not None:
+            return molecule_id
+        with self.lock:
+            molecule_id = self.ids.get(canonical)
+            if molecule_id is None:
+                self.conn.execute("INSERT OR IGNORE INTO molecules (text, original) VALUES (?, ?)", (canonical, text))
+                molecule_id, original = self.conn.execute(
+                    "SELECT id, COALESCE(original, text) FROM molecules WHERE text = ?", (canonical,)).fetchone()
+                self.texts[molecule_id] = original
+                self.ids[canonical] = molecule_id
+        return molecule_id
+
+    def shared(self, text):
+        # Registers the molecule and returns one shared copy of the text as
+        # scraped, so rows buffered in memory don't each hold their own string.
+        if not text:
+            return text
+        self.intern(text)
+        return self.originals.setdefault(text, text)
+
+    def text(self, molecule_id):
+        # The molecule as first scraped (other spellings of it share the id).
+        return self.texts[int(molecule_id)]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def export_csv(self, csv_path):
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Molecule_ID", "Text"])
+            writer.writerows(sorted(self.texts.items()))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+_molecules = None
+
+
+def get_molecules():
+    return _molecules
+
+
+def set_molecules(molecules):
+    # Sinks consult this; None (the default) writes full strings as before.
+    global _molecules
+    _molecules = molecules
+    return molecules
+
+
+def encode_header(header):
+    return ["Molecule_ID" if name in ("Identifiers", "SMILES") else name for name in header]
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Inspect or export a molecule dictionary")
+    parser.add_argument("path", help="molecules.sqlite written by a scraper run")
+    parser.add_argument("--export", help="write id,text pairs to this CSV")
+    parser.add_argument("--lookup", nargs="*", default=[], help="print the text for these ids")
+    args = parser.parse_args()
+    molecules = MoleculeDictionary(args.path)
+    print(f"{len(molecules)} distinct molecules in {args.path}")
+    for molecule_id in args.lookup:
+        print(f"{molecule_id}\t{molecules.text(molecule_id)}")
+    if args.export:
+        molecules.export_csv(args.export)
+        print(f"Exported to {args.export}")
+    molecules.close()
@@ -0,0 +1,381 @@
+from functools import partial
+import threading
+import sqlite3
+import glob
+import time
+import csv
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+from Scraper_Helpers.molecule_dictionary import canonicalize
+
+# A local SQLite index over everything both scrapers wrote, so "which reactions
+# use X / produce Y / report a YIELD" is an indexed lookup instead of a grep
+# over thousands of CSVs. Molecules are stored once (canonicalized the same way
+# as the molecule dictionary) and linked to reactions with their role; an FTS5
+# trigram table over the molecule texts serves substring searches.
+# update() is incremental: only CSVs whose size or mtime changed are re-read,
+# and reactions of CSVs that disappeared are dropped, along with molecules no
+# reaction uses any more.
+# Reading the CSVs uses ORD_SCRAPPER/ord_records.py and CRD/crd_parse.py, which
+# import their siblings plainly; the CLI below puts both folders on sys.path,
+# and a caller importing this module does the same.
+COMMIT_EVERY = 500  # files per transaction during update()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reactions (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    dataset_id TEXT NOT NULL,
+    reaction_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    UNIQUE (source, dataset_id, reaction_id)
+);
+CREATE INDEX IF NOT EXISTS reactions_path ON reactions (path);
+CREATE INDEX IF NOT EXISTS reactions_dataset ON reactions (dataset_id);
+CREATE TABLE IF NOT EXISTS molecules (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS components (
+    reaction INTEGER NOT NULL,
+    molecule INTEGER NOT NULL,
+    role TEXT
+);
+CREATE INDEX IF NOT EXISTS components_molecule ON components (molecule, role);
+CREATE INDEX IF NOT EXISTS components_reaction ON components (reaction);
+CREATE TABLE IF NOT EXISTS measurements (
+    reaction INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS measurements_type ON measurements (type);
+CREATE INDEX IF NOT EXISTS measurements_reaction ON measurements (reaction);
+"""
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS molecules_fts USING fts5(text, content='molecules', content_rowid='id', tokenize='trigram');
+"""
+
+# ORD sections / CRD row types -> the role stored when a row carries none of its own
+DEFAULT_ROLES = {"Products": "PRODUCT", "Reactant": "REACTANT", "Solvent/Reagent": "SOLVENT/REAGENT", "Product": "PRODUCT"}
+
+
+def molecule_column(header, molecules):
+    # (column index, decode) for the identifier column, whichever way the CSV was written.
+    if "Molecule_ID" in header:
+        if molecules is None:
+            raise ValueError("these CSVs store Molecule_ID; pass --molecules with the dictionary they were written with")
+        return header.index("Molecule_ID"), lambda cell: molecules.text(cell) if cell else None
+    name = "Identifiers" if "Identifiers" in header else "SMILES"
+    return header.index(name), lambda cell: cell
+
+
+def ord_components(sections, molecules=None):
+    # [(role, text)] and [(type, value)] for one ord-xxxx.csv
+    components, measurements = [], []
+    for section in ("Inputs", "Products"):
+        header, rows = sections.get(section, (None, []))
+        if not rows:
+            continue
+        column, decode = molecule_column(header, molecules)
+        role_column = header.index("Reaction_Role")
+        for row in rows:
+            role = row[role_column] or DEFAULT_ROLES.get(section)
+            components.append((role, decode(row[column])))
+    header, rows = sections.get("Measurements", (None, []))
+    if rows:
+        type_column, value_column = header.index("Type"), header.index("Value")
+        measurements = [(row[type_column], row[value_column]) for row in rows if row[type_column]]
+    return components, measurements
+
+
+def crd_components(rows, decode):
+    # A reaction SMILES part may hold several molecules separated by '.'; each is indexed.
+    components = []
+    for row in rows:
+        text = decode(row[1])
+        for part in (text or "").split("."):
+            components.append((DEFAULT_ROLES.get(row[0], row[0].upper()), part))
+    return components
+
+
+class ReactionIndex:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite older than 3.34 has no trigram tokenizer; substring search falls back to LIKE.
+            self.fts = False
+        self.molecule_ids = {}
+
+    def _molecule_id(self, text):
+        molecule_id = self.molecule_ids.get(text)
+        if molecule_id is None:
+            row = self.conn.execute("SELECT id FROM molecules WHERE text = ?", (text,)).fetchone()
+            if row is None:
+                molecule_id = self.conn.execute("INSERT INTO molecules (text) VALUES (?)", (text,)).lastrowid
+                if self.fts:
+                    self.conn.execute("INSERT INTO molecules_fts (rowid, text) VALUES (?, ?)", (molecule_id, text))
+            else:
+                molecule_id = row[0]
+            self.molecule_ids[text] = molecule_id
+        return molecule_id
+
+    def _add_reaction(self, source, dataset_id, reaction_id, path, components, measurements):
+        # The same reaction may already be indexed from another path (e.g. a moved CSV).
+        previous = self.conn.execute("SELECT id FROM reactions WHERE source = ? AND dataset_id = ? AND reaction_id = ?",
+                                     (source, dataset_id, reaction_id)).fetchone()
+        if previous is not None:
+            self._remove_reaction(previous[0])
+        reaction = self.conn.execute(
+            "INSERT INTO reactions (source, dataset_id, reaction_id, path) VALUES (?, ?, ?, ?)",
+            (source, dataset_id, reaction_id, path),
+        ).lastrowid
+        rows = set()
+        for role, text in components:
+            text = canonicalize(text) if text else None
+            if text:
+                rows.add((reaction, self._molecule_id(text), role.upper() if role else None))
+        self.conn.executemany("INSERT INTO components (reaction, molecule, role) VALUES (?, ?, ?)", rows)
+        self.conn.executemany("INSERT INTO measurements (reaction, type, value) VALUES (?, ?, ?)",
+                              [(reaction, kind, value) for kind, value in measurements])
+
+    def _remove_reaction(self, reaction):
+        self.conn.execute("DELETE FROM components WHERE reaction = ?", (reaction,))
+        self.conn.execute("DELETE FROM measurements WHERE reaction = ?", (reaction,))
+        self.conn.execute("DELETE FROM reactions WHERE id = ?", (reaction,))
+
+    def _remove_file(self, path):
+        for (reaction,) in self.conn.execute("SELECT id FROM reactions WHERE path = ?", (path,)).fetchall():
+            self._remove_reaction(reaction)
+        self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def _drop_unused_molecules(self):
+        unused = self.conn.execute(
+            "SELECT id, text FROM molecules WHERE id NOT IN (SELECT molecule FROM components)").fetchall()
+        if self.fts:
+            self.conn.executemany("INSERT INTO molecules_fts (molecules_fts, rowid, text) VALUES ('delete', ?, ?)", unused)
+        self.conn.executemany("DELETE FROM molecules WHERE id = ?", [(molecule_id,) for molecule_id, _ in unused])
+        for _, text in unused:
+            self.molecule_ids.pop(text, None)
+        return len(unused)
+
+    def _ingest_ord(self, dataset_id, reaction_id, path, molecules):
+        from ord_records import read_ord_csv
+        components, measurements = ord_components(read_ord_csv(path), molecules)
+        self._add_reaction("ord", dataset_id, reaction_id, path, components, measurements)
+        return 1
+
+    def _ingest_crd(self, path, molecules):
+        from crd_parse import group_reaction_rows
+        reaction_set = os.path.splitext(os.path.basename(path))[0]
+        count = 0
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header or header[0] != "Type":
+                return 0
+            _, decode = molecule_column(header, molecules)
+            for index, rows in enumerate(group_reaction_rows(reader)):
+                self._add_reaction("crd", reaction_set, str(index), path, crd_components(rows, decode), [])
+                count += 1
+        return count
+
+    def _indexed_files(self, source, root):
+        prefix = os.path.join(root, "")
+        with self.lock:
+            rows = self.conn.execute("SELECT path, mtime_ns, size FROM files WHERE source = ?", (source,)).fetchall()
+        return {path: (mtime_ns, size) for path, mtime_ns, size in rows if path.startswith(prefix)}
+
+    def update(self, ord_root=None, crd_dir=None, molecules=None):
+        # Brings the index in line with the CSVs under ord_root (SCRAPPED_DATA)
+        # and crd_dir. Returns {"files": re-read, "reactions": indexed, "removed": files dropped}.
+        jobs = []
+        if ord_root:
+            from ord_records import reaction_csv_paths
+            root = os.path.abspath(ord_root)
+            for dataset_id, reaction_id, path in reaction_csv_paths(root):
+                jobs.append(("ord", root, path, partial(self._ingest_ord, dataset_id, reaction_id, path, molecules)))
+        if crd_dir:
+            root = os.path.abspath(crd_dir)
+            for path in sorted(glob.glob(os.path.join(root, "*.csv"))):
+                jobs.append(("crd", root, path, partial(self._ingest_crd, path, molecules)))
+
+        known = {}
+        if ord_root:
+            known.update(self._indexed_files("ord", os.path.abspath(ord_root)))
+        if crd_dir:
+            known.update(self._indexed_files("crd", os.path.abspath(crd_dir)))
+        stats = {"files": 0, "reactions": 0, "removed": 0}
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                for source, _, path, ingest in jobs:
+                    stat = os.stat(path)
+                    if known.pop(path, None) == (stat.st_mtime_ns, stat.st_size):
+                        continue
+                    self._remove_file(path)
+                    stats["reactions"] += ingest()
+                    self.conn.execute("INSERT INTO files (path, source, mtime_ns, size) VALUES (?, ?, ?, ?)",
+                                      (path, source, stat.st_mtime_ns, stat.st_size))
+                    stats["files"] += 1
+                    if stats["files"] % COMMIT_EVERY == 0:
+                        self.conn.execute("COMMIT")
+                        self.conn.execute("BEGIN")
+                for path in known:
+                    self._remove_file(path)
+                    stats["removed"] += 1
+                if stats["files"] or stats["removed"]:
+                    self._drop_unused_molecules()
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                self.molecule_ids = {}  # may hold ids of rolled-back inserts
+                raise
+        return stats
+
+    def _select(self, where, params, role=None, dataset_id=None, source=None, limit=None):
+        sql = """SELECT r.source, r.dataset_id, r.reaction_id, c.role, m.text
+                 FROM components c JOIN molecules m ON m.id = c.molecule JOIN reactions r ON r.id = c.reaction
+                 WHERE """ + where
+        params = list(params)
+        if role:
+            sql += " AND c.role = ?"
+            params.append(role.upper())
+        if dataset_id:
+            sql += " AND r.dataset_id = ?"
+            params.append(dataset_id)
+        if source:
+            sql += " AND r.source = ?"
+            params.append(source)
+        sql += " ORDER BY r.source, r.dataset_id, r.reaction_id"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def reactions_with(self, text, role=None, dataset_id=None, source=None, limit=None):
+        # Exact (canonicalized) molecule -> [(source, dataset_id, reaction_id, role, text)]
+        return self._select("m.text = ?", (canonicalize(text),), role, dataset_id, source, limit)
+
+    def search(self, fragment, role=None, dataset_id=None, source=None, limit=100):
+        # Molecules containing fragment (e.g. part of a SMILES or a name).
+        if self.fts and len(fragment) >= 3:
+            where = "m.id IN (SELECT rowid FROM molecules_fts WHERE molecules_fts MATCH ?)"
+            param = '"' + fragment.replace('"', '""') + '"'
+        else:
+            where, param = "m.text LIKE ? ESCAPE '\\'", "%" + fragment.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return self._select(where, (param,), role, dataset_id, source, limit)
+
+    def reactions_with_measurement(self, kind, dataset_id=None, limit=None):
+        # Measurement type (YIELD, ...) -> [(source, dataset_id, reaction_id, type, value)]
+        sql = """SELECT r.source, r.dataset_id, r.reaction_id, ms.type, ms.value
+                 FROM measurements ms JOIN reactions r ON r.id = ms.reaction WHERE ms.type = ?"""
+        params = [kind]
+        if dataset_id:
+            sql += " AND r.dataset_id = ?"
+            params.append(dataset_id)
+        sql += " ORDER BY r.source, r.dataset_id, r.reaction_id"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def reaction(self, reaction_id, source=None):
+        # Everything indexed for one reaction id: {"components": [(role, text)], "measurements": [(type, value)]}
+        sql = "SELECT id, source, dataset_id FROM reactions WHERE reaction_id = ?"
+        params = [reaction_id]
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        with self.lock:
+            found = []
+            for reaction, source, dataset_id in self.conn.execute(sql, params).fetchall():
+                components = self.conn.execute(
+                    "SELECT c.role, m.text FROM components c JOIN molecules m ON m.id = c.molecule WHERE c.reaction = ?",
+                    (reaction,)).fetchall()
+                measurements = self.conn.execute(
+                    "SELECT type, value FROM measurements WHERE reaction = ?", (reaction,)).fetchall()
+                found.append({"source": source, "dataset_id": dataset_id, "reaction_id": reaction_id,
+                              "components": components, "measurements": measurements})
+        return found
+
+    def counts(self):
+        with self.lock:
+            return {table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for table in ("files", "reactions", "molecules", "components", "measurements")}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def print_rows(rows, started):
+    for row in rows:
+        print("\t".join("" if cell is None else str(cell) for cell in row))
+    print(f"{len(rows)} rows in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Build or query the reaction index over scraped ORD/CRD CSVs")
+    parser.add_argument("index", nargs="?", default="reaction_index.sqlite", help="index file")
+    parser.add_argument("--ord", default=None, help="ORD output directory to (re)index (SCRAPPED_DATA)")
+    parser.add_argument("--crd", default=None, help="directory with the CRD reaction-set CSVs to (re)index")
+    parser.add_argument("--molecules", default=None, help="molecule dictionary, if the CSVs store Molecule_ID")
+    parser.add_argument("--molecule", default=None, help="reactions using exactly this SMILES/identifier")
+    parser.add_argument("--contains", default=None, help="reactions using a molecule containing this text")
+    parser.add_argument("--measurement", default=None, help="reactions reporting this measurement type (e.g. YIELD)")
+    parser.add_argument("--reaction", default=None, help="show everything indexed for this reaction id")
+    parser.add_argument("--role", default=None, help="only this role (REACTANT, SOLVENT, PRODUCT, ...)")
+    parser.add_argument("--dataset", default=None, help="only this dataset / CRD reaction set")
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    sys.path[:0] = [os.path.join(REPO_ROOT, "ORD_SCRAPPER"), os.path.join(REPO_ROOT, "CRD")]
+    index = ReactionIndex(args.index)
+    if args.ord or args.crd:
+        molecules = None
+        if args.molecules:
+            from Scraper_Helpers.molecule_dictionary import MoleculeDictionary
+            molecules = MoleculeDictionary(args.molecules)
+        started = time.perf_counter()
+        stats = index.update(args.ord, args.crd, molecules)
+        print(f"Indexed {stats['reactions']} reactions from {stats['files']} changed files, "
+              f"dropped {stats['removed']} removed files in {time.perf_counter() - started:.2f}s")
+        if molecules is not None:
+            molecules.close()
+    print(", ".join(f"{count} {table}" for table, count in index.counts().items()))
+
+    started = time.perf_counter()
+    if args.molecule:
+        print_rows(index.reactions_with(args.molecule, args.role, args.dataset, limit=args.limit), started)
+    elif args.contains:
+        print_rows(index.search(args.contains, args.role, args.dataset, limit=args.limit), started)
+    elif args.measurement:
+        print_rows(index.reactions_with_measurement(args.measurement, args.dataset, args.limit), started)
+    elif args.reaction:
+        for found in index.reaction(args.reaction):
+            print(f"{found['source']} {found['dataset_id']} {found['reaction_id']}")
+            for role, text in found["components"]:
+                print(f"  {role or '-':<16} {text}")
+            for kind, value in found["measurements"]:
+                print(f"  {kind:<16} {value}")
+        print(f"{(time.perf_counter() - started) * 1000:.1f} ms")
+    index.close()
@@ -0,0 +1,119 @@
+import shutil
+import csv
+import os
+
+# Streaming CSV writers. Rows are buffered in small batches and flushed to a
+# "<path>.part" file as the crawl goes, so memory stays flat and a crash keeps
+# everything scraped so far. finalize() fsyncs and atomically renames the part
+# file onto the real path; until then readers never see a half-written CSV.
+DEFAULT_BUFFER_ROWS = 200
+
+
+class CsvRowSink:
+    def __init__(self, path, header=None, buffer_rows=DEFAULT_BUFFER_ROWS):
+        self.path = path
+        self.part_path = path + ".part"
+        self.buffer_rows = buffer_rows
+        self.buffer = []
+        self.rows_written = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(self.part_path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        if header:
+            self.writer.writerow(header)
+
+    def write_row(self, row):
+        self.buffer.append(row)
+        self.rows_written += 1
+        if len(self.buffer) >= self.buffer_rows:
+            self.flush()
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.write_row(row)
+
+    def flush(self):
+        if self.buffer:
+            self.writer.writerows(self.buffer)
+            self.buffer = []
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def finalize(self):
+        self.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.part_path, self.path)
+        return self.path
+
+    def abort(self):
+        # Keeps the flushed .part file on disk as the record of partial progress.
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finalize()
+        else:
+            self.abort()
+
+
+class SectionedCsvSink:
+    # Several header blocks separated by blank rows in one CSV (the ORD layout).
+    # Sections can be filled in any order: each streams to its own part file and
+    # finalize() stitches them together in declaration order.
+    def __init__(self, path, sections, buffer_rows=DEFAULT_BUFFER_ROWS):
+        self.path = path
+        self.part_path = path + ".part"
+        self.order = [name for name, _ in sections]
+        self.sections = {
+            name: CsvRowSink(f"{path}.{name.lower()}.part", header, buffer_rows)
+            for name, header in sections
+        }
+
+    def section(self, name):
+        return self.sections[name]
+
+    def write_row(self, section, row):
+        self.sections[section].write_row(row)
+
+    def write_rows(self, section, rows):
+        self.sections[section].write_rows(rows)
+
+    def counts(self):
+        return {name: sink.rows_written for name, sink in self.sections.items()}
+
+    def finalize(self):
+        for sink in self.sections.values():
+            sink.close()
+        with open(self.part_path, "w", newline="", encoding="utf-8") as out:
+            for i, name in enumerate(self.order):
+                if i:
+                    out.write("\r\n")
+                with open(self.sections[name].part_path, newline="", encoding="utf-8") as part:
+                    shutil.copyfileobj(part, out)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(self.part_path, self.path)
+        for sink in self.sections.values():
+            os.remove(sink.part_path)
+        return self.path
+
+    def abort(self):
+        for sink in self.sections.values():
+            sink.abort()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finalize()
+        else:
+            self.abort()
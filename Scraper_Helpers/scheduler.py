@@ -0,0 +1,214 @@
+from contextlib import contextmanager, asynccontextmanager
+import threading
+import time
+import os
+
+from Scraper_Helpers.instrumentation import sleep, sleep_async, log
+
+# One scheduler paces every navigation/request the scrapers make, in place of
+# fixed sleeps. A token bucket sets the request rate and a slot count caps how
+# many are in flight. Both adapt AIMD-style: every healthy response adds a
+# little rate (and, once per window, one slot); a failure or timeout halves
+# them, a slow response trims the rate. Decreases are spaced by a cooldown so
+# one bad spell isn't counted once per in-flight request.
+# All of this is per process. Processes that must share one rate (workers of a
+# distributed crawl) also set shared_budget: a callable that takes a request
+# from a crawl-wide budget and returns 0, or how long to wait before retrying.
+INITIAL_RATE = float(os.environ.get("SCRAPER_RATE", 1.0))          # requests/second
+MIN_RATE = float(os.environ.get("SCRAPER_MIN_RATE", 0.05))
+MAX_RATE = float(os.environ.get("SCRAPER_MAX_RATE", 4.0))
+TARGET_LATENCY = float(os.environ.get("SCRAPER_TARGET_LATENCY", 5.0))  # seconds; slower counts as congestion
+RATE_STEP = 0.05
+SLOW_FACTOR = 0.8
+FAILURE_FACTOR = 0.5
+BURST = 2
+POLL_INTERVAL = 0.05
+
+
+class Slot:
+    # Handed to the caller inside navigation(); failed() marks an outcome that
+    # didn't raise (e.g. a wait that returned False) as a failure.
+    def __init__(self):
+        self.ok = True
+
+    def failed(self):
+        self.ok = False
+
+
+class AdaptiveScheduler:
+    def __init__(self, rate=INITIAL_RATE, min_rate=MIN_RATE, max_rate=MAX_RATE,
+                 concurrency=1, max_concurrency=1, target_latency=TARGET_LATENCY, shared_budget=None):
+        self.lock = threading.Lock()
+        self.shared_budget = shared_budget
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = min(max(1, concurrency), self.max_concurrency)
+        self.target_latency = target_latency
+        self.tokens = 1.0
+        self.refilled_at = time.monotonic()
+        self.in_flight = 0
+        self.successes_in_window = 0
+        self.latency_ewma = None
+        self.last_decrease = 0.0
+        self.stats = {"requests": 0, "failures": 0, "slow": 0, "throttled_seconds": 0.0, "lowest_rate": self.rate}
+
+    def _refill(self, now):
+        self.tokens = min(BURST, self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+
+    def _try_acquire(self):
+        # 0 when a slot and a token were taken, otherwise how long to wait before retrying.
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self.in_flight >= self.concurrency:
+                return POLL_INTERVAL
+            if self.tokens < 1:
+                return max(POLL_INTERVAL, (1 - self.tokens) / self.rate)
+            self.tokens -= 1
+            self.in_flight += 1
+            return 0
+
+    def acquire(self):
+        # Time spent waiting here is the "throttle" phase.
+        started = time.perf_counter()
+        while True:
+            delay = self._try_acquire()
+            if not delay:
+                break
+            sleep(delay, "throttle")
+        while self.shared_budget is not None:
+            delay = self.shared_budget()
+            if not delay:
+                break
+            sleep(delay, "throttle")
+        self._add_throttled(time.perf_counter() - started)
+
+    async def acquire_async(self):
+        started = time.perf_counter()
+        while True:
+            delay = self._try_acquire()
+            if not delay:
+                break
+            await sleep_async(delay, "throttle")
+        while self.shared_budget is not None:
+            delay = self.shared_budget()
+            if not delay:
+                break
+            await sleep_async(delay, "throttle")
+        self._add_throttled(time.perf_counter() - started)
+
+    def pace(self):
+        # Waits for a token like any request, for one whose latency can't be measured
+        # (e.g. a background tab that loads on its own): the slot is handed straight
+        # back and the latency average and rate stay as they are.
+        self.acquire()
+        with self.lock:
+            self.in_flight -= 1
+            self.stats["requests"] += 1
+
+    def _add_throttled(self, seconds):
+        with self.lock:
+            self.stats["throttled_seconds"] += seconds
+
+    def _decrease(self, factor, now):
+        cooldown = max(1.0, self.latency_ewma or 0.0)
+        if now - self.last_decrease < cooldown:
+            return
+        self.last_decrease = now
+        self.rate = max(self.min_rate, self.rate * factor)
+        if factor == FAILURE_FACTOR:
+            self.concurrency = max(1, self.concurrency // 2)
+        self.successes_in_window = 0
+        self.stats["lowest_rate"] = min(self.stats["lowest_rate"], self.rate)
+        log(f"[scheduler] backing off: {self.rate:.2f} req/s, {self.concurrency} in flight")
+
+    def release(self, latency, ok=True):
+        with self.lock:
+            now = time.monotonic()
+            self.in_flight -= 1
+            self.stats["requests"] += 1
+            self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+            if not ok:
+                self.stats["failures"] += 1
+                self._decrease(FAILURE_FACTOR, now)
+            elif latency > self.target_latency:
+                self.stats["slow"] += 1
+                self._decrease(SLOW_FACTOR, now)
+            else:
+                self.rate = min(self.max_rate, self.rate + RATE_STEP)
+                self.successes_in_window += 1
+                if self.successes_in_window >= self.concurrency:
+                    self.successes_in_window = 0
+                    self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+
+    def report_timeout(self):
+        # A wait that ran out outside navigation(): treat it like a failed request.
+        with self.lock:
+            self.stats["failures"] += 1
+            self._decrease(FAILURE_FACTOR, time.monotonic())
+
+    @contextmanager
+    def navigation(self):
+        self.acquire()
+        slot = Slot()
+        started = time.perf_counter()
+        try:
+            yield slot
+        except BaseException:
+            slot.failed()
+            raise
+        finally:
+            self.release(time.perf_counter() - started, slot.ok)
+
+    @asynccontextmanager
+    async def navigation_async(self):
+        await self.acquire_async()
+        slot = Slot()
+        started = time.perf_counter()
+        try:
+            yield slot
+        except BaseException:
+            slot.failed()
+            raise
+        finally:
+            self.release(time.perf_counter() - started, slot.ok)
+
+    def print_summary(self):
+        with self.lock:
+            stats = dict(self.stats)
+            rate, concurrency = self.rate, self.concurrency
+        print(f"\nScheduler: {stats['requests']} requests, {stats['failures']} failures/timeouts, {stats['slow']} slow; "
+              f"final {rate:.2f} req/s with {concurrency} in flight (lowest {stats['lowest_rate']:.2f} req/s), "
+              f"{stats['throttled_seconds']:.1f}s spent throttled")
+
+
+_scheduler = AdaptiveScheduler()
+
+
+def get_scheduler():
+    return _scheduler
+
+
+def set_scheduler(scheduler):
+    global _scheduler
+    _scheduler = scheduler
+    return scheduler
+
+
+def navigation():
+    return _scheduler.navigation()
+
+
+def navigation_async():
+    return _scheduler.navigation_async()
+
+
+def pace():
+    _scheduler.pace()
+
+
+def report_timeout():
+    _scheduler.report_timeout()
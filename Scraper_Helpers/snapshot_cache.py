@@ -0,0 +1,165 @@
+import threading
+import hashlib
+import sqlite3
+import json
+import gzip
+import time
+import re
+import os
+
+from Scraper_Helpers.work_queue import set_journal_mode, JOURNAL_MODE
+
+# What the scrapers saw, kept so extraction can be re-run without a browser.
+# Each snapshot is a JSON payload (rendered DOM, modal <pre> texts, measurement
+# cells, or the raw reaction record / listing HTML) stored once, gzipped, under
+# objects/<aa>/<sha256> by the digest of its content; identical pages share one
+# object. index.sqlite maps (source, key) -> digest, where key is the ord-...
+# reaction id for ORD and the reaction set URL for CRD. A re-crawl of the same
+# key overwrites the mapping and keeps the old object until `prune`, which may
+# run while crawls are still adding snapshots: put() writes (or touches) an
+# object before its index row goes in, so prune leaves alone anything modified
+# within PRUNE_GRACE seconds of reading the live set, and any name that is not
+# a digest (another writer's .part file).
+# journal_mode follows work_queue's: "delete" when hosts share the cache.
+COMPRESS_LEVEL = 6
+BUSY_TIMEOUT = 60
+PRUNE_GRACE = 60
+DIGEST_NAME = re.compile(r"[0-9a-f]{64}")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    parent TEXT,
+    format TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    captured_at REAL NOT NULL,
+    PRIMARY KEY (source, key)
+);
+"""
+
+
+def object_path(root, digest):
+    return os.path.join(root, "objects", digest[:2], digest)
+
+
+def read_object(root, digest):
+    # Module-level so replay processes can read objects without opening the index.
+    with gzip.open(object_path(root, digest), "rb") as f:
+        return json.loads(f.read().decode("utf-8"))
+
+
+class SnapshotCache:
+    def __init__(self, root, journal_mode=JOURNAL_MODE):
+        self.root = root
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self.lock = threading.Lock()
+        index_path = os.path.join(root, "index.sqlite")
+        self.conn = sqlite3.connect(index_path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        set_journal_mode(self.conn, index_path, journal_mode)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def put(self, source, key, payload, parent=None):
+        # Stores payload (a dict with a "format" entry) and points (source, key) at it; returns the digest.
+        data = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = object_path(self.root, digest)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            part_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+            with open(part_path, "wb") as f:
+                f.write(gzip.compress(data, COMPRESS_LEVEL, mtime=0))
+            os.replace(part_path, path)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO snapshots (source, key, parent, format, digest, size, captured_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (source, key, parent, payload["format"], digest, len(data), time.time()),
+            )
+            self.conn.commit()
+        return digest
+
+    def get(self, source, key):
+        with self.lock:
+            row = self.conn.execute("SELECT digest FROM snapshots WHERE source = ? AND key = ?", (source, key)).fetchone()
+        return read_object(self.root, row[0]) if row else None
+
+    def entries(self, source=None, keys=None):
+        # [(source, key, parent, format, digest)] in key order.
+        query = "SELECT source, key, parent, format, digest FROM snapshots"
+        params = []
+        clauses = []
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        if keys:
+            clauses.append(f"key IN ({', '.join('?' for _ in keys)})")
+            params.extend(keys)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        with self.lock:
+            return self.conn.execute(query + " ORDER BY source, parent, key", params).fetchall()
+
+    def counts(self):
+        # {(source, format): (snapshots, raw bytes)}
+        with self.lock:
+            rows = self.conn.execute("SELECT source, format, COUNT(*), SUM(size) FROM snapshots GROUP BY 1, 2").fetchall()
+        return {(source, fmt): (count, size) for source, fmt, count, size in rows}
+
+    def prune(self):
+        # Deletes objects no key points at any more; returns how many were removed.
+        removed = 0
+        with self.lock:
+            cutoff = time.time() - PRUNE_GRACE
+            live = {digest for (digest,) in self.conn.execute("SELECT DISTINCT digest FROM snapshots")}
+            for folder in os.listdir(os.path.join(self.root, "objects")):
+                folder_path = os.path.join(self.root, "objects", folder)
+                for name in os.listdir(folder_path):
+                    path = os.path.join(folder_path, name)
+                    if name in live or not DIGEST_NAME.fullmatch(name):
+                        continue
+                    try:
+                        if os.stat(path).st_mtime >= cutoff:
+                            continue
+                        os.remove(path)
+                    except FileNotFoundError:
+                        continue
+                    removed += 1
+        return removed
+
+    def print_summary(self):
+        print(f"\nSnapshots in {self.root}:")
+        for (source, fmt), (count, size) in sorted(self.counts().items()):
+            print(f"  {source:<4} {fmt:<10} {count:>8} snapshots  {size / 2**20:>9.1f} MB uncompressed")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+_snapshots = None
+
+
+def get_snapshots():
+    return _snapshots
+
+
+def set_snapshots(snapshots):
+    # Scrapers consult this; None (the default) saves nothing.
+    global _snapshots
+    _snapshots = snapshots
+    return snapshots
+
+
+def save_snapshot(source, key, payload, parent=None):
+    # No-op unless a cache is set; a failed save is reported but never fails the scrape.
+    if _snapshots is None:
+        return None
+    try:
+        return _snapshots.put(source, key, payload, parent)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Could not save {source} snapshot for {key}: {e}")
+        return None
@@ -0,0 +1,110 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import time
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [REPO_ROOT, os.path.join(REPO_ROOT, "ORD_SCRAPPER"), os.path.join(REPO_ROOT, "CRD")]
+from ord_records import input_records, product_records, measurement_records, open_ord_sink, write_ord_records
+from ord_http import parse_reaction_json
+from crd_parse import parse_reaction_page, csv_rows_for, safe_filename_for, CSV_HEADER
+from Scraper_Helpers.instrumentation import set_verbose
+from Scraper_Helpers.row_sink import CsvRowSink
+from Scraper_Helpers.snapshot_cache import SnapshotCache, read_object
+
+# Re-runs extraction over a snapshot cache written by ORD.py / ord_distributed.py
+# / crd_async.py / CRD main.py with --snapshots, without a browser or network.
+# Snapshots are spread over a process pool in chunks; each worker decompresses
+# its payloads, runs the same record builders the crawl uses and writes the
+# usual output tree (<out>/<dataset>/ord-xxxx.csv and <out>/<reaction set>.csv).
+ENTRIES_PER_CHUNK = 200
+
+
+def extract_ord(payload):
+    # (inputs, products, measurements) records from an ORD snapshot of either format.
+    if payload["format"] == "ord_json":
+        return parse_reaction_json(payload["record"])
+    return (input_records(payload["inputs"]), product_records(payload["products"]),
+            measurement_records(payload["measurements"]))
+
+
+def replay_ord(root, out_dir, parent, digest):
+    payload = read_object(root, digest)
+    dataset_dir = os.path.join(out_dir, parent or "unknown_dataset")
+    os.makedirs(dataset_dir, exist_ok=True)
+    write_ord_records(open_ord_sink(payload["url"], dataset_dir), *extract_ord(payload))
+
+
+def replay_crd(root, out_dir, digest):
+    payload = read_object(root, digest)
+    with CsvRowSink(os.path.join(out_dir, f"{safe_filename_for(payload['name'])}.csv"), header=CSV_HEADER) as sink:
+        for page in payload["pages"]:
+            for smile_data in parse_reaction_page(page["html"], page["url"])["smiles"]:
+                sink.write_rows(csv_rows_for(smile_data.strip()))
+
+
+def replay_chunk(root, out_dir, entries, verbose=True):
+    # Process-pool task: (replayed count, [(key, error)]) for one slice of the cache.
+    set_verbose(verbose)
+    replayed, failed = 0, []
+    for source, key, parent, fmt, digest in entries:
+        try:
+            if source == "ord":
+                replay_ord(root, out_dir, parent, digest)
+            elif source == "crd":
+                replay_crd(root, out_dir, digest)
+            else:
+                raise ValueError(f"unknown snapshot source {source}")
+            replayed += 1
+        except Exception as e:
+            failed.append((key, f"{fmt}: {e}"))
+    return replayed, failed
+
+
+def replay(root, out_dir, source=None, keys=None, workers=None, verbose=True):
+    cache = SnapshotCache(root)
+    entries = cache.entries(source, keys)
+    cache.close()
+    os.makedirs(out_dir, exist_ok=True)
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    chunk_size = max(1, min(ENTRIES_PER_CHUNK, -(-len(entries) // (workers * 4))))
+    chunks = [entries[i:i + chunk_size] for i in range(0, len(entries), chunk_size)]
+    if workers <= 1 or len(chunks) < 2:
+        results = [replay_chunk(root, out_dir, chunk, verbose) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(replay_chunk, repeat(root), repeat(out_dir), chunks, repeat(verbose)))
+    replayed = sum(count for count, _ in results)
+    failed = [failure for _, failures in results for failure in failures]
+    return replayed, failed
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Re-extract ORD/CRD output from cached page snapshots, without a browser")
+    parser.add_argument("snapshots", nargs="?", default="SCRAPPED_DATA/snapshots", help="snapshot cache directory")
+    parser.add_argument("--out", default="REPLAYED_DATA", help="output directory for the re-extracted CSVs")
+    parser.add_argument("--source", choices=["ord", "crd"], default=None, help="only replay this scraper's snapshots")
+    parser.add_argument("--key", nargs="*", default=None, help="only these ord-... ids / CRD reaction set URLs")
+    parser.add_argument("--workers", type=int, default=None, help="replay processes (default: one per CPU)")
+    parser.add_argument("--quiet", action="store_true", help="only print failures and the summary line")
+    parser.add_argument("--summary", action="store_true", help="print what the cache holds and exit")
+    parser.add_argument("--prune", action="store_true", help="delete objects no longer referenced by any key and exit")
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.snapshots)
+    if args.summary or args.prune:
+        cache = SnapshotCache(root)
+        if args.prune:
+            print(f"Removed {cache.prune()} unreferenced snapshot objects")
+        cache.print_summary()
+        cache.close()
+        sys.exit(0)
+
+    started = time.perf_counter()
+    replayed, failed = replay(root, os.path.abspath(args.out), args.source, args.key, args.workers,
+                              not args.quiet)
+    for key, error in failed:
+        print(f"Could not replay {key}: {error}")
+    print(f"Replayed {replayed} snapshots into {args.out} ({len(failed)} failed) in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,80 @@
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+import os
+
+from Scraper_Helpers.instrumentation import phase
+from Scraper_Helpers.scheduler import report_timeout
+
+# Ceiling: the longest we block on any single condition. Pacing between
+# navigations is the scheduler's job (Scraper_Helpers/scheduler.py); a hard
+# timeout here is reported to it as a sign the site is struggling.
+WAIT_CEILING = float(os.environ.get("SCRAPER_WAIT_CEILING", 20))
+POLL_FREQUENCY = 0.1
+
+MODAL_DATA = (By.CSS_SELECTOR, "div.data")
+MODAL_PRE = (By.CSS_SELECTOR, "div.data pre")
+MODAL_CLOSE = (By.CSS_SELECTOR, "div.close")
+
+
+def configure(ceiling=None):
+    global WAIT_CEILING
+    if ceiling is not None:
+        WAIT_CEILING = float(ceiling)
+
+
+def wait_until(driver, condition, timeout=None, report=True):
+    timeout = WAIT_CEILING if timeout is None else timeout
+    with phase("wait"):
+        try:
+            return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+        except TimeoutException:
+            if report:
+                report_timeout()
+            raise
+
+
+def wait_quietly(driver, condition, timeout=None):
+    # For conditions that may legitimately never happen, so no timeout is reported.
+    try:
+        return wait_until(driver, condition, timeout, report=False)
+    except TimeoutException:
+        return None
+
+
+def wait_for_modal_open(driver, timeout=None):
+    wait_until(driver, EC.presence_of_element_located(MODAL_PRE), timeout)
+    return driver.find_element(*MODAL_DATA)
+
+
+def wait_for_modal_closed(driver, timeout=None):
+    return wait_quietly(driver, EC.invisibility_of_element_located(MODAL_CLOSE), timeout)
+
+
+def is_stale(element):
+    try:
+        element.is_enabled()
+        return False
+    except StaleElementReferenceException:
+        return True
+
+
+def tab_is_selected(tab):
+    classes = (tab.get_attribute("class") or "").split()
+    return "selected" in classes or "active" in classes
+
+
+def tab_content_swapped(tab, previous_element):
+    def _condition(driver):
+        if previous_element is not None and is_stale(previous_element):
+            return True
+        return tab_is_selected(tab)
+    return _condition
+
+
+def wait_for_refresh(driver, previous_element, timeout=None):
+    # The listing is re-rendered in place; an old element going stale means the new rows are in.
+    if previous_element is None:
+        return None
+    return wait_quietly(driver, lambda d: is_stale(previous_element), timeout)
@@ -0,0 +1,340 @@
+from collections import namedtuple
+import threading
+import sqlite3
+import socket
+import time
+import uuid
+import os
+
+# A crawl-wide work queue in one SQLite file, shared by a coordinator and any
+# number of worker processes. Tasks are (kind, key) with a URL, a parent and a
+# priority. A worker leases tasks for LEASE_SECONDS and heartbeats to keep
+# them; a lease that runs out (crashed or stalled worker) goes back to the
+# pool. Every lease carries a fresh token and only the current holder can
+# complete or fail a task, so each task is completed exactly once even if a
+# stalled worker wakes up after its lease was handed to someone else.
+# Journal modes:
+#   wal     (default) fast, but WAL's shared-memory index only works between
+#           processes of one host, so the queue refuses to open from a second
+#           host while in this mode;
+#   delete  rollback journal guarded by the filesystem's byte-range locks, for
+#           a queue on a mount several hosts share. Only safe where those locks
+#           work across hosts (NFSv4, or NFSv3 with lockd; not sshfs).
+# Every participant of one crawl must use the same mode.
+# The queue can also hold a crawl-wide request budget (take_token) so a rate
+# limit holds across all workers instead of per process; it is timed by each
+# host's clock, so hosts should run NTP.
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+LEASE_SECONDS = float(os.environ.get("SCRAPER_LEASE_SECONDS", 120))
+MAX_ATTEMPTS = 3
+BUSY_TIMEOUT = 60  # seconds a writer waits for the file lock
+BEACON_SECONDS = 30  # how often a Beacon rewrites its meta key
+BEACON_TIMEOUT = 300  # an unchanged beacon is stale after this long
+JOURNAL_MODES = ("wal", "delete")
+JOURNAL_MODE = os.environ.get("SCRAPER_QUEUE_JOURNAL", "wal")
+WAL_HOST = "wal_host"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    url TEXT NOT NULL,
+    parent TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL,
+    owner TEXT,
+    token TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, priority);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS budget (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    refilled_at REAL NOT NULL
+);
+"""
+
+Lease = namedtuple("Lease", ["kind", "key", "url", "parent", "token"])
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def set_journal_mode(conn, path, journal_mode):
+    # Shared with the other SQLite files a distributed crawl keeps on the same mount.
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"journal mode must be one of {', '.join(JOURNAL_MODES)}, not {journal_mode!r}")
+    active = conn.execute(f"PRAGMA journal_mode={journal_mode}").fetchone()[0].lower()
+    if active != journal_mode:
+        raise RuntimeError(f"{path} is in {active} mode and another process has it open; "
+                           f"stop it or open with journal mode {active}")
+    conn.execute("PRAGMA synchronous=NORMAL" if journal_mode == "wal" else "PRAGMA synchronous=FULL")
+
+
+class WorkQueue:
+    def __init__(self, path, journal_mode=JOURNAL_MODE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+        set_journal_mode(self.conn, path, journal_mode)
+        self.conn.executescript(SCHEMA)
+        self._claim_host(journal_mode)
+
+    def _claim_host(self, journal_mode):
+        # In WAL mode the first host to open the queue owns it; in delete mode any host may.
+        host = socket.gethostname()
+        with self.lock:
+            if journal_mode != "wal":
+                self.conn.execute("DELETE FROM meta WHERE name = ?", (WAL_HOST,))
+                return
+            self.conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES (?, ?)", (WAL_HOST, host))
+            owner = self.conn.execute("SELECT value FROM meta WHERE name = ?", (WAL_HOST,)).fetchone()[0]
+        if owner != host:
+            self.conn.close()
+            raise RuntimeError(f"{self.path} is a WAL-mode queue used from {owner}; WAL only works within one host. "
+                               f"Use journal mode 'delete' on every participant to share it between hosts")
+
+    def publish_many(self, kind, keyed_urls, parent=None, priority=0):
+        # Adds tasks; a task already in the queue (in any state) is left as it is.
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                added = self.conn.executemany(
+                    """INSERT OR IGNORE INTO tasks (kind, key, url, parent, priority, state, updated_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    [(kind, key, url, parent, priority, PENDING, now) for key, url in keyed_urls],
+                ).rowcount
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+        return added
+
+    def lease(self, owner, kinds=None, n=1, lease_seconds=LEASE_SECONDS):
+        # Up to n pending (or expired) tasks, highest priority first, leased to owner.
+        now = time.time()
+        query = """SELECT kind, key, url, parent FROM tasks
+                   WHERE (state = ? OR (state = ? AND lease_expires < ?))"""
+        params = [PENDING, LEASED, now]
+        if kinds:
+            query += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params.extend(kinds)
+        query += " ORDER BY priority DESC, parent, key LIMIT ?"
+        params.append(n)
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                leases = []
+                for kind, key, url, parent in self.conn.execute(query, params).fetchall():
+                    token = uuid.uuid4().hex
+                    self.conn.execute(
+                        """UPDATE tasks SET state = ?, owner = ?, token = ?, lease_expires = ?,
+                               attempts = attempts + 1, updated_at = ? WHERE kind = ? AND key = ?""",
+                        (LEASED, owner, token, now + lease_seconds, now, kind, key),
+                    )
+                    leases.append(Lease(kind, key, url, parent, token))
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+        return leases
+
+    def heartbeat(self, leases, lease_seconds=LEASE_SECONDS):
+        # Extends the leases still held; returns the ones that were lost.
+        now = time.time()
+        lost = []
+        with self.lock:
+            for lease in leases:
+                extended = self.conn.execute(
+                    "UPDATE tasks SET lease_expires = ?, updated_at = ? WHERE kind = ? AND key = ? AND token = ? AND state = ?",
+                    (now + lease_seconds, now, lease.kind, lease.key, lease.token, LEASED),
+                ).rowcount
+                if not extended:
+                    lost.append(lease)
+        return lost
+
+    def complete(self, lease):
+        # True for exactly one holder of the task; False when the lease was lost meanwhile.
+        with self.lock:
+            return self.conn.execute(
+                "UPDATE tasks SET state = ?, lease_expires = NULL, error = NULL, updated_at = ? "
+                "WHERE kind = ? AND key = ? AND token = ? AND state = ?",
+                (DONE, time.time(), lease.kind, lease.key, lease.token, LEASED),
+            ).rowcount == 1
+
+    def fail(self, lease, error, max_attempts=MAX_ATTEMPTS):
+        # Back to pending for another worker, or failed once max_attempts leases have failed.
+        with self.lock:
+            return self.conn.execute(
+                """UPDATE tasks SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                       lease_expires = NULL, error = ?, updated_at = ?
+                   WHERE kind = ? AND key = ? AND token = ? AND state = ?""",
+                (max_attempts, FAILED, PENDING, str(error)[:500], time.time(), lease.kind, lease.key, lease.token, LEASED),
+            ).rowcount == 1
+
+    def retry_failed(self, kinds=None):
+        query = "UPDATE tasks SET state = ?, attempts = 0, error = NULL WHERE state = ?"
+        params = [PENDING, FAILED]
+        if kinds:
+            query += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params.extend(kinds)
+        with self.lock:
+            return self.conn.execute(query, params).rowcount
+
+    def counts(self):
+        # {kind: {state: count}}; leases past their expiry count as pending.
+        now = time.time()
+        with self.lock:
+            rows = self.conn.execute(
+                """SELECT kind, CASE WHEN state = ? AND lease_expires < ? THEN ? ELSE state END, COUNT(*)
+                   FROM tasks GROUP BY 1, 2""", (LEASED, now, PENDING)).fetchall()
+        counts = {}
+        for kind, state, count in rows:
+            counts.setdefault(kind, {})[state] = counts.get(kind, {}).get(state, 0) + count
+        return counts
+
+    def outstanding(self):
+        # Tasks that are pending or leased.
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM tasks WHERE state IN (?, ?)", (PENDING, LEASED)).fetchone()[0]
+
+    def take_token(self, rate, name="requests"):
+        # Takes one request from a budget of `rate` per second shared by everyone using the queue.
+        # Returns 0 when taken, otherwise the seconds to wait before asking again.
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute("SELECT tokens, refilled_at FROM budget WHERE name = ?", (name,)).fetchone()
+                tokens = 1.0 if row is None else min(1.0, row[0] + max(0.0, now - row[1]) * rate)
+                wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+                if not wait:
+                    tokens -= 1
+                self.conn.execute("INSERT OR REPLACE INTO budget (name, tokens, refilled_at) VALUES (?, ?, ?)",
+                                  (name, tokens, now))
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+        return wait
+
+    def set_meta(self, name, value):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+
+    def get_meta(self, name):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def print_summary(self):
+        print("\nWork queue:")
+        for kind, states in sorted(self.counts().items()):
+            print(f"  {kind:<10} " + " | ".join(f"{state} {count}" for state, count in sorted(states.items())))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class Heartbeat:
+    # Background thread that keeps a worker's current leases alive while it works.
+    def __init__(self, queue, interval=LEASE_SECONDS / 3, lease_seconds=LEASE_SECONDS):
+        self.queue = queue
+        self.interval = interval
+        self.lease_seconds = lease_seconds
+        self.leases = []
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="lease-heartbeat", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def hold(self, lease):
+        with self.lock:
+            self.leases.append(lease)
+
+    def release(self, lease):
+        with self.lock:
+            self.leases.remove(lease)
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            with self.lock:
+                leases = list(self.leases)
+            try:
+                lost = self.queue.heartbeat(leases, self.lease_seconds)
+            except sqlite3.Error as e:
+                print(f"[heartbeat] could not extend leases: {e}")
+                continue
+            for lease in lost:
+                print(f"[heartbeat] lease on {lease.kind} {lease.key} expired and was taken over")
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+
+class Beacon:
+    # Background thread that rewrites a meta key every interval so other
+    # participants can tell its owner is still alive (see BeaconWatch).
+    def __init__(self, queue, name, interval=BEACON_SECONDS):
+        self.queue = queue
+        self.name = name
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"beacon-{name}", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            try:
+                self.queue.set_meta(self.name, f"{time.time():.3f} {uuid.uuid4().hex[:8]}")
+            except sqlite3.Error as e:
+                print(f"[beacon] could not update {self.name}: {e}")
+            if self.stopped.wait(self.interval):
+                return
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+
+class BeaconWatch:
+    # Reader side of a Beacon: stale once the value has not changed for
+    # `timeout` seconds of this process's own clock, so hosts' clocks need not agree.
+    def __init__(self, queue, name, timeout=BEACON_TIMEOUT):
+        self.queue = queue
+        self.name = name
+        self.timeout = timeout
+        self.value = None
+        self.changed_at = time.monotonic()
+
+    def age(self):
+        value = self.queue.get_meta(self.name)
+        if value != self.value:
+            self.value = value
+            self.changed_at = time.monotonic()
+        return time.monotonic() - self.changed_at
+
+    def stale(self):
+        return self.age() >= self.timeout
@@ -0,0 +1,45 @@
+import argparse
+import json
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [REPO_ROOT, os.path.join(REPO_ROOT, "ORD_SCRAPPER")]
+from ord_http import fetch_reaction_json
+from Scraper_Helpers.snapshot_cache import SnapshotCache, read_object
+
+# Saves fixture pairs for test_ord_http.py from real responses. Crawl some
+# reactions through the browser first so their rendered pages are cached:
+#   python ORD_SCRAPPER/ORD.py --snapshots SNAPS --max-pages 1
+# then, for every ord_dom snapshot there, this fetches the same reaction's JSON
+# record and writes <id>.dom.json / <id>.record.json under tests/fixtures/ord.
+OUT_DIR = os.path.join(REPO_ROOT, "tests", "fixtures", "ord")
+
+
+def write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def capture(snapshots_dir, keys=None, out_dir=OUT_DIR):
+    cache = SnapshotCache(snapshots_dir)
+    entries = [entry for entry in cache.entries("ord", keys) if entry[3] == "ord_dom"]
+    cache.close()
+    os.makedirs(out_dir, exist_ok=True)
+    for _, reaction_id, _, _, digest in entries:
+        dom = read_object(snapshots_dir, digest)
+        dom.pop("html", None)
+        write_json(os.path.join(out_dir, f"{reaction_id}.dom.json"), dom)
+        write_json(os.path.join(out_dir, f"{reaction_id}.record.json"), fetch_reaction_json(reaction_id))
+        print(f"Saved fixture pair for {reaction_id}")
+    return len(entries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Save ORD fixture pairs (rendered page + JSON record) for the tests")
+    parser.add_argument("snapshots", help="snapshot cache written by a browser crawl with --snapshots")
+    parser.add_argument("--key", nargs="*", default=None, help="only these ord-... ids")
+    parser.add_argument("--out", default=OUT_DIR, help="fixture directory")
+    args = parser.parse_args()
+    print(f"Captured {capture(os.path.abspath(args.snapshots), args.key, args.out)} reactions")
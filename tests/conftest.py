@@ -0,0 +1,14 @@
+import os
+import sys
+
+# Fixtures are local, so requests are not paced; read when the scheduler is first imported.
+os.environ.setdefault("SCRAPER_RATE", "1000")
+os.environ.setdefault("SCRAPER_MAX_RATE", "1000")
+
+# The scrapers import their siblings plainly, so each site folder goes on sys.path like the scripts do for themselves.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(REPO_ROOT, "tests", "fixtures")
+for folder in ("", "ORD_SCRAPPER", "CRD", "BENCHMARKS"):
+    path = os.path.join(REPO_ROOT, folder) if folder else REPO_ROOT
+    if path not in sys.path:
+        sys.path.insert(0, path)
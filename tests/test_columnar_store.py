@@ -0,0 +1,90 @@
+import glob
+import os
+
+import pytest
+
+pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+
+from Scraper_Helpers.columnar_store import ColumnarStore, list_datasets
+from crd_adapter import CrdColumnarSink
+from ord_records import OrdColumnarSink, write_ord_records
+
+INPUTS = [{"tab": "amine", "raw_button_index": 1, "identifiers_value": "CCN", "reaction_role": "REACTANT"}]
+PRODUCTS = [{"outcome_index": 1, "product_index": 1, "identifiers_value": "CCNC(C)=O", "reaction_role": "PRODUCT"}]
+MEASUREMENTS = [{"outcome_index": 1, "measurement_index": 1, "pairs": [{"type": "YIELD", "value": "85%"}]}]
+
+
+def stored(root, table, dataset_id):
+    # Every row of table stored for dataset_id, across its part files.
+    rows = []
+    for path in sorted(glob.glob(os.path.join(root, table, f"dataset_id={dataset_id}", "part-*.parquet"))):
+        rows.extend(pq.read_table(path).to_pylist())
+    return rows
+
+
+def scrape(store, reaction_id, inputs=INPUTS):
+    write_ord_records(OrdColumnarSink(store, "ds", reaction_id), inputs, PRODUCTS, MEASUREMENTS)
+
+
+def test_rescrape_replaces_rows(tmp_path):
+    root = str(tmp_path)
+    with ColumnarStore(root) as store:
+        scrape(store, "ord-1")
+        store.flush()
+        scrape(store, "ord-1", INPUTS * 2)
+        store.flush()
+        scrape(store, "ord-1")
+    assert [row["reaction_id"] for row in stored(root, "inputs", "ds")] == ["ord-1"]
+    assert len(stored(root, "measurements", "ds")) == 1
+    assert list_datasets(root, "inputs") == ["ds"]
+
+
+def test_replacing_one_unit_keeps_its_batch_mates(tmp_path):
+    root = str(tmp_path)
+    with ColumnarStore(root) as store:
+        scrape(store, "ord-1")
+        scrape(store, "ord-2")
+        store.flush()
+        scrape(store, "ord-2", [])
+    assert [row["reaction_id"] for row in stored(root, "inputs", "ds")] == ["ord-1"]
+    assert sorted(row["reaction_id"] for row in stored(root, "products", "ds")) == ["ord-1", "ord-2"]
+
+
+def test_aborted_reaction_stores_nothing(tmp_path):
+    root = str(tmp_path)
+    with ColumnarStore(root) as store:
+        with pytest.raises(RuntimeError):
+            with OrdColumnarSink(store, "ds", "ord-1") as sink:
+                sink.add_inputs(INPUTS)
+                raise RuntimeError("outcomes did not load")
+    assert stored(root, "inputs", "ds") == []
+
+
+def test_spooled_units_survive_a_crash(tmp_path):
+    root = str(tmp_path)
+    store = ColumnarStore(root)
+    scrape(store, "ord-1")
+    store.conn.close()  # the process dies before anything is flushed
+    with open(os.path.join(root, "_spool", "ds.jsonl"), "a", encoding="utf-8") as spool:
+        spool.write('{"unit": "ord-2", "tab')
+    with ColumnarStore(root):
+        pass
+    assert [row["reaction_id"] for row in stored(root, "inputs", "ds")] == ["ord-1"]
+
+
+def test_crd_set_replaced_as_a_unit(tmp_path):
+    root = str(tmp_path)
+    with ColumnarStore(root) as store:
+        sink = CrdColumnarSink(store, "Set A")
+        sink.write_rows([["Reactant", "CC"], ["Product", "CO"]])
+        sink.finalize()
+        store.flush()
+        sink = CrdColumnarSink(store, "Set A")
+        sink.write_rows([["Reactant", "N"]])
+        sink.finalize()
+        aborted = CrdColumnarSink(store, "Set B")
+        aborted.write_rows([["Reactant", "O"]])
+        aborted.abort()
+    assert [row["smiles"] for row in stored(root, "crd_smiles", "Set A")] == ["N"]
+    assert list_datasets(root, "crd_smiles") == ["Set A"]
@@ -0,0 +1,91 @@
+import pytest
+
+from Scraper_Helpers.crawl_ledger import CrawlLedger, tracked, DONE, FAILED, IN_PROGRESS, REMOVED
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = CrawlLedger(str(tmp_path / "ledger.sqlite"))
+    yield ledger
+    ledger.close()
+
+
+def keyed(*keys):
+    return [(key, f"https://example.org/{key}") for key in keys]
+
+
+def test_tracked_marks_done_and_failed(ledger):
+    with tracked(ledger, "reaction", "a", "ds"):
+        assert ledger.status("reaction", "a") == IN_PROGRESS
+    assert ledger.is_done("reaction", "a")
+    with pytest.raises(ValueError):
+        with tracked(ledger, "reaction", "b", "ds"):
+            raise ValueError("boom")
+    assert ledger.status("reaction", "b") == FAILED
+    assert ledger.keys("reaction", FAILED) == ["b"]
+
+
+def test_frontier_skips_done_and_removed(ledger):
+    ledger.discover_many("reaction", keyed("a", "b", "c", "d"), parent="ds")
+    ledger.done("reaction", "a")
+    ledger.mark_removed("reaction", ["b"])
+    ledger.failed("reaction", "c", "boom")
+    assert [key for key, _, _ in ledger.frontier("reaction")] == ["c", "d"]
+    assert [key for key, _, _ in ledger.frontier("reaction", pending_only=False)] == ["a", "c", "d"]
+
+
+def test_frontier_order_and_priority(ledger):
+    ledger.discover_many("reaction", keyed("b1", "b2"), parent="b")
+    ledger.discover_many("reaction", keyed("a1"), parent="a")
+    assert [key for key, _, _ in ledger.frontier("reaction")] == ["a1", "b1", "b2"]
+    assert ledger.prioritize("reaction", "b", 1) == 2
+    assert [key for key, _, _ in ledger.frontier("reaction")] == ["b1", "b2", "a1"]
+
+
+def test_shards_partition_the_frontier(ledger):
+    keys = [f"ord-{i}" for i in range(50)]
+    ledger.discover_many("reaction", keyed(*keys), parent="ds")
+    shards = [{key for key, _, _ in ledger.frontier("reaction", shard=(index, 3))} for index in range(3)]
+    assert set().union(*shards) == set(keys)
+    assert sum(len(shard) for shard in shards) == len(keys)
+    assert shards[0] == {key for key, _, _ in ledger.frontier("reaction", shard=(0, 3))}
+
+
+def test_sync_listing_adds_and_removes(ledger):
+    ledger.sync_listing("reaction", "ds", keyed("a", "b"))
+    ledger.done("reaction", "a")
+    added, removed = ledger.sync_listing("reaction", "ds", keyed("a", "c"))
+    assert (added, removed) == ({"c"}, {"b"})
+    assert ledger.status("reaction", "b") == REMOVED
+    assert ledger.listed_keys("reaction", "ds") == {"a", "c"}
+    ledger.discover_many("reaction", keyed("b"), parent="ds")
+    assert ledger.status("reaction", "b") is None
+
+
+def test_reset_keeps_removed(ledger):
+    ledger.discover_many("page", keyed("1", "2"))
+    ledger.done("page", "1")
+    ledger.mark_removed("page", ["2"])
+    ledger.reset(["page"])
+    assert ledger.status("page", "1") is None
+    assert ledger.status("page", "2") == REMOVED
+
+
+def test_fingerprint_changes(ledger):
+    assert ledger.fingerprint("dataset", "ds") is None
+    assert ledger.record_fingerprint("dataset", "ds", 3, "abc")
+    assert not ledger.record_fingerprint("dataset", "ds", 3, "abc")
+    assert ledger.record_fingerprint("dataset", "ds", 4, "abd")
+    assert ledger.fingerprint("dataset", "ds") == (4, "abd")
+
+
+def test_state_survives_reopen(tmp_path):
+    path = str(tmp_path / "ledger.sqlite")
+    ledger = CrawlLedger(path)
+    ledger.discover_many("reaction", keyed("a", "b"), parent="ds")
+    ledger.done("reaction", "a")
+    ledger.close()
+    reopened = CrawlLedger(path)
+    assert [key for key, _, _ in reopened.frontier("reaction")] == ["b"]
+    assert reopened.status("reaction", "a") == DONE
+    reopened.close()
@@ -0,0 +1,139 @@
+import csv
+import os
+
+import pytest
+
+from conftest import FIXTURES
+import crd_adapter
+from crd_adapter import CrdAdapter
+from crd_parse import parse_archive, parse_reaction_page, csv_rows_for, safe_filename_for
+from Scraper_Helpers.engine import ScrapeEngine
+
+# The CRD parser against saved listing HTML: the stand-in site's pages
+# (archive.html, reaction-<set>-page-<n>.html, served by the fake site below)
+# and hand-written pages shaped like kmt.vander-lingen.nl's (*-edge.html).
+CRD_FIXTURES = os.path.join(FIXTURES, "crd")
+BASE_URL = "http://crd.test"
+
+
+def read(name):
+    with open(os.path.join(CRD_FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_archive():
+    assert parse_archive(read("archive.html"), BASE_URL + "/archive") == [
+        {"name": "Bench Author 0 et al. Org. Lett. 2010", "url": BASE_URL + "/data/reaction/0?page=1"},
+        {"name": "Bench Author 1 et al. Org. Lett. 2011", "url": BASE_URL + "/data/reaction/1?page=1"},
+    ]
+
+
+def test_archive_nested_entries():
+    entries = parse_archive(read("archive-edge.html"), "https://kmt.vander-lingen.nl/archive")
+    assert entries == [
+        {"name": "Smith, J.; Doe, A. J. Org. Chem. 2019, 84 (3): 1-10",
+         "url": "https://kmt.vander-lingen.nl/data/reaction/doi/10.1021/acs.joc.9b00001?page=1"},
+        {"name": "Müller et al. Angew. Chem.", "url": "https://kmt.vander-lingen.nl/data/reaction/doi/10.1002/anie.1?page=1"},
+    ]
+    assert safe_filename_for(entries[0]["name"]) == "Smith, J.; Doe, A. J. Org. Chem. 2019, 84 (3)_ 1-10"
+
+
+def test_reaction_pages():
+    first = parse_reaction_page(read("reaction-0-page-1.html"), BASE_URL + "/data/reaction/0?page=1")
+    assert first["total_results"] == 3
+    assert first["smiles"][0] == "C(=O)CO.OCCCO>CC#N.CCN(CC)CC>BrNNOOC"
+    assert len(first["smiles"]) == 3
+    assert first["next_url"] == BASE_URL + "/data/reaction/0?page=2"
+    last = parse_reaction_page(read("reaction-0-page-2.html"), first["next_url"])
+    assert last["total_results"] == 3 and len(last["smiles"]) == 3
+    assert last["next_url"] is None
+
+
+def test_reaction_page_edge_cases():
+    page = parse_reaction_page(read("reaction-edge.html"), "https://kmt.vander-lingen.nl/data/reaction/doi/x?page=2")
+    assert page == {
+        "total_results": 2,
+        "smiles": ["CC(=O)O.OCC>[H+]>CC(=O)OCC", "c1ccccc1Br.OB(O)c1ccccc1>>c1ccc(-c2ccccc2)cc1"],
+        "next_url": "https://kmt.vander-lingen.nl/data/reaction/doi/x?page=3",
+    }
+    assert csv_rows_for(page["smiles"][1]) == [["Reactant", "c1ccccc1Br.OB(O)c1ccccc1"],
+                                               ["Product", "c1ccc(-c2ccccc2)cc1"]]
+
+
+def test_page_without_results():
+    assert parse_reaction_page("<html><body><p>No reactions</p></body></html>", BASE_URL) == \
+        {"total_results": 0, "smiles": [], "next_url": None}
+
+
+@pytest.fixture
+def site(monkeypatch):
+    # The stand-in pages by URL; a test deletes one to make its fetch fail.
+    pages = {BASE_URL + "/archive": read("archive.html")}
+    for set_index in (0, 1):
+        for page in (1, 2):
+            pages[f"{BASE_URL}/data/reaction/{set_index}?page={page}"] = read(f"reaction-{set_index}-page-{page}.html")
+
+    def fetch_text(url, headers=None):
+        if url not in pages:
+            raise OSError(f"HTTP Error 500 for {url}")
+        return pages[url]
+
+    monkeypatch.setattr(crd_adapter, "fetch_text", fetch_text)
+    return pages
+
+
+def crawl(out_dir, **options):
+    engine = ScrapeEngine(CrdAdapter(), str(out_dir), BASE_URL, concurrency=2, **options)
+    try:
+        engine.run()
+    finally:
+        engine.close()
+    return engine
+
+
+def csv_rows(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_crawl_writes_every_page(site, tmp_path):
+    engine = crawl(tmp_path)
+    assert engine.counts == {"done": 2, "failed": 0}
+    rows = csv_rows(tmp_path / "Bench Author 0 et al. Org. Lett. 2010.csv")
+    assert rows[0] == ["Type", "SMILES"]
+    assert len(rows) == 1 + 6 * 3
+    assert rows[1:4] == csv_rows_for("C(=O)CO.OCCCO>CC#N.CCN(CC)CC>BrNNOOC")
+
+
+def test_failed_next_page_publishes_nothing(site, tmp_path):
+    del site[BASE_URL + "/data/reaction/1?page=2"]
+    engine = crawl(tmp_path)
+    assert engine.counts == {"done": 1, "failed": 1}
+    assert sorted(engine.worker_counts) == [1, 2]
+    assert sum(counts["failed"] for counts in engine.worker_counts.values()) == 1
+    # Only the aborted part file is left for the failed set; its CSV is never published.
+    assert sorted(name for name in os.listdir(tmp_path) if name.startswith("Bench")) == [
+        "Bench Author 0 et al. Org. Lett. 2010.csv", "Bench Author 1 et al. Org. Lett. 2011.csv.part"]
+
+    site[BASE_URL + "/data/reaction/1?page=2"] = read("reaction-1-page-2.html")
+    engine = crawl(tmp_path, rescrape=False)
+    assert engine.counts == {"done": 1, "failed": 0}
+    assert len(csv_rows(tmp_path / "Bench Author 1 et al. Org. Lett. 2011.csv")) == 1 + 6 * 3
+    assert not os.path.exists(tmp_path / "Bench Author 1 et al. Org. Lett. 2011.csv.part")
+
+
+def test_refresh_skips_unchanged_sets(site, tmp_path):
+    crawl(tmp_path)
+    kept = tmp_path / "Bench Author 1 et al. Org. Lett. 2011.csv"
+    os.utime(kept, (0, 0))
+    os.remove(tmp_path / "Bench Author 0 et al. Org. Lett. 2010.csv")
+    crawl(tmp_path, refresh=True, rescrape=True)
+    # The set whose CSV is gone is scraped again; the unchanged one is not rewritten.
+    assert os.path.exists(tmp_path / "Bench Author 0 et al. Org. Lett. 2010.csv")
+    assert os.stat(kept).st_mtime == 0
+
+
+def test_crd_async_cli(site, tmp_path):
+    import crd_async
+    assert crd_async.main(["--base-url", BASE_URL, "--out", str(tmp_path), "--concurrency", "2", "--quiet"]) == 0
+    assert len(csv_rows(tmp_path / "Bench Author 1 et al. Org. Lett. 2011.csv")) == 1 + 6 * 3
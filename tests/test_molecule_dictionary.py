@@ -0,0 +1,91 @@
+import json
+import os
+
+import pytest
+
+from conftest import FIXTURES
+from crd_parse import csv_rows_for
+from ord_http import scrape_ord_details_http
+from ord_records import read_ord_csv, IDENTIFIERS_COLUMN
+from Scraper_Helpers import molecule_dictionary
+from Scraper_Helpers.molecule_dictionary import MoleculeDictionary, canonicalize, set_molecules
+
+ORD_FIXTURE = "standin-ord-bench001000r0000"
+
+
+class FakeChem:
+    # Canonicalizes by sorting the characters; anything starting with "x" does not parse.
+    @staticmethod
+    def MolFromSmiles(text):
+        return None if text.startswith("x") else text
+
+    @staticmethod
+    def MolToSmiles(mol):
+        return "".join(sorted(mol))
+
+
+@pytest.fixture
+def fake_rdkit(monkeypatch):
+    monkeypatch.setattr(molecule_dictionary, "Chem", FakeChem)
+    canonicalize.cache_clear()
+    yield
+    canonicalize.cache_clear()
+
+
+def test_intern_round_trip(tmp_path):
+    path = str(tmp_path / "molecules.sqlite")
+    molecules = MoleculeDictionary(path)
+    ethanol = molecules.intern("CCO")
+    assert molecules.intern(" CCO\n") == ethanol
+    assert molecules.intern("C1CCOC1") != ethanol
+    assert molecules.intern("") is None
+    assert molecules.text(str(ethanol)) == "CCO"
+    assert len(molecules) == 2
+    molecules.close()
+
+    again = MoleculeDictionary(path)
+    assert again.intern("CCO") == ethanol
+    assert again.text(ethanol) == "CCO"
+    again.close()
+
+
+def test_names_that_parse_as_smiles_keep_their_text(tmp_path, fake_rdkit):
+    path = str(tmp_path / "molecules.sqlite")
+    molecules = MoleculeDictionary(path)
+    boc = molecules.intern("BOC")
+    # Another spelling of the same canonical form shares the id; the text stays the one first scraped.
+    assert molecules.intern("OCB") == boc
+    assert molecules.text(boc) == "BOC"
+    assert molecules.text(molecules.intern("x name")) == "x name"
+    molecules.close()
+    assert MoleculeDictionary(path).text(boc) == "BOC"
+
+
+def test_ord_and_crd_share_ids(tmp_path):
+    with open(os.path.join(FIXTURES, "ord", f"{ORD_FIXTURE}.dom.json"), encoding="utf-8") as f:
+        url = json.load(f)["url"]
+    with open(os.path.join(FIXTURES, "ord", f"{ORD_FIXTURE}.record.json"), encoding="utf-8") as f:
+        record = json.load(f)
+    plain_dir, encoded_dir = tmp_path / "plain", tmp_path / "encoded"
+    os.makedirs(plain_dir)
+    os.makedirs(encoded_dir)
+    scrape_ord_details_http(url, str(plain_dir), record)
+    molecules = set_molecules(MoleculeDictionary(str(tmp_path / "molecules.sqlite")))
+    try:
+        scrape_ord_details_http(url, str(encoded_dir), record)
+    finally:
+        set_molecules(None)
+    name = os.listdir(plain_dir)[0]
+    plain, encoded = read_ord_csv(str(plain_dir / name)), read_ord_csv(str(encoded_dir / name))
+
+    header, rows = encoded["Inputs"]
+    assert header[IDENTIFIERS_COLUMN] == "Molecule_ID"
+    # Decoding the ids gives back exactly what the plain CSV holds.
+    assert [molecules.text(row[IDENTIFIERS_COLUMN]) for row in rows] == \
+        [row[IDENTIFIERS_COLUMN] for row in plain["Inputs"][1]]
+
+    # A CRD row with a SMILES the ORD reaction used gets the same id.
+    smiles = plain["Inputs"][1][0][IDENTIFIERS_COLUMN]
+    crd_rows = csv_rows_for(f"{smiles}>>CC", molecules)
+    assert crd_rows[0] == ["Reactant", int(rows[0][IDENTIFIERS_COLUMN])]
+    molecules.close()
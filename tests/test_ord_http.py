@@ -0,0 +1,68 @@
+import glob
+import json
+import os
+
+import pytest
+
+from conftest import FIXTURES
+from ord_http import parse_reaction_json, scrape_ord_details_http, validate_reaction_json
+from ord_records import input_records, product_records, measurement_records
+
+# Each fixture pair is one reaction as the two paths see it: <name>.record.json
+# is the JSON record the HTTP fast path reads, <name>.dom.json the ord_dom
+# payload (as ORD.py saves it with --snapshots) the Selenium path extracts from
+# the rendered page. The pairs here are synthetic, not captured from the live
+# site: the dom side was generated from the record the way the detail page
+# renders it (standin-* from BENCHMARKS/stand_in_sites.py; edgecases-* and
+# multioutcome-* hand-written for odd values, missing measurements and several
+# outcomes). capture_ord_fixtures.py can add real pairs from a browser crawl.
+ORD_FIXTURES = os.path.join(FIXTURES, "ord")
+NAMES = sorted(os.path.basename(path)[:-len(".record.json")]
+               for path in glob.glob(os.path.join(ORD_FIXTURES, "*.record.json")))
+
+
+def load(name, kind):
+    with open(os.path.join(ORD_FIXTURES, f"{name}.{kind}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("name", NAMES)
+def test_http_records_match_selenium_records(name):
+    dom = load(name, "dom")
+    expected = (input_records(dom["inputs"]), product_records(dom["products"]),
+                measurement_records(dom["measurements"]))
+    assert parse_reaction_json(load(name, "record")) == expected
+
+
+@pytest.mark.parametrize("name", NAMES)
+def test_fixture_records_validate(name):
+    validate_reaction_json(load(name, "record"))
+
+
+@pytest.mark.parametrize("record", [
+    [],
+    {"reaction_id": "ord-1"},
+    {"inputs": [{"components": []}]},
+    {"inputs": {"a": {"compounds": []}}},
+    {"outcomes": {"products": []}},
+    {"outcomes": [{"products": {"identifiers": []}}]},
+    {"inputs": {"a": {"components": [{"identifiers": []}]}}},
+    {"inputs": {"a": {"components": [{"identifiers": [{"type": "SMILES", "value": 5}]}]}}},
+    {"outcomes": [{"products": [{"identifiers": [{"type": "SMILES", "value": "C"}], "measurements": ["85%"]}]}]},
+])
+def test_validate_rejects_unexpected_shapes(record):
+    with pytest.raises(ValueError, match="unexpected reaction record"):
+        validate_reaction_json(record)
+
+
+def test_invalid_record_writes_nothing(tmp_path):
+    url = "https://open-reaction-database.org/id/ord-0e4c1f8a9b2d4c6e8f0a1b2c3d4e5f60"
+    with pytest.raises(ValueError):
+        scrape_ord_details_http(url, str(tmp_path), {"inputs": {"a": {"components": [{"identifiers": "CCN"}]}}})
+    assert os.listdir(tmp_path) == []
+
+
+def test_valid_record_writes_csv(tmp_path):
+    name = NAMES[0]
+    scrape_ord_details_http(load(name, "dom")["url"], str(tmp_path), load(name, "record"))
+    assert [path.suffix for path in tmp_path.iterdir()] == [".csv"]
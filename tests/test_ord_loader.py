@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+import ord_loader
+from ord_records import open_ord_sink, write_ord_records, reaction_csv_paths
+
+DATASETS = ["ord_dataset-a", "ord_dataset-b"]
+
+
+def write_reaction(dataset_dir, reaction_id, n):
+    inputs = [{"tab": "amine", "raw_button_index": i + 1, "identifiers_value": f"C{'C' * i}N", "reaction_role": "REACTANT"}
+              for i in range(n % 3 + 1)]
+    products = [{"outcome_index": 1, "product_index": 1, "identifiers_value": f"CC(=O)N{n}", "reaction_role": "PRODUCT"}]
+    blocks = [{"outcome_index": 1, "measurement_index": 1,
+               "pairs": [{"type": "YIELD", "value": f"{n}%"}, {"type": "AMOUNT", "value": f"{n}.5 mg"}]}]
+    write_ord_records(open_ord_sink(f"https://open-reaction-database.org/id/{reaction_id}", str(dataset_dir)),
+                      inputs, products, blocks)
+
+
+@pytest.fixture
+def root(tmp_path):
+    n = 0
+    for dataset_id in DATASETS:
+        dataset_dir = tmp_path / dataset_id
+        os.makedirs(dataset_dir)
+        for i in range(6):
+            write_reaction(dataset_dir, f"ord-{dataset_id[-1]}{i:03d}", n)
+            n += 1
+    # What an interrupted crawl leaves: an empty CSV, one cut off mid-row and an unfinished .part file.
+    open(tmp_path / DATASETS[0] / "ord-empty.csv", "w").close()
+    with open(tmp_path / DATASETS[1] / "ord-b001.csv", encoding="utf-8") as f:
+        text = f.read()
+    with open(tmp_path / DATASETS[1] / "ord-b001.csv", "w", encoding="utf-8") as f:
+        f.write(text.rstrip("\r\n")[:-len("NT,7.5 mg")])
+    with open(tmp_path / DATASETS[1] / "ord-b999.csv.part", "w", encoding="utf-8") as f:
+        f.write(text[:len(text) // 2])
+    return str(tmp_path)
+
+
+def test_process_pool_loads_the_same_frames(root, monkeypatch):
+    single = ord_loader.load_csv_sections(root, workers=1)
+    monkeypatch.setattr(ord_loader, "MIN_FILES_PER_CHUNK", 2)
+    pooled = ord_loader.load_csv_sections(root, workers=3)
+    for section in ord_loader.SECTIONS:
+        pd.testing.assert_frame_equal(pooled[section], single[section])
+
+
+def test_interrupted_files(root):
+    tables = ord_loader.load_csv_sections(root, workers=1)
+    assert len(reaction_csv_paths(root)) == 13
+    measurements = tables["measurements"]
+    # The .part file is never read, the empty CSV adds nothing, the cut-off row is kept with its missing cells empty.
+    assert set(measurements["reaction_id"]) == {f"ord-{d[-1]}{i:03d}" for d in DATASETS for i in range(6)}
+    assert len(measurements) == 12 * 2
+    cut = measurements[measurements["reaction_id"] == "ord-b001"]
+    assert cut["type"].tolist() == ["YIELD", "AMOU"]
+    assert cut["value"].tolist() == ["7%", ""]
+    assert measurements["measurement_block_index"].dtype == "Int64"
+    assert list(measurements.columns) == ["reaction_id", "outcome_index", "measurement_block_index", "type", "value",
+                                          "dataset_id"]
@@ -0,0 +1,74 @@
+import math
+import os
+import re
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from ord_records import open_ord_sink, write_ord_records
+from ord_measurements import UNITS, VALUE_PATTERN, typed_measurements, dataset_summary
+from ord_loader import load_measurements
+
+DATASET = "ord_dataset-mixed"
+VALUES = {
+    "ord-0001": [("YIELD", "85%"), ("AMOUNT", "12.5 mg"), ("AMOUNT", "2 µL"), ("PURITY", "0.93")],
+    "ord-0002": [("YIELD", "12.25%"), ("AMOUNT", "1.2 g"), ("IDENTITY", "3.2 min"), ("IDENTITY", "consistent")],
+    "ord-0003": [("AMOUNT", "254 NANOMETER"), ("AMOUNT", "5-10 %"), ("AMOUNT", "1e-3 KILOGRAM"), ("YIELD", "85%"),
+                 ("IDENTITY", ""), ("AMOUNT", "1.5 h"), ("AMOUNT", "30 s")],
+}
+
+
+def parse_row_by_row(value):
+    # What the per-row Python loop this replaces produced for one Value.
+    match = re.match(VALUE_PATTERN, value)
+    if match is None:
+        return math.nan, "", None, math.nan, None
+    magnitude, unit = float(match["magnitude"]), match["unit"] or ""
+    entry = UNITS.get(unit.lower())
+    if entry is None:
+        return magnitude, unit, None, math.nan, None
+    quantity, factor, base_unit = entry
+    return magnitude, unit, quantity, magnitude * factor, base_unit
+
+
+@pytest.fixture
+def root(tmp_path):
+    dataset_dir = tmp_path / DATASET
+    os.makedirs(dataset_dir)
+    for reaction_id, pairs in VALUES.items():
+        block = {"outcome_index": 1, "measurement_index": 1, "pairs": [{"type": t, "value": v} for t, v in pairs]}
+        write_ord_records(open_ord_sink(f"https://open-reaction-database.org/id/{reaction_id}", str(dataset_dir)),
+                          [], [], [block])
+    return str(tmp_path)
+
+
+def same(a, b):
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    if isinstance(a, float) and isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-12)
+    return a == b
+
+
+def test_vectorized_parse_matches_row_by_row(root):
+    measurements = load_measurements(root, backend="csv", workers=1)
+    assert len(measurements) == sum(len(pairs) for pairs in VALUES.values())
+    typed = typed_measurements(measurements)
+    columns = ["magnitude", "unit", "quantity", "normalized_value", "normalized_unit"]
+    for value, row in zip(measurements["value"], typed[columns].itertuples(index=False)):
+        magnitude, unit, quantity, normalized_value, normalized_unit = row
+        got = (float(magnitude), None if pd.isna(unit) else unit, None if pd.isna(quantity) else quantity,
+               float(normalized_value), None if pd.isna(normalized_unit) else normalized_unit)
+        expected = parse_row_by_row(value)
+        assert all(same(a, b) for a, b in zip(got, expected)), (value, got, expected)
+
+
+def test_units_are_normalised_before_aggregating(root):
+    typed = typed_measurements(load_measurements(root, backend="csv", workers=1))
+    masses = typed[typed["quantity"] == "mass"].sort_values("normalized_value")
+    assert masses["normalized_value"].tolist() == pytest.approx([0.0125, 1.0, 1.2])
+    summary = dataset_summary(typed)
+    yields = summary[(summary["type"] == "YIELD") & (summary["quantity"] == "percentage")].iloc[0]
+    assert yields["count"] == 3
+    assert yields["median"] == pytest.approx(85.0)
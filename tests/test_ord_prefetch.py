@@ -0,0 +1,32 @@
+import threading
+
+import ord_http
+from ord_prefetch import ReactionPrefetcher
+
+URL = "https://open-reaction-database.org/id/ord-{}"
+
+
+def test_depth_counts_the_reactions_after_the_current_one(monkeypatch):
+    fetched = []
+    release = threading.Event()
+
+    def fetch_reaction_json(reaction_id):
+        fetched.append(reaction_id)
+        release.wait(5)
+        return {"reaction_id": reaction_id}
+
+    monkeypatch.setattr(ord_http, "fetch_reaction_json", fetch_reaction_json)
+    prefetcher = ReactionPrefetcher(None, depth=2)
+    try:
+        prefetcher.ahead(URL.format("a0"), [URL.format("a1"), URL.format("a2"), URL.format("a3")])
+        assert sorted(prefetcher.records) == [URL.format("a1"), URL.format("a2")]
+        # Moving on to a1: its record stays held for it and a3 joins the window.
+        prefetcher.ahead(URL.format("a1"), [URL.format("a2"), URL.format("a3")])
+        assert sorted(prefetcher.records) == [URL.format("a1"), URL.format("a2"), URL.format("a3")]
+        release.set()
+        assert prefetcher.reaction(URL.format("a1")) == {"reaction_id": "ord-a1"}
+        assert prefetcher.reaction(URL.format("a0")) is None
+    finally:
+        release.set()
+        prefetcher.close()
+    assert sorted(fetched) == ["ord-a1", "ord-a2", "ord-a3"]
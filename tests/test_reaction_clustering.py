@@ -0,0 +1,71 @@
+import csv
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+
+from conftest import REPO_ROOT
+from crd_parse import csv_rows_for
+
+sys.path.insert(0, os.path.join(REPO_ROOT, "LESSON9_PIP"))
+import reaction_clustering
+
+REACTIONS = [
+    "CC(=O)O.OCC>[H+]>CC(=O)OCC",
+    "CC(=O)O.OCCC>[H+]>CC(=O)OCCC",
+    "CC(=O)O.OC>[H+]>CC(=O)OC",
+    "Brc1ccccc1.OB(O)c1ccccc1>C1CCOC1>c1ccc(-c2ccccc2)cc1",
+    "Brc1ccc(C)cc1.OB(O)c1ccccc1>C1CCOC1>Cc1ccc(-c2ccccc2)cc1",
+    "Ic1ccccc1.OB(O)c1ccccc1>C1CCOC1>c1ccc(-c2ccccc2)cc1",
+]
+N_FEATURES = 64
+
+
+@pytest.fixture
+def crd_dir(tmp_path):
+    os.makedirs(tmp_path / "crd")
+    with open(tmp_path / "crd" / "set A.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Type", "SMILES"])
+        for reaction in REACTIONS:
+            writer.writerows(csv_rows_for(reaction))
+    return str(tmp_path / "crd")
+
+
+def featurize(crd_dir, out_dir):
+    reactions = reaction_clustering.iter_crd_reactions(crd_dir)
+    return reaction_clustering.featurize(reactions, str(out_dir), N_FEATURES, chunk_rows=4)
+
+
+def test_features_are_normalised_and_deterministic(crd_dir, tmp_path):
+    features = featurize(crd_dir, tmp_path / "a")
+    assert features.shape == (len(REACTIONS), N_FEATURES)
+    assert features.dtype == np.float32
+    assert np.allclose(np.linalg.norm(features, axis=1), 1.0, atol=1e-5)
+    # Hashing is crc32-based, so a second run (or another process) gives the same vectors.
+    reaction_clustering.molecule_vector.cache_clear()
+    assert np.array_equal(np.asarray(features), np.asarray(featurize(crd_dir, tmp_path / "b")))
+
+
+def test_labels_are_written_for_every_reaction(crd_dir, tmp_path):
+    out_dir = tmp_path / "clusters"
+    features = featurize(crd_dir, out_dir)
+    km = reaction_clustering.fit_streaming(features, 2, batch_size=4, epochs=2)
+    labels, inertia = reaction_clustering.assign_streaming(km, features, batch_size=4)
+    reaction_clustering.write_clusters(str(out_dir), labels, km.cluster_centers_)
+
+    with open(out_dir / "labels.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["source", "dataset_id", "reaction_id", "cluster"]
+    assert [row[:3] for row in rows[1:]] == [["crd", "set A", str(i)] for i in range(len(REACTIONS))]
+    assert {int(row[3]) for row in rows[1:]} <= {0, 1}
+    assert [int(row[3]) for row in rows[1:]] == labels.tolist()
+    assert np.load(out_dir / "centroids.npy").shape == (2, N_FEATURES)
+    assert inertia >= 0
+
+
+def test_molecule_cache_is_bounded_by_the_batch_size():
+    assert reaction_clustering.molecule_vector.cache_info().maxsize == reaction_clustering.BATCH_SIZE
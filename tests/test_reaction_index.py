@@ -0,0 +1,93 @@
+import csv
+import json
+import os
+
+import pytest
+
+from conftest import FIXTURES
+from crd_parse import csv_rows_for, group_reaction_rows
+from ord_http import scrape_ord_details_http
+from Scraper_Helpers.reaction_index import ReactionIndex
+
+ORD_FIXTURE = "standin-ord-bench001000r0000"
+ORD_REACTION = "ord-bench001000r0000"
+DATASET = "ord_dataset-bench001"
+REACTIONS = ["CC(=O)O.OCC>[H+]>CC(=O)OCC", "Brc1ccccc1.OB(O)c1ccccc1>C1CCOC1>c1ccc(-c2ccccc2)cc1"]
+
+
+def write_ord(root):
+    with open(os.path.join(FIXTURES, "ord", f"{ORD_FIXTURE}.dom.json"), encoding="utf-8") as f:
+        url = json.load(f)["url"]
+    with open(os.path.join(FIXTURES, "ord", f"{ORD_FIXTURE}.record.json"), encoding="utf-8") as f:
+        record = json.load(f)
+    dataset_dir = root / "ord" / DATASET
+    os.makedirs(dataset_dir)
+    scrape_ord_details_http(url, str(dataset_dir), record)
+
+
+def write_crd(path, reactions):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Type", "SMILES"])
+        for reaction in reactions:
+            writer.writerows(csv_rows_for(reaction))
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ReactionIndex(str(tmp_path / "index.sqlite"))
+    yield index
+    index.close()
+
+
+def test_group_reaction_rows():
+    # One row per type and reaction; a reaction may lack any of them.
+    rows = [["Reactant", "A"], ["Solvent/Reagent", "S"], ["Product", "P"],
+            ["Reactant", "B"], ["Product", "Q"],
+            ["Solvent/Reagent", "T"], ["Product", "R"],
+            ["Product", "U"]]
+    assert list(group_reaction_rows(rows)) == [rows[:3], rows[3:5], rows[5:7], rows[7:]]
+    assert list(group_reaction_rows([])) == []
+
+
+def test_crd_sets_are_split_into_reactions(tmp_path, index):
+    os.makedirs(tmp_path / "crd")
+    write_crd(tmp_path / "crd" / "set A.csv", REACTIONS)
+    assert index.update(crd_dir=str(tmp_path / "crd")) == {"files": 1, "reactions": 2, "removed": 0}
+    assert [row[:4] for row in index.reactions_with("CC(=O)OCC")] == [("crd", "set A", "0", "PRODUCT")]
+    # '.'-separated parts are indexed as separate molecules.
+    assert [row[2] for row in index.reactions_with("OB(O)c1ccccc1", role="REACTANT")] == ["1"]
+
+
+def test_update_rereads_only_changed_files(tmp_path, index):
+    write_ord(tmp_path)
+    os.makedirs(tmp_path / "crd")
+    write_crd(tmp_path / "crd" / "set A.csv", REACTIONS[:1])
+    write_crd(tmp_path / "crd" / "set B.csv", REACTIONS[1:])
+    first = index.update(str(tmp_path / "ord"), str(tmp_path / "crd"))
+    assert first == {"files": 3, "reactions": 3, "removed": 0}
+    assert [found["dataset_id"] for found in index.reaction(ORD_REACTION)] == [DATASET]
+    assert {row[2] for row in index.reactions_with_measurement("YIELD")} == {ORD_REACTION}
+
+    assert index.update(str(tmp_path / "ord"), str(tmp_path / "crd")) == {"files": 0, "reactions": 0, "removed": 0}
+    write_crd(tmp_path / "crd" / "set B.csv", REACTIONS)
+    assert index.update(str(tmp_path / "ord"), str(tmp_path / "crd")) == {"files": 1, "reactions": 2, "removed": 0}
+    assert [row[1:3] for row in index.reactions_with("CC(=O)OCC")] == [("set A", "0"), ("set B", "0")]
+
+
+def test_removed_files_leave_the_index(tmp_path, index):
+    os.makedirs(tmp_path / "crd")
+    write_crd(tmp_path / "crd" / "set A.csv", REACTIONS[:1])
+    write_crd(tmp_path / "crd" / "set B.csv", REACTIONS[1:])
+    index.update(crd_dir=str(tmp_path / "crd"))
+    assert index.search("OB(O)") != []
+
+    os.remove(tmp_path / "crd" / "set B.csv")
+    assert index.update(crd_dir=str(tmp_path / "crd")) == {"files": 0, "reactions": 0, "removed": 1}
+    assert index.search("OB(O)") == []
+    assert index.search("c1ccc") == []
+    assert index.counts()["reactions"] == 1
+    # Its molecules are gone from the FTS table too, not just unreachable from a reaction.
+    if index.fts:
+        assert index.conn.execute("SELECT count(*) FROM molecules_fts WHERE molecules_fts MATCH '\"OB(O)\"'").fetchone() == (0,)
+    assert index.search("C(=O)O") != []
@@ -0,0 +1,85 @@
+import csv
+import os
+
+import pytest
+
+from Scraper_Helpers.row_sink import CsvRowSink, SectionedCsvSink
+from ord_records import OrdCsvSink, read_ord_csv, write_ord_records
+
+INPUTS = [{"tab": "amine", "raw_button_index": 1, "identifiers_value": "CCN", "reaction_role": "REACTANT"}]
+PRODUCTS = [{"outcome_index": 1, "product_index": 1, "identifiers_value": "CCNC(C)=O", "reaction_role": "PRODUCT"}]
+MEASUREMENTS = [{"outcome_index": 1, "measurement_index": 1, "pairs": [{"type": "YIELD", "value": "85%"}]}]
+
+
+def rows_of(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def test_csv_sink_publishes_on_finalize(tmp_path):
+    path = str(tmp_path / "out" / "set.csv")
+    sink = CsvRowSink(path, header=["Type", "SMILES"], buffer_rows=2)
+    sink.write_rows([["Reactant", "CC"], ["Product", "CO"], ["Reactant", "N"]])
+    assert not os.path.exists(path)
+    assert rows_of(path + ".part")[:3] == [["Type", "SMILES"], ["Reactant", "CC"], ["Product", "CO"]]
+    assert sink.finalize() == path
+    assert rows_of(path) == [["Type", "SMILES"], ["Reactant", "CC"], ["Product", "CO"], ["Reactant", "N"]]
+    assert not os.path.exists(path + ".part")
+    assert sink.rows_written == 3
+
+
+def test_csv_sink_abort_keeps_part_only(tmp_path):
+    path = str(tmp_path / "set.csv")
+    with pytest.raises(RuntimeError):
+        with CsvRowSink(path, header=["Type", "SMILES"]) as sink:
+            sink.write_row(["Reactant", "CC"])
+            raise RuntimeError("page 2 failed")
+    assert not os.path.exists(path)
+    assert rows_of(path + ".part") == [["Type", "SMILES"], ["Reactant", "CC"]]
+
+
+def test_abort_leaves_earlier_csv_untouched(tmp_path):
+    path = str(tmp_path / "set.csv")
+    with CsvRowSink(path, header=["Type"]) as sink:
+        sink.write_row(["old"])
+    sink = CsvRowSink(path, header=["Type"])
+    sink.write_row(["new"])
+    sink.abort()
+    assert rows_of(path) == [["Type"], ["old"]]
+
+
+def test_sectioned_sink_orders_sections(tmp_path):
+    path = str(tmp_path / "r.csv")
+    with SectionedCsvSink(path, [("A", ["Section", "a"]), ("B", ["Section", "b"])]) as sink:
+        sink.write_row("B", ["B", 2])
+        sink.write_row("A", ["A", 1])
+        assert sink.counts() == {"A": 1, "B": 1}
+    assert rows_of(path) == [["Section", "a"], ["A", "1"], [], ["Section", "b"], ["B", "2"]]
+    assert sorted(os.listdir(tmp_path)) == ["r.csv"]
+
+
+def test_sectioned_sink_abort_publishes_nothing(tmp_path):
+    path = str(tmp_path / "r.csv")
+    sink = SectionedCsvSink(path, [("A", ["Section", "a"]), ("B", ["Section", "b"])])
+    sink.write_row("A", ["A", 1])
+    sink.abort()
+    assert not os.path.exists(path)
+
+
+def test_ord_csv_sink_round_trip(tmp_path):
+    path = str(tmp_path / "ord-1.csv")
+    write_ord_records(OrdCsvSink(path), INPUTS, PRODUCTS, MEASUREMENTS)
+    sections = read_ord_csv(path)
+    assert sections["Inputs"][1] == [["Inputs", "amine", "1", "CCN", "REACTANT"]]
+    assert sections["Products"][1] == [["Products", "1", "1", "CCNC(C)=O", "PRODUCT"]]
+    assert sections["Measurements"][1] == [["Measurements", "1", "1", "YIELD", "85%"]]
+    assert sorted(os.listdir(tmp_path)) == ["ord-1.csv"]
+
+
+def test_ord_csv_sink_abort(tmp_path):
+    path = str(tmp_path / "ord-1.csv")
+    with pytest.raises(RuntimeError):
+        with OrdCsvSink(path) as sink:
+            sink.add_inputs(INPUTS)
+            raise RuntimeError("outcomes did not load")
+    assert not os.path.exists(path)
@@ -0,0 +1,134 @@
+from functools import partial
+import multiprocessing
+import time
+
+from Scraper_Helpers import scheduler as scheduler_module
+from Scraper_Helpers.scheduler import AdaptiveScheduler, FAILURE_FACTOR, POLL_INTERVAL, RATE_STEP, SLOW_FACTOR
+from Scraper_Helpers.work_queue import WorkQueue
+
+
+def make_scheduler(**options):
+    options = {"rate": 2.0, "max_rate": 4.0, "concurrency": 4, "max_concurrency": 8, "target_latency": 1.0, **options}
+    return AdaptiveScheduler(**options)
+
+
+def request(scheduler, latency=0.1, ok=True):
+    # One request through a slot; the token bucket is topped up so only AIMD is under test.
+    scheduler.tokens = 1
+    assert scheduler._try_acquire() == 0
+    scheduler.release(latency, ok)
+
+
+def test_failure_halves_rate_and_concurrency():
+    scheduler = make_scheduler()
+    request(scheduler, ok=False)
+    assert scheduler.rate == 2.0 * FAILURE_FACTOR
+    assert scheduler.concurrency == 2
+    assert scheduler.stats["failures"] == 1
+
+
+def test_slow_response_trims_only_the_rate():
+    scheduler = make_scheduler()
+    request(scheduler, latency=3.0)
+    assert scheduler.rate == 2.0 * SLOW_FACTOR
+    assert scheduler.concurrency == 4
+    assert scheduler.stats["slow"] == 1
+
+
+def test_backoff_is_spaced_by_a_cooldown():
+    # A burst of 429s from requests that were in flight together counts as one decrease.
+    scheduler = make_scheduler()
+    for _ in range(3):
+        request(scheduler, ok=False)
+    assert scheduler.rate == 2.0 * FAILURE_FACTOR
+    assert scheduler.stats["failures"] == 3
+    scheduler.last_decrease -= 10
+    request(scheduler, ok=False)
+    assert scheduler.rate == 2.0 * FAILURE_FACTOR ** 2
+
+
+def test_timeout_backs_off_like_a_failure():
+    scheduler = make_scheduler()
+    scheduler.report_timeout()
+    assert scheduler.rate == 2.0 * FAILURE_FACTOR
+    assert scheduler.concurrency == 2
+
+
+def test_additive_recovery():
+    scheduler = make_scheduler(concurrency=2)
+    request(scheduler)
+    assert abs(scheduler.rate - (2.0 + RATE_STEP)) < 1e-9
+    assert scheduler.concurrency == 2
+    # One more slot once a full window (the current concurrency) of healthy responses is in.
+    request(scheduler)
+    assert abs(scheduler.rate - (2.0 + 2 * RATE_STEP)) < 1e-9
+    assert scheduler.concurrency == 3
+
+
+def test_recovery_stops_at_the_ceilings():
+    scheduler = make_scheduler(concurrency=1, max_concurrency=3)
+    for _ in range(200):
+        request(scheduler)
+    assert scheduler.rate == 4.0
+    assert scheduler.concurrency == 3
+
+
+def test_no_slot_past_the_concurrency_limit():
+    scheduler = make_scheduler(rate=1000, max_rate=1000, concurrency=2, max_concurrency=2)
+    scheduler.tokens = 2
+    assert scheduler._try_acquire() == 0
+    assert scheduler._try_acquire() == 0
+    assert scheduler._try_acquire() == POLL_INTERVAL
+    scheduler.release(0.1)
+    scheduler.tokens = 1
+    assert scheduler._try_acquire() == 0
+
+
+def test_pace_takes_a_token_without_touching_the_rate():
+    scheduler = AdaptiveScheduler(rate=1000, max_rate=1000)
+    scheduler.rate = 2.0
+    scheduler.pace()
+    assert scheduler.in_flight == 0
+    assert scheduler.latency_ewma is None
+    assert scheduler.rate == 2.0
+    assert scheduler.stats["requests"] == 1
+
+
+def navigate_with_shared_budget(path, rate, n, results):
+    # One crawl process: its own fast scheduler, held back only by the budget in the shared queue.
+    queue = WorkQueue(path)
+    scheduler = AdaptiveScheduler(rate=1000, max_rate=1000, shared_budget=partial(queue.take_token, rate))
+    stamps = []
+    for _ in range(n):
+        with scheduler.navigation():
+            stamps.append(time.time())
+    queue.close()
+    results.put(stamps)
+
+
+def test_shared_budget_holds_across_processes(tmp_path):
+    path, rate, per_process = str(tmp_path / "queue.sqlite"), 20.0, 6
+    WorkQueue(path).close()
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    processes = [context.Process(target=navigate_with_shared_budget, args=(path, rate, per_process, results))
+                 for _ in range(2)]
+    for process in processes:
+        process.start()
+    stamps = sorted(results.get(timeout=30) + results.get(timeout=30))
+    for process in processes:
+        process.join(timeout=30)
+    assert len(stamps) == 2 * per_process
+    # One token to start with, then one per 1/rate seconds for both processes together.
+    assert stamps[-1] - stamps[0] >= (len(stamps) - 1) / rate * 0.9
+
+
+def test_module_helpers_use_the_installed_scheduler():
+    installed = scheduler_module.get_scheduler()
+    scheduler = scheduler_module.set_scheduler(make_scheduler())
+    try:
+        with scheduler_module.navigation() as slot:
+            slot.failed()
+        assert scheduler.stats["failures"] == 1
+    finally:
+        scheduler_module.set_scheduler(installed)
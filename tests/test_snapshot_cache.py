@@ -0,0 +1,96 @@
+import json
+import os
+import time
+
+import pytest
+
+from conftest import FIXTURES
+from crd_parse import csv_rows_for
+from ord_http import scrape_ord_details_http
+from Scraper_Helpers.snapshot_cache import SnapshotCache, object_path, PRUNE_GRACE
+from Scraper_Helpers.snapshot_replay import replay
+
+ORD_FIXTURE = "standin-ord-bench001000r0000"
+DATASET = "ord_dataset-bench001"
+CRD_URL = "http://crd.test/data/reaction/0?page=1"
+
+
+def load(name, kind):
+    with open(os.path.join(FIXTURES, "ord", f"{name}.{kind}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def crd_payload():
+    pages = []
+    for page in (1, 2):
+        with open(os.path.join(FIXTURES, "crd", f"reaction-0-page-{page}.html"), encoding="utf-8") as f:
+            pages.append({"url": f"http://crd.test/data/reaction/0?page={page}", "html": f.read()})
+    return {"format": "crd_pages", "name": "Bench set 0", "url": CRD_URL, "pages": pages}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SnapshotCache(str(tmp_path / "snapshots"))
+    yield cache
+    cache.close()
+
+
+def age(cache, digest, seconds=PRUNE_GRACE + 10):
+    past = time.time() - seconds
+    os.utime(object_path(cache.root, digest), (past, past))
+
+
+def test_replay_writes_what_the_crawl_wrote(tmp_path, cache):
+    url = load(ORD_FIXTURE, "dom")["url"]
+    record = load(ORD_FIXTURE, "record")
+    crawled = tmp_path / "crawled" / DATASET
+    os.makedirs(crawled)
+    scrape_ord_details_http(url, str(crawled), record)
+    cache.put("ord", "ord-bench001000r0000", {"format": "ord_json", "url": url, "record": record}, DATASET)
+    cache.put("crd", CRD_URL, crd_payload())
+    assert cache.get("ord", "ord-bench001000r0000")["record"] == record
+
+    assert replay(cache.root, str(tmp_path / "replayed"), workers=1, verbose=False) == (2, [])
+    name = "ord-bench001000r0000.csv"
+    with open(crawled / name, "rb") as f, open(tmp_path / "replayed" / DATASET / name, "rb") as g:
+        assert f.read() == g.read()
+    with open(tmp_path / "replayed" / "Bench set 0.csv", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "Type,SMILES"
+    assert len(lines) == 1 + 6 * 3
+    assert lines[1:4] == [",".join(row) for row in csv_rows_for("C(=O)CO.OCCCO>CC#N.CCN(CC)CC>BrNNOOC")]
+
+
+def test_prune_keeps_referenced_and_recent_objects(cache):
+    old = cache.put("ord", "ord-1", {"format": "ord_json", "url": "u", "record": {"n": 1}})
+    current = cache.put("ord", "ord-1", {"format": "ord_json", "url": "u", "record": {"n": 2}})
+    shared = cache.put("ord", "ord-2", {"format": "ord_json", "url": "u", "record": {"n": 2}})
+    assert shared == current
+    # An unreferenced object written just now may be a put() whose index row is not in yet.
+    recent = cache.put("ord", "ord-3", {"format": "ord_json", "url": "u", "record": {"n": 3}})
+    cache.conn.execute("DELETE FROM snapshots WHERE key = 'ord-3'")
+    cache.conn.commit()
+    part = object_path(cache.root, old) + ".123.456.part"
+    with open(part, "wb") as f:
+        f.write(b"partial")
+    for digest in (old, current):
+        age(cache, digest)
+    os.utime(part, (0, 0))
+
+    assert cache.prune() == 1
+    assert not os.path.exists(object_path(cache.root, old))
+    assert os.path.exists(object_path(cache.root, current))
+    assert os.path.exists(object_path(cache.root, recent))
+    assert os.path.exists(part)
+    assert cache.get("ord", "ord-1")["record"] == {"n": 2}
+
+
+def test_put_of_an_existing_object_refreshes_it(cache):
+    payload = {"format": "ord_json", "url": "u", "record": {"n": 1}}
+    digest = cache.put("ord", "ord-1", payload)
+    age(cache, digest)
+    cache.conn.execute("DELETE FROM snapshots")
+    cache.conn.commit()
+    # Stored again under a new key: a prune that read the live set before this row went in must keep it.
+    assert cache.put("ord", "ord-2", payload) == digest
+    assert os.stat(object_path(cache.root, digest)).st_mtime > time.time() - PRUNE_GRACE
@@ -0,0 +1,146 @@
+import socket
+import time
+
+import pytest
+
+from Scraper_Helpers.scheduler import AdaptiveScheduler
+from Scraper_Helpers.work_queue import WorkQueue, Beacon, BeaconWatch, WAL_HOST, DONE, FAILED, LEASED, PENDING
+
+URLS = [(f"ord-{i}", f"https://example.org/id/ord-{i}") for i in range(3)]
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    yield queue
+    queue.close()
+
+
+def states(queue, kind="reaction"):
+    return queue.counts().get(kind, {})
+
+
+def test_publish_ignores_known_tasks(queue):
+    assert queue.publish_many("reaction", URLS, parent="ds") == 3
+    assert queue.publish_many("reaction", URLS[:1] + [("ord-9", "u")], parent="ds") == 1
+    assert states(queue) == {PENDING: 4}
+
+
+def test_lease_by_priority_and_never_twice(queue):
+    queue.publish_many("reaction", URLS, parent="ds")
+    queue.publish_many("dataset", [("ds2", "u")], priority=1)
+    first = queue.lease("a", n=2)
+    assert [lease.kind for lease in first] == ["dataset", "reaction"]
+    second = queue.lease("b", n=5)
+    assert {lease.key for lease in first + second} == {"ds2"} | {key for key, _ in URLS}
+    assert queue.lease("c") == []
+    assert queue.outstanding() == 4
+
+
+def test_lease_filters_kinds(queue):
+    queue.publish_many("reaction", URLS)
+    queue.publish_many("dataset", [("ds", "u")], priority=1)
+    assert [lease.kind for lease in queue.lease("a", kinds=["reaction"], n=5)] == ["reaction"] * 3
+
+
+def test_expired_lease_is_taken_over_and_old_token_loses(queue):
+    queue.publish_many("reaction", URLS[:1])
+    stale = queue.lease("a", lease_seconds=-1)[0]
+    assert states(queue) == {PENDING: 1}
+    fresh = queue.lease("b")[0]
+    assert fresh.key == stale.key and fresh.token != stale.token
+    assert queue.heartbeat([stale, fresh]) == [stale]
+    assert not queue.complete(stale)
+    assert not queue.fail(stale, "late")
+    assert queue.complete(fresh)
+    assert not queue.complete(fresh)
+    assert states(queue) == {DONE: 1}
+    assert queue.outstanding() == 0
+
+
+def test_heartbeat_keeps_lease(queue):
+    queue.publish_many("reaction", URLS[:1])
+    lease = queue.lease("a", lease_seconds=-1)[0]
+    assert queue.heartbeat([lease], lease_seconds=60) == []
+    assert states(queue) == {LEASED: 1}
+    assert queue.lease("b") == []
+
+
+def test_beacon_goes_stale_once_its_owner_stops(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    owner, reader = WorkQueue(path), WorkQueue(path)
+    beacon = Beacon(owner, "coordinator", interval=0.02).start()
+    watch = BeaconWatch(reader, "coordinator", timeout=0.3)
+    try:
+        deadline = time.monotonic() + 0.6
+        while time.monotonic() < deadline:
+            assert not watch.stale()
+            time.sleep(0.05)
+        beacon.stop()
+        stopped = time.monotonic()
+        while not watch.stale():
+            time.sleep(0.05)
+        assert 0.3 <= time.monotonic() - stopped < 1.0
+    finally:
+        beacon.stop()
+        owner.close()
+        reader.close()
+
+
+def test_fail_retries_until_max_attempts(queue):
+    queue.publish_many("reaction", URLS[:1])
+    for attempt in range(1, 3):
+        assert queue.fail(queue.lease("a")[0], f"error {attempt}", max_attempts=3)
+        assert states(queue) == {PENDING: 1}
+    assert queue.fail(queue.lease("a")[0], "error 3", max_attempts=3)
+    assert states(queue) == {FAILED: 1}
+    assert queue.lease("a") == []
+    assert queue.retry_failed() == 1
+    assert states(queue) == {PENDING: 1}
+
+
+def test_take_token_shares_one_budget(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    first, second = WorkQueue(path), WorkQueue(path)
+    try:
+        assert first.take_token(2.0) == 0
+        wait = second.take_token(2.0)
+        assert 0 < wait <= 0.5
+        assert first.take_token(2.0, name="other") == 0
+    finally:
+        first.close()
+        second.close()
+
+
+def test_wal_queue_refuses_another_host(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    queue = WorkQueue(path)
+    queue.set_meta(WAL_HOST, "some-other-host")
+    queue.close()
+    with pytest.raises(RuntimeError, match="WAL only works within one host"):
+        WorkQueue(path)
+    shared = WorkQueue(path, "delete")
+    assert shared.get_meta(WAL_HOST) is None
+    shared.close()
+    again = WorkQueue(path)
+    assert again.get_meta(WAL_HOST) == socket.gethostname()
+    again.close()
+
+
+def test_unknown_journal_mode(tmp_path):
+    with pytest.raises(ValueError):
+        WorkQueue(str(tmp_path / "queue.sqlite"), "memory")
+
+
+def test_scheduler_waits_for_the_shared_budget():
+    waits = iter([0.01, 0.01, 0])
+    calls = []
+
+    def budget():
+        calls.append(1)
+        return next(waits)
+
+    scheduler = AdaptiveScheduler(rate=1000, max_rate=1000, shared_budget=budget)
+    with scheduler.navigation():
+        pass
+    assert len(calls) == 3